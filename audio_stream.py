@@ -0,0 +1,301 @@
+#audio_stream.py
+"""
+Continuous audio capture
+Keeps one long-lived audio stream open and feeds it into a ring buffer from a
+producer thread, so no audio is dropped between commands and the cost of
+opening the microphone is paid once.
+"""
+
+import math
+import threading
+import time
+import wave
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import speech_recognition as sr
+
+
+_SAMPLE_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+
+def rms(chunk: bytes, sample_width: int) -> float:
+    """Root-mean-square energy of a chunk of raw PCM audio (same scale as audioop.rms)"""
+    samples = np.frombuffer(chunk, dtype=_SAMPLE_DTYPES[sample_width])
+    if samples.size == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+
+
+class AudioStreamEnded(Exception):
+    """The stream has no more audio: the source ran out or the device failed (then `__cause__` is the error)"""
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size ring of audio chunks addressed by a monotonically increasing
+    sequence number. The producer never blocks; a reader that falls more than
+    `capacity` chunks behind skips ahead to the oldest chunk still held.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._chunks = [b""] * self.capacity
+        self._next_seq = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.overruns = 0  # chunks lost because a reader fell behind
+
+    @property
+    def next_seq(self) -> int:
+        """Sequence number the next appended chunk will get"""
+        with self._cond:
+            return self._next_seq
+
+    @property
+    def closed(self) -> bool:
+        with self._cond:
+            return self._closed
+
+    def append(self, chunk: bytes):
+        with self._cond:
+            self._chunks[self._next_seq % self.capacity] = chunk
+            self._next_seq += 1
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def read(self, seq: int, timeout: Optional[float] = None) -> Tuple[int, Optional[bytes]]:
+        """
+        Return (seq, chunk) for the chunk at `seq`, waiting for it if needed.
+        If `seq` has already been overwritten the oldest available chunk is
+        returned instead. The chunk is None when the buffer is closed and
+        drained, or when no chunk arrived within `timeout` seconds.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: seq < self._next_seq or self._closed, timeout):
+                return seq, None
+            if seq >= self._next_seq:
+                return seq, None  # closed and drained
+            oldest = self._next_seq - self.capacity
+            if seq < oldest:
+                self.overruns += oldest - seq
+                seq = oldest
+            return seq, self._chunks[seq % self.capacity]
+
+
+class AudioStream:
+    """
+    Long-lived capture from an `sr.AudioSource` (a microphone or a WavAudioSource).
+    A producer thread reads chunks into an AudioRingBuffer; `listen` consumes
+    the buffer and segments it into phrases the same way `sr.Recognizer.listen`
+    does, picking up exactly where the previous call stopped.
+    """
+
+    def __init__(self, source: sr.AudioSource, buffer_seconds: float = 5.0, read_timeout: float = 1.0):
+        self.source = source
+        self.buffer_seconds = buffer_seconds
+        self.read_timeout = read_timeout  # how long to wait on a stalled device before giving up
+        self.buffer: Optional[AudioRingBuffer] = None
+        self._read_seq = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.error: Optional[Exception] = None
+        self.last_speech_at: Optional[float] = None  # Monotonic time the last voiced chunk was consumed
+        self.monitors: List[Callable[[bytes], None]] = []  # Called with every captured chunk, in the producer thread
+
+    def start(self) -> "AudioStream":
+        """Open the source once and start the producer thread"""
+        self.source.__enter__()
+        chunks = int(math.ceil(self.buffer_seconds * self.source.SAMPLE_RATE / self.source.CHUNK))
+        self.buffer = AudioRingBuffer(chunks)
+        self._read_seq = 0
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._produce, name="audio-capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the producer thread and close the source"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        if self.buffer is not None:
+            self.buffer.close()
+        if self.source.stream is not None:
+            self.source.__exit__(None, None, None)
+
+    def __enter__(self) -> "AudioStream":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def exhausted(self) -> bool:
+        """True once the source has ended (replayed audio) and every chunk was consumed"""
+        return self.buffer is not None and self.buffer.closed and self._read_seq >= self.buffer.next_seq
+
+    @property
+    def seconds_per_chunk(self) -> float:
+        return float(self.source.CHUNK) / self.source.SAMPLE_RATE
+
+    def _produce(self):
+        try:
+            while not self._stop_event.is_set():
+                chunk = self.source.stream.read(self.source.CHUNK)
+                if not chunk:
+                    break  # end of stream (replayed files)
+                self.buffer.append(chunk)
+                for monitor in self.monitors:
+                    monitor(chunk)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.buffer.close()
+
+    def _next_chunk(self) -> Optional[bytes]:
+        """The next chunk, or None once the buffer is closed and drained"""
+        seq, chunk = self.buffer.read(self._read_seq, timeout=self.read_timeout)
+        if chunk is None:
+            if not self.buffer.closed:
+                raise sr.WaitTimeoutError("audio device stopped delivering data")
+            return None
+        self._read_seq = seq + 1
+        return chunk
+
+    def listen(self, recognizer: sr.Recognizer, timeout: Optional[float] = None,
+               phrase_time_limit: Optional[float] = None,
+               on_chunk: Optional[Callable[[List[bytes]], bool]] = None) -> sr.AudioData:
+        """
+        Record a single phrase from the buffered stream into an AudioData.
+        Uses the recognizer's energy_threshold, pause_threshold, phrase_threshold
+        and non_speaking_duration, and raises sr.WaitTimeoutError if no phrase
+        starts within `timeout` seconds of audio. Once the stream has ended
+        (or the device failed) it raises AudioStreamEnded instead of waiting;
+        a phrase cut short by the end is still returned first.
+
+        `on_chunk` is called with the phrase recorded so far after every chunk;
+        if it returns True the phrase ends immediately (streaming recognition).
+        """
+        seconds_per_chunk = self.seconds_per_chunk
+        pause_chunk_count = int(math.ceil(recognizer.pause_threshold / seconds_per_chunk))
+        phrase_chunk_count = int(math.ceil(recognizer.phrase_threshold / seconds_per_chunk))
+        non_speaking_chunk_count = int(math.ceil(recognizer.non_speaking_duration / seconds_per_chunk))
+        sample_width = self.source.SAMPLE_WIDTH
+
+        elapsed_time = 0.0
+        while True:
+            frames = []
+
+            # Keep a short pre-roll of non-speaking audio until the phrase starts
+            while True:
+                elapsed_time += seconds_per_chunk
+                if timeout and elapsed_time > timeout:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                chunk = self._next_chunk()
+                if chunk is None:
+                    if self.error is not None:
+                        raise AudioStreamEnded(f"audio device failed: {self.error}") from self.error
+                    raise AudioStreamEnded("audio stream ended")
+                frames.append(chunk)
+                if len(frames) > non_speaking_chunk_count:
+                    frames.pop(0)
+                if rms(chunk, sample_width) > recognizer.energy_threshold:
+                    self.last_speech_at = time.monotonic()
+                    break
+
+            # Record until the speaker pauses, the phrase limit is hit or on_chunk is satisfied
+            pause_count, phrase_count = 0, 0
+            stopped_early = False
+            phrase_start_time = elapsed_time
+            while True:
+                elapsed_time += seconds_per_chunk
+                if phrase_time_limit and elapsed_time - phrase_start_time > phrase_time_limit:
+                    break
+                chunk = self._next_chunk()
+                if chunk is None:
+                    break
+                frames.append(chunk)
+                phrase_count += 1
+                if rms(chunk, sample_width) > recognizer.energy_threshold:
+                    self.last_speech_at = time.monotonic()
+                    pause_count = 0
+                else:
+                    pause_count += 1
+                if pause_count > pause_chunk_count:
+                    break
+                if on_chunk is not None and on_chunk(frames):
+                    stopped_early = True
+                    break
+
+            phrase_count -= pause_count
+            if stopped_early or phrase_count >= phrase_chunk_count or chunk is None:
+                break
+
+        # Drop the trailing pause but keep non_speaking_duration worth of it
+        for _ in range(pause_count - non_speaking_chunk_count):
+            frames.pop()
+        return sr.AudioData(b"".join(frames), self.source.SAMPLE_RATE, sample_width)
+
+
+class WavAudioSource(sr.AudioSource):
+    """
+    Replays a mono WAV file as if it were a microphone. With realtime=True
+    reads are paced to the sample rate, like a live device. Optional trailing
+    silence mimics a microphone that keeps running after the speaker stops.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 1024, realtime: bool = False,
+                 trailing_silence: float = 0.0):
+        self.path = path
+        self.CHUNK = chunk_size
+        self.realtime = realtime
+        self.trailing_silence = trailing_silence
+        self.SAMPLE_RATE = None
+        self.SAMPLE_WIDTH = None
+        self.stream = None
+        self._wav = None
+
+    def __enter__(self) -> "WavAudioSource":
+        self._wav = wave.open(self.path, "rb")
+        if self._wav.getnchannels() != 1:
+            self._wav.close()
+            raise ValueError(f"{self.path}: only mono WAV files are supported")
+        self.SAMPLE_RATE = self._wav.getframerate()
+        self.SAMPLE_WIDTH = self._wav.getsampwidth()
+        self.stream = WavAudioSource.WavStream(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+        self.stream = None
+
+    class WavStream:
+        def __init__(self, source: "WavAudioSource"):
+            self.source = source
+            self.silence_left = int(source.trailing_silence * source.SAMPLE_RATE)
+            self.frames_read = 0
+            self.started_at = time.monotonic()
+
+        def read(self, size: int) -> bytes:
+            source = self.source
+            data = source._wav.readframes(size) if source._wav is not None else b""
+            frames = len(data) // source.SAMPLE_WIDTH
+            if frames < size and self.silence_left > 0:
+                pad = min(size - frames, self.silence_left)
+                self.silence_left -= pad
+                data += b"\x00" * (pad * source.SAMPLE_WIDTH)
+                frames += pad
+            self.frames_read += frames
+            if source.realtime and frames:
+                delay = self.started_at + self.frames_read / source.SAMPLE_RATE - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            return data
@@ -0,0 +1,198 @@
+#autoscroll.py
+"""
+Hands-free autoscroll
+Advances to the next post on a schedule while voice commands keep being
+handled. The dwell time on each post adapts to its content: longer when the
+current post is playing a video (its pixels keep changing), shorter for
+static images, divided by the current speed.
+
+The scroller has no thread of its own. The command pipeline's dispatch loop
+calls `tick` whenever no command is waiting, so scrolling and input stay on
+one thread, and each advance is cancelled between scroll steps as soon as a
+command arrives ("stop" is acted on within one step).
+
+Dwell choice and the latency of a "stop" said mid-scroll, on a synthetic feed:
+    python autoscroll.py
+"""
+
+import time
+from typing import Callable, Optional
+
+
+class AutoScroller:
+    """
+    `advance(cancel)` moves to the next post and returns whether that post
+    is a video (or None when the advance was cancelled before finishing).
+    """
+
+    def __init__(self, advance: Callable[[Callable[[], bool]], Optional[bool]],
+                 image_dwell: float = 3.0, video_dwell: float = 8.0, speed_step: float = 1.5,
+                 min_speed: float = 0.25, max_speed: float = 4.0, clock: Callable[[], float] = time.monotonic):
+        self.advance = advance
+        self.image_dwell = image_dwell
+        self.video_dwell = video_dwell
+        self.speed_step = speed_step
+        self.min_speed = min_speed
+        self.max_speed = max_speed
+        self.clock = clock
+        self.speed = 1.0
+        self.active = False
+        self.next_at: Optional[float] = None
+        self.current_is_video = False
+        self.advances = 0
+
+    def dwell(self) -> float:
+        """Seconds to stay on the current post at the current speed"""
+        base = self.video_dwell if self.current_is_video else self.image_dwell
+        return base / self.speed
+
+    def start(self):
+        """Begin (or resume) autoscrolling; the first advance follows one dwell"""
+        self.active = True
+        self.postpone()
+
+    def pause(self):
+        self.active = False
+        self.next_at = None
+
+    def faster(self):
+        self.speed = min(self.max_speed, self.speed * self.speed_step)
+        self.postpone()
+
+    def slower(self):
+        self.speed = max(self.min_speed, self.speed / self.speed_step)
+        self.postpone()
+
+    def postpone(self):
+        """Restart the dwell timer (call after any manual scroll)"""
+        if self.active:
+            self.next_at = self.clock() + self.dwell()
+
+    def due_in(self) -> Optional[float]:
+        """Seconds until the next advance, or None when not autoscrolling"""
+        if not self.active or self.next_at is None:
+            return None
+        return max(0.0, self.next_at - self.clock())
+
+    def tick(self, cancel: Callable[[], bool]) -> bool:
+        """Advance if the dwell has elapsed; returns True when the page moved"""
+        if self.due_in() != 0.0:
+            return False
+        is_video = self.advance(cancel)
+        if is_video is None:
+            return False  # Cancelled by a command; it decides what happens next
+        self.current_is_video = is_video
+        self.advances += 1
+        self.postpone()
+        return True
+
+
+def main():
+    """
+    Autoscroll a synthetic feed (every third post a playing video) through the
+    real pipeline: check that the dwell follows the content, then time a
+    spoken "stop" that arrives while a next-post scroll is in progress
+    """
+    import threading
+
+    from command_matcher import CommandMatcher
+    from command_pipeline import CommandPipeline, Phrase
+    from input_backend import RecordingBackend
+    from post_locator import PostLocator
+    from screen_capture import ScreenCapture
+    from scroll_feedback import NextPostScroller, ScrollingFeed
+    from video_detector_demo import VideoPlayerDetector
+
+    class FakeController:
+        """Minimal controller: scripted phrases, a synthetic feed and a recording backend"""
+
+        def __init__(self, stop_after: int, stop_delay: float):
+            self.feed = ScrollingFeed(posts=40, playing=range(1, 40, 3))
+            self.input = RecordingBackend(on_scroll=self.feed.scroll, pause=0.05)  # Mimic pyautogui.PAUSE
+            self.is_running = True
+            self.stop_after = stop_after    # "stop" is said during this many-th advance (1-based) ...
+            self.stop_delay = stop_delay    # ... this long after it started
+            self.script = ["auto"]
+            self.advancing = threading.Event()
+            self.advance_started = 0.0
+            self.stop_heard_at = None
+            self.stop_offset = None         # Seconds into the interrupted scroll when "stop" was said
+            self.stopped_at = None
+            self.dwell_checks = []  # (detected as video, post in the middle really is a video)
+            screen = ScreenCapture(self.feed, scale=0.25)
+            detector = VideoPlayerDetector()
+            self.scroller = NextPostScroller(self.input, screen, detector, settle_timeout=0.1)
+            self.locator = PostLocator(screen, detector)
+            self.autoscroller = AutoScroller(self.advance, image_dwell=0.2, video_dwell=0.4)
+            self.repeatable_actions = ()
+            self.matcher = CommandMatcher({"auto": self.autoscroller.start, "stop": self.stop_session})
+
+        def advance(self, cancel):
+            # Same steps as InstagramVoiceController._auto_advance
+            self.advance_started = time.monotonic()
+            self.advancing.set()
+            try:
+                self.scroller.next_post(-1, cancel)
+            finally:
+                self.advancing.clear()
+            if cancel():
+                return None
+            self.locator.invalidate()
+            post = self.locator.current_post()
+            is_video = False if post is None else self.locator.is_playing(post, cancel=cancel)
+            if is_video is not None:
+                self.dwell_checks.append((is_video, self.feed.post_at(self.feed.height / 2) in self.feed.playing))
+            return is_video
+
+        def capture_phrase(self):
+            if self.script:
+                return Phrase(None, self.script.pop(), time.monotonic())
+            if self.stop_heard_at is None and self.autoscroller.advances + 1 >= self.stop_after \
+                    and self.advancing.is_set() and time.monotonic() >= self.advance_started + self.stop_delay:
+                self.stop_heard_at = time.monotonic()
+                self.stop_offset = self.stop_heard_at - self.advance_started
+                return Phrase(None, "stop", self.stop_heard_at)
+            time.sleep(0.005)
+            return None
+
+        def transcribe(self, phrase):
+            return phrase.transcript
+
+        def match_commands(self, text):
+            return self.matcher.match_all(text)
+
+        def report_unknown_command(self, text):
+            print(f"Unknown command: '{text}'")
+
+        def stop_session(self):
+            self.stopped_at = time.monotonic()
+            self.is_running = False
+
+        def execute(self, command):
+            command.action()
+
+    latencies, checks = [], []
+    for run in range(5):
+        controller = FakeController(stop_after=4 + run, stop_delay=0.01 + 0.02 * run)
+        pipeline = CommandPipeline(controller, queue_size=4, poll_interval=0.05)
+        thread = threading.Thread(target=pipeline.run)
+        thread.start()
+        thread.join(timeout=20)
+        if controller.stopped_at is None:
+            pipeline.stop_event.set()
+            thread.join()
+            print(f"run {run + 1}: stop was never acted on")
+            continue
+        latency = (controller.stopped_at - controller.stop_heard_at) * 1000
+        latencies.append(latency)
+        checks.extend(controller.dwell_checks)
+        videos = sum(detected for detected, _ in controller.dwell_checks)
+        print(f"run {run + 1}: {controller.autoscroller.advances} posts advanced ({videos} as video), "
+              f"stop said {controller.stop_offset * 1000:.0f} ms into a scroll, acted on after {latency:.0f} ms")
+    correct = sum(detected == truth for detected, truth in checks)
+    print(f"Video/image dwell chosen correctly for {correct}/{len(checks)} posts")
+    print(f"Worst stop latency: {max(latencies):.0f} ms (target 200 ms)")
+
+
+if __name__ == "__main__":
+    main()
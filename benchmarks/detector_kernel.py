@@ -0,0 +1,134 @@
+#benchmarks/detector_kernel.py
+"""
+Detection kernel parity and speed
+Runs the current VideoPlayerDetector kernel (threshold-based value mask,
+reused scratch buffers, bounding boxes filtered in one NumPy pass) and the
+original HSV + findContours kernel over a fixture set, checks that both
+find the same rectangles and reports the speedup.
+
+    python benchmarks/detector_kernel.py [frames_dir]
+
+Without a directory a synthetic fixture set is generated.
+"""
+
+import os
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_detector_demo import VideoPlayerDetector  # noqa: E402
+from video_tracker import load_frames  # noqa: E402
+
+
+def contour_detect(detector: VideoPlayerDetector, img: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """The original kernel: HSV conversion, inRange, two morphology passes, findContours"""
+    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+    mask = cv2.inRange(hsv, np.array([0, 0, 30]), np.array([180, 255, 255]))
+    kernel = np.ones((5, 5), np.uint8)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    rectangles = []
+    img_height, img_width = img.shape[:2]
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if w > 200 and h > 150 and 0.5 <= w / h <= 2.0:
+            if not detector._is_screen_border(x, y, w, h, img_width, img_height):
+                rectangles.append((x, y, w, h))
+    return rectangles
+
+
+def fixtures(seed: int = 0) -> Dict[str, np.ndarray]:
+    """Layouts that exercise the filters: feeds, light mode, letterboxing, nested islands, noise"""
+    rng = np.random.default_rng(seed)
+    frames = {}
+
+    def page(width=1920, height=1080, level=10):
+        return np.full((height, width, 3), level, np.uint8)
+
+    frame = page()
+    frame[150:870, 640:1280] = (180, 120, 90)
+    frames["single_post"] = frame
+
+    frame = page()
+    for i, x in enumerate((100, 760, 1420)):
+        frame[200:620, x:x + 400] = rng.integers(40, 255, 3, dtype=np.uint8)
+    frames["three_posts"] = frame
+
+    frame = page(level=235)  # Light mode: the whole page is one non-black region
+    frame[200:800, 600:1300] = 0
+    frame[260:740, 660:1240] = (90, 160, 220)  # Island inside a black hole of the page
+    frames["light_mode_island"] = frame
+
+    frame = page()
+    frame[100:900, 500:1400] = 200
+    frame[300:700, 700:1200] = 0
+    frame[350:650, 750:1150] = 120  # Player nested inside a card
+    frames["nested_card"] = frame
+
+    frame = page()
+    frame[150:870, 640:1280] = 0
+    frame[330:690, 640:1280] = (30, 200, 30)  # Letterboxed video
+    frame[rng.integers(0, 1080, 4000), rng.integers(0, 1920, 4000)] = 255  # Speckle noise
+    frames["letterbox_noise"] = frame
+
+    frame = page()
+    frame[0:1080, 0:300] = 80    # Sidebar touching two edges
+    frame[100:700, 900:1500] = 160
+    frame[20:300, 1700:1920] = 90  # Too small / at the edge
+    frames["sidebar"] = frame
+
+    frame = np.ascontiguousarray(np.tile(page(), (2, 2, 1)))
+    frame[400:1700, 1300:2500] = (50, 90, 200)
+    frames["4k_post"] = frame
+
+    frames["noise"] = rng.integers(0, 60, (1080, 1920, 3), dtype=np.uint8)
+    return frames
+
+
+def main():
+    if len(sys.argv) > 1:
+        frames = {f"frame_{i:04d}": frame for i, frame in enumerate(load_frames(sys.argv[1]))}
+    else:
+        frames = fixtures()
+
+    detector = VideoPlayerDetector()
+    reference = VideoPlayerDetector()
+    repeats = 10
+    mismatches = 0
+    old_total = new_total = 0.0
+    print(f"{'fixture':<20} {'size':>10} {'old ms':>8} {'new ms':>8} {'speedup':>8}  match")
+    for name, frame in frames.items():
+        expected = contour_detect(reference, frame)
+        actual = detector.detect_video_players(frame)
+        match = sorted(expected) == sorted(actual)
+        mismatches += not match
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            contour_detect(reference, frame)
+        old = (time.perf_counter() - start) / repeats
+        start = time.perf_counter()
+        for _ in range(repeats):
+            detector.detect_video_players(frame)
+        new = (time.perf_counter() - start) / repeats
+        old_total += old
+        new_total += new
+
+        size = f"{frame.shape[1]}x{frame.shape[0]}"
+        print(f"{name:<20} {size:>10} {old * 1000:>8.2f} {new * 1000:>8.2f} {old / new:>7.1f}x  "
+              f"{'yes' if match else f'NO {expected} vs {actual}'}")
+
+    print(f"\nTotal: {old_total * 1000:.1f} ms -> {new_total * 1000:.1f} ms ({old_total / new_total:.1f}x), "
+          f"{len(frames) - mismatches}/{len(frames)} fixtures match")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#benchmarks/fakes.py
+"""
+Headless stand-ins for the microphone, mss and pyautogui
+They replay recorded (or synthetic) fixtures through the controller's real
+code paths: FakeMicrophone is an sr.AudioSource over a sequence of command
+clips, FakeMss serves a frame sequence like an mss session, FakePyAutoGUI
+records input the way the pyautogui module would receive it, and
+ReplayBackend stands in for the Google Web Speech API.
+"""
+
+import contextlib
+import glob
+import os
+import sys
+import time
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import speech_recognition as sr
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recognizers import RecognizerBackend  # noqa: E402
+from vad import EnergyVAD, read_wav, synthetic_fixtures  # noqa: E402
+
+if TYPE_CHECKING:
+    from mss.screenshot import ScreenShot
+
+Clip = Tuple[str, np.ndarray]  # (transcript, int16 samples)
+
+
+class FakeMicrophone(sr.AudioSource):
+    """
+    Plays command clips separated by silence as a 16-bit mono microphone.
+    Reads are paced at `speedup` times real time so the audio ring buffer
+    is consumed the way it would be live (an unpaced source would overrun it).
+    """
+
+    def __init__(self, clips: Sequence[Clip], sample_rate: int = 16000, chunk_size: int = 1024,
+                 gap: float = 1.2, speedup: float = 8.0, noise_level: float = 40.0, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        silence = int(gap * sample_rate)
+        parts = []
+        self.clip_ends: List[float] = []  # Seconds into the stream where each clip ends
+        for _, samples in clips:
+            parts.extend((rng.normal(0, noise_level, silence).astype(np.int16), samples))
+            self.clip_ends.append(sum(part.size for part in parts) / sample_rate)
+        parts.append(rng.normal(0, noise_level, 2 * silence).astype(np.int16))
+        self.samples = np.concatenate(parts)
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = chunk_size
+        self.speedup = speedup
+        self.stream = None
+
+    @property
+    def duration(self) -> float:
+        return self.samples.size / self.SAMPLE_RATE
+
+    def __enter__(self) -> "FakeMicrophone":
+        self.stream = FakeMicrophone.Stream(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+    class Stream:
+        def __init__(self, source: "FakeMicrophone"):
+            self.source = source
+            self.position = 0
+            self.started_at = time.monotonic()
+
+        def read(self, size: int) -> bytes:
+            source = self.source
+            data = source.samples[self.position:self.position + size]
+            self.position += data.size
+            if data.size:
+                delay = self.started_at + self.position / source.SAMPLE_RATE / source.speedup - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            return data.tobytes()
+
+
+class FakeMss:
+    """mss session over a sequence of frames; every grab advances to the next frame (looping)"""
+
+    def __init__(self, frames: Sequence[np.ndarray]):
+        import cv2  # Vision fakes load OpenCV themselves, so the audio fakes stay light for startup timing
+        self.frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA) if frame.shape[2] == 3 else frame
+                       for frame in frames]
+        height, width = self.frames[0].shape[:2]
+        monitor = {"left": 0, "top": 0, "width": width, "height": height}
+        self.monitors = [monitor, monitor]
+        self.grabs = 0
+
+    def grab(self, monitor: dict) -> "ScreenShot":
+        from mss.screenshot import ScreenShot
+        frame = self.frames[self.grabs % len(self.frames)]
+        self.grabs += 1
+        crop = frame[monitor["top"]:monitor["top"] + monitor["height"],
+                     monitor["left"]:monitor["left"] + monitor["width"]]
+        return ScreenShot(bytearray(crop.tobytes()), monitor)
+
+    def close(self):
+        pass
+
+
+class FakePyAutoGUI:
+    """Module-shaped recorder for the pyautogui calls the input backend makes"""
+
+    def __init__(self, screen_size: Tuple[int, int] = (1920, 1080)):
+        self.FAILSAFE = True
+        self.PAUSE = 0.1
+        self.screen_size = screen_size
+        self.events: List[Tuple[str, tuple]] = []
+
+    def size(self) -> Tuple[int, int]:
+        return self.screen_size
+
+    def position(self) -> Tuple[int, int]:
+        return self.screen_size[0] // 2, self.screen_size[1] // 2
+
+    def scroll(self, clicks: int, **kwargs):
+        self.events.append(("scroll", (clicks,)))
+        self._pause(kwargs)
+
+    def doubleClick(self, x: int, y: int, **kwargs):
+        self.events.append(("doubleClick", (x, y)))
+        self._pause(kwargs)
+
+    def _pause(self, kwargs):
+        if kwargs.get("_pause", True) and self.PAUSE:
+            time.sleep(self.PAUSE)
+
+
+class ReplayBackend(RecognizerBackend):
+    """Returns the fixture transcripts in order, after an optional simulated network round trip"""
+
+    name = "replay"
+
+    def __init__(self, transcripts: Sequence[str], latency: float = 0.0):
+        self.transcripts = list(transcripts)
+        self.latency = latency
+        self.calls = 0
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        if self.calls >= len(self.transcripts):
+            raise sr.UnknownValueError()
+        self.calls += 1
+        return self.transcripts[self.calls - 1]
+
+
+@contextlib.contextmanager
+def patched_devices(microphone: FakeMicrophone, screen: FakeMss, pyautogui: FakePyAutoGUI) -> Iterator[None]:
+    """Route sr.Microphone, mss.mss and the pyautogui module to the fakes while the block runs"""
+    import mss
+
+    saved = (sr.Microphone, mss.mss, sys.modules.get("pyautogui"))
+    sr.Microphone = lambda *args, **kwargs: microphone
+    mss.mss = lambda *args, **kwargs: screen
+    sys.modules["pyautogui"] = pyautogui
+    try:
+        yield
+    finally:
+        sr.Microphone, mss.mss = saved[0], saved[1]
+        if saved[2] is None:
+            sys.modules.pop("pyautogui", None)
+        else:
+            sys.modules["pyautogui"] = saved[2]
+
+
+def load_clips(audio_dir: Optional[str]) -> List[Clip]:
+    """
+    Command clips from `<audio_dir>/<transcript>-<n>.wav` (underscores in the
+    transcript become spaces, e.g. scroll_down-1.wav); without a directory,
+    synthetic speech-like clips labelled with a fixed command script.
+    """
+    if audio_dir:
+        clips = []
+        for path in sorted(glob.glob(os.path.join(audio_dir, "*.wav"))):
+            samples, rate = read_wav(path)
+            if rate != 16000:
+                raw = sr.AudioData(samples.tobytes(), rate, 2).get_raw_data(convert_rate=16000)
+                samples = np.frombuffer(raw, np.int16)
+            transcript = os.path.basename(path).rsplit("-", 1)[0].replace("_", " ")
+            clips.append((transcript, samples))
+        return clips
+    script = ["scroll", "down", "up", "like", "scroll down", "down", "scroll up", "like"]
+    # Keep clips with at least 0.4 s of voicing; shorter ones fall under the recognizer's phrase_threshold
+    vad = EnergyVAD()
+    speech = [samples for _, samples in synthetic_fixtures(count=40)["speech"]
+              if vad.voiced_frames(samples, 16000, 300.0).sum() * vad.hop_ms >= 400]
+    return [(script[i % len(script)], samples) for i, samples in enumerate(speech[:16])]
+
+
+def load_screen_frames(frames_dir: Optional[str]) -> List[np.ndarray]:
+    """BGR frames from a directory of .png/.npy files, or a synthetic feed sequence"""
+    from video_tracker import load_frames, synthetic_sequence
+    if frames_dir:
+        return load_frames(frames_dir)
+    frames, _ = synthetic_sequence(count=60)
+    return frames
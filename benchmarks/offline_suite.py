@@ -0,0 +1,222 @@
+#benchmarks/offline_suite.py
+"""
+Offline benchmark suite
+Replays command clips and screen frames through the controller's real code
+paths (listen_for_command, process_command, capture_screen and
+detect_video_players) with the fakes from benchmarks/fakes.py, and times a
+burst of scroll commands against a recording input backend, so it runs on
+a headless box with no microphone, display or network. Results are compared
+with stored baselines and the run fails when a metric regresses by more
+than the tolerance.
+
+    python benchmarks/offline_suite.py [--audio DIR] [--frames DIR] [--save-baseline]
+
+--audio takes <transcript>-<n>.wav clips and --frames a directory of
+.png/.npy frames; synthetic fixtures are used for whichever is missing.
+Baselines are machine specific: save them on the machine that runs the
+comparison.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakes import (FakeMicrophone, FakeMss, FakePyAutoGUI, ReplayBackend, load_clips,  # noqa: E402
+                   load_screen_frames, patched_devices)
+from input_backend import RecordingBackend  # noqa: E402
+import instrumentation  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+VOICE_STAGES = ("vad", "recognition", "match", "action", "input")
+
+
+def _percentiles(values: List[float], prefix: str) -> Dict[str, float]:
+    p50, p95 = np.percentile(values, (50, 95))
+    return {f"{prefix}_p50_ms": float(p50), f"{prefix}_p95_ms": float(p95)}
+
+
+def make_controller(microphone: FakeMicrophone, screen: FakeMss, pyautogui: FakePyAutoGUI):
+    """A real InstagramVoiceController wired to the fakes"""
+    with patched_devices(microphone, screen, pyautogui):
+        import instascroller
+        with contextlib.redirect_stdout(io.StringIO()):
+            controller = instascroller.InstagramVoiceController()
+    if controller.noise_estimator is not None:
+        controller.noise_estimator.profile_path = None  # Never overwrite the user's noise profile
+    return controller
+
+
+def voice_loop(clips, speedup: float, recognition_latency: float) -> Dict[str, float]:
+    """Commands executed, realtime factor and per-stage latency through listen_for_command/process_command"""
+    microphone = FakeMicrophone(clips, speedup=speedup)
+    screen = FakeMss(load_screen_frames(None)[:1])
+    pyautogui = FakePyAutoGUI()
+    controller = make_controller(microphone, screen, pyautogui)
+    controller.backend = ReplayBackend([transcript for transcript, _ in clips], latency=recognition_latency)
+    recorder = instrumentation.configure(enabled=True)
+
+    executed = 0
+    started = time.monotonic()
+    with patched_devices(microphone, screen, pyautogui), contextlib.redirect_stdout(io.StringIO()):
+        controller.start_audio_stream()
+        try:
+            while not controller.audio_stream.exhausted:
+                command = controller.listen_for_command()
+                if command and controller.process_command(command):
+                    executed += 1
+        finally:
+            controller.stop_audio_stream()
+    elapsed = time.monotonic() - started
+
+    summary = recorder.summary()
+    # Audio is paced at `speedup`, so the realtime factor only drops below it when the loop falls behind
+    metrics = {"voice_commands_executed": float(executed),
+               "voice_realtime_factor": microphone.duration / elapsed}
+    for stage in VOICE_STAGES:
+        if stage in summary:
+            metrics[f"voice_{stage}_p50_ms"] = summary[stage]["p50"]
+            metrics[f"voice_{stage}_p95_ms"] = summary[stage]["p95"]
+    print(f"Voice loop: {executed}/{len(clips)} commands executed from {microphone.duration:.1f} s of audio "
+          f"in {elapsed:.1f} s (replayed at {speedup:g}x)")
+    recorder.report()
+    instrumentation.configure(enabled=False)
+    return metrics
+
+
+def detector_loop(frames, repeats: int = 3) -> Dict[str, float]:
+    """
+    Frames per second and per-frame latency through capture_screen +
+    detect_video_players, timed on the detector itself (not the FrameCache in
+    front of it, whose hits would hide a slower detector), plus the cache's
+    hit rate and latency with every frame captured twice, as on a still page
+    """
+    screen = FakeMss(frames)
+    controller = make_controller(FakeMicrophone([]), screen, FakePyAutoGUI())
+    with patched_devices(FakeMicrophone([]), screen, FakePyAutoGUI()):
+        cached = controller.post_locator.detector
+        detector = getattr(cached, "detector", cached)
+        full, scaled, through_cache = [], [], []
+        for _ in range(repeats):
+            for _ in frames:
+                start = time.perf_counter()
+                detector.detect_video_players(controller.capture_screen())
+                full.append((time.perf_counter() - start) * 1000)
+            for _ in frames:
+                controller.screen.reset_roi()
+                start = time.perf_counter()
+                controller.screen.detect(detector)
+                scaled.append((time.perf_counter() - start) * 1000)
+        if cached is not detector:
+            cached.clear()
+            cached.hits = cached.misses = 0
+            for _ in range(repeats):
+                for _ in frames:
+                    frame = controller.capture_screen()
+                    for _ in range(2):
+                        start = time.perf_counter()
+                        cached.detect_video_players(frame)
+                        through_cache.append((time.perf_counter() - start) * 1000)
+
+    height, width = frames[0].shape[:2]
+    metrics = {"detector_full_fps": 1000 / float(np.mean(full)), "detector_scaled_fps": 1000 / float(np.mean(scaled))}
+    metrics.update(_percentiles(full, "detector_full"))
+    metrics.update(_percentiles(scaled, "detector_scaled"))
+    print(f"\nDetector: {len(frames)} frames ({width}x{height}) x {repeats}")
+    print(f"  capture_screen + detect_video_players: {metrics['detector_full_fps']:.1f} fps, "
+          f"p50 {metrics['detector_full_p50_ms']:.2f} ms, p95 {metrics['detector_full_p95_ms']:.2f} ms")
+    print(f"  downscaled ScreenCapture.detect:       {metrics['detector_scaled_fps']:.1f} fps, "
+          f"p50 {metrics['detector_scaled_p50_ms']:.2f} ms, p95 {metrics['detector_scaled_p95_ms']:.2f} ms")
+    if through_cache:
+        metrics["frame_cache_hit_rate"] = cached.hits / max(1, cached.hits + cached.misses)
+        metrics.update(_percentiles(through_cache, "frame_cache"))
+        print(f"  through the frame cache:               {metrics['frame_cache_hit_rate']:.0%} hits, "
+              f"p50 {metrics['frame_cache_p50_ms']:.2f} ms, p95 {metrics['frame_cache_p95_ms']:.2f} ms")
+    return metrics
+
+
+def burst_loop(repeats: int = 10) -> Dict[str, float]:
+    """The same scrolls said as separate phrases and as one transcript, through process_command"""
+    controller = make_controller(FakeMicrophone([]), FakeMss(load_screen_frames(None)[:1]), FakePyAutoGUI())
+    pause = controller.input.pyautogui.PAUSE
+    print(f"\nBurst: {repeats} x 'down' with a {pause * 1000:.0f} ms input pause")
+    metrics = {}
+    for name, transcripts in (("separate", ["down"] * repeats), ("burst", [" ".join(["down"] * repeats)])):
+        controller.input = RecordingBackend(pause=pause)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for transcript in transcripts:
+                controller.process_command(transcript)
+        elapsed = (time.perf_counter() - start) * 1000
+        events = controller.input.events
+        offsets = ", ".join(f"{(event.timestamp - events[0].timestamp) * 1000:.0f}" for event in events)
+        clicks = sum(event.args[0] for event in events)
+        print(f"  {name:<9} {elapsed:>7.1f} ms, {len(events)} scroll event(s), {clicks} clicks, sent at [{offsets}] ms")
+        metrics[f"{name}_scroll_ms"] = elapsed
+    return {"burst_scroll_ms": metrics["burst_scroll_ms"]}
+
+
+def compare(metrics: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """Names of metrics that are worse than the baseline by more than `tolerance`"""
+    print(f"\n{'metric':<32} {'baseline':>10} {'current':>10} {'change':>8}")
+    regressions = []
+    for name, value in metrics.items():
+        if name not in baseline:
+            continue
+        reference = baseline[name]
+        change = (value - reference) / reference if reference else 0.0
+        lower_is_better = name.endswith("_ms")
+        worse = change > tolerance if lower_is_better else change < -tolerance
+        # Sub-millisecond stages are dominated by scheduler noise; only flag them past an absolute margin too
+        if worse and lower_is_better and value - reference < 1.0:
+            worse = False
+        if worse:
+            regressions.append(name)
+        print(f"{name:<32} {reference:>10.2f} {value:>10.2f} {change:>+8.0%}{'  REGRESSION' if worse else ''}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--audio", help="directory of <transcript>-<n>.wav command clips")
+    parser.add_argument("--frames", help="directory of .png/.npy screen frames")
+    parser.add_argument("--speedup", type=float, default=8.0, help="audio replay speed (x real time)")
+    parser.add_argument("--recognition-latency", type=float, default=0.0,
+                        help="simulated recognizer round trip in seconds")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed relative regression")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    args = parser.parse_args(argv)
+
+    metrics = voice_loop(load_clips(args.audio), args.speedup, args.recognition_latency)
+    metrics.update(detector_loop(load_screen_frames(args.frames)))
+    metrics.update(burst_loop())
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(metrics, f, indent=2, sort_keys=True)
+        print(f"\nSaved baseline to {BASELINE_PATH}")
+        return 0
+    if not os.path.exists(BASELINE_PATH):
+        print("\nNo baseline stored yet (run with --save-baseline)")
+        return 0
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)
+    regressions = compare(metrics, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
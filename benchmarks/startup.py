@@ -0,0 +1,141 @@
+#benchmarks/startup.py
+"""
+Startup timing
+Launches instascroller in a fresh interpreter with a fake microphone and
+pyautogui, and measures the wall time from launch to the first "Listening
+for commands" line. The "eager" mode reproduces the old startup: the vision
+stack (OpenCV, mss and the detector modules) imported up front and the
+microphone opened before the rest of initialization instead of alongside it.
+Both modes load numpy at import (about 50 ms, through audio_stream, vad and
+recognizers), so the difference covers only OpenCV, mss, the detector
+modules and the microphone.
+
+    python benchmarks/startup.py [--runs 5] [--mic-open 0.3] [--input-import 0.15]
+
+--mic-open simulates PyAudio initialization and the device query and
+--input-import the import of pyautogui (pyscreeze, PIL, pymsgbox); both take
+a few hundred milliseconds on a real desktop. Each mode is timed both with a
+saved noise profile and on a first run that has to calibrate.
+"""
+
+import argparse
+import importlib.abc
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+import numpy as np
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+READY_LINE = "Listening for commands"
+
+
+class SlowImport(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    """Serves `module` for `import name` after `delay` seconds, like a package with a heavy import"""
+
+    def __init__(self, name: str, module, delay: float):
+        self.name = name
+        self.module = module
+        self.delay = delay
+
+    def find_spec(self, fullname, path, target=None):
+        return importlib.util.spec_from_loader(fullname, self) if fullname == self.name else None
+
+    def create_module(self, spec):
+        time.sleep(self.delay)
+        return self.module
+
+    def exec_module(self, module):
+        pass
+
+
+def child(eager: bool, mic_open: float, input_import: float):
+    """Runs in the launched interpreter: start the controller against the fakes"""
+    if eager:
+        import cv2  # noqa: F401
+        import mss  # noqa: F401
+        import post_locator  # noqa: F401
+        import scroll_feedback  # noqa: F401
+    import speech_recognition as sr
+
+    sys.path.insert(0, BENCHMARKS_DIR)
+    from fakes import FakeMicrophone, FakePyAutoGUI, load_clips
+
+    def open_microphone(*args, **kwargs):
+        time.sleep(mic_open)  # PyAudio init and default device query
+        return FakeMicrophone(load_clips(None)[:2], speedup=1.0)
+
+    if eager:
+        microphone = open_microphone()
+        sr.Microphone = lambda *args, **kwargs: microphone
+    else:
+        sr.Microphone = open_microphone
+    sys.meta_path.insert(0, SlowImport("pyautogui", FakePyAutoGUI(), input_import))
+
+    import instascroller
+    instascroller.InstagramVoiceController().run()  # Killed by the parent once it is listening
+
+
+def time_to_listening(eager: bool, mic_open: float, input_import: float, profile_dir: str) -> float:
+    """Seconds from launch until the child prints the listening line"""
+    command = [sys.executable, "-u", os.path.abspath(__file__), "--child",
+               "--mic-open", str(mic_open), "--input-import", str(input_import)]
+    if eager:
+        command.append("--eager")
+    # The noise profile lives in the per-user config directory, so pointing that at profile_dir decides
+    # whether one exists
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(BENCHMARKS_DIR), XDG_CONFIG_HOME=profile_dir,
+               APPDATA=profile_dir)
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=profile_dir, env=env, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True)
+    try:
+        for line in process.stdout:
+            if READY_LINE in line:
+                return time.perf_counter() - started
+        raise RuntimeError(f"Controller exited with code {process.wait()} before listening")
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=5, help="launches per mode and scenario")
+    parser.add_argument("--mic-open", type=float, default=0.3, help="simulated microphone open time in seconds")
+    parser.add_argument("--input-import", type=float, default=0.15, help="simulated pyautogui import time in seconds")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--eager", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.eager, args.mic_open, args.input_import)
+        return 0
+
+    print(f"Launch to first \"{READY_LINE}\" (median of {args.runs}; microphone open {args.mic_open:g} s, "
+          f"pyautogui import {args.input_import:g} s)")
+    print(f"{'scenario':<24} {'eager':>9} {'lazy':>9} {'saved':>9}")
+    with tempfile.TemporaryDirectory() as first_run, tempfile.TemporaryDirectory() as profiled:
+        # One calibrating launch leaves a noise profile behind for the "saved profile" scenario
+        time_to_listening(False, args.mic_open, args.input_import, profiled)
+        for scenario, profile_dir in (("saved noise profile", profiled), ("first run (calibrates)", first_run)):
+            medians = {}
+            for eager in (True, False):
+                times = []
+                for _ in range(args.runs):
+                    times.append(time_to_listening(eager, args.mic_open, args.input_import, profile_dir))
+                    stale_profile = os.path.join(first_run, "instascroller", "noise_profile.json")
+                    if os.path.exists(stale_profile):
+                        os.remove(stale_profile)
+                medians[eager] = float(np.median(times))
+            print(f"{scenario:<24} {medians[True] * 1000:>7.0f}ms {medians[False] * 1000:>7.0f}ms "
+                  f"{(medians[True] - medians[False]) * 1000:>7.0f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
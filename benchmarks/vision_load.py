@@ -0,0 +1,221 @@
+#benchmarks/vision_load.py
+"""
+Vision load test
+Runs the real CommandPipeline with scripted "down"/"up" phrases next to a
+synthetic CPU-heavy detector (pure Python, so it holds the GIL the way an
+unoptimized detector would) and measures command latency, end of speech to
+action, in four setups:
+
+- no vision: the voice loop alone,
+- unscheduled: the detector in its own thread at the active frame rate,
+  competing with capture and recognition for the CPU,
+- scheduled: the detector as a VisionScheduler task, with a budget, an
+  adaptive frame rate and back-off against the latency target,
+- back-off: scheduled again with a target below the latency measured
+  without vision, so every command is slow, followed by a few quiet
+  seconds in which the scheduler should give vision its share back.
+
+The run fails when the scheduled p95 is not below the unscheduled one, when
+it is more than --margin-ms above the no-vision p95, or when the back-off
+setup never backed off or never recovered.
+
+    python benchmarks/vision_load.py [--duration 12] [--detect-ms 120] [--budget 0.25] [--target-ms 250] [--margin-ms 25]
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from command_matcher import CommandMatcher  # noqa: E402
+from command_pipeline import CommandPipeline, Phrase  # noqa: E402
+from scheduler import VisionScheduler  # noqa: E402
+
+
+def cpu_work(iterations: int) -> int:
+    """Pure-Python arithmetic; holds the GIL for its whole duration"""
+    total = 0
+    for i in range(iterations):
+        total += i * i % 7
+    return total
+
+
+def iterations_for(milliseconds: float) -> int:
+    """Loop count that takes `milliseconds` on this machine with nothing else running"""
+    probe = 200000
+    started = time.perf_counter()
+    cpu_work(probe)
+    return max(1, int(probe * milliseconds / 1000 / (time.perf_counter() - started)))
+
+
+class LoadController:
+    """
+    Scripted phrases (one every `spacing` seconds, with jitter), a recognizer
+    that spends `recognize_ms` of CPU plus `network` seconds of waiting, and
+    actions that only record their latency.
+    """
+
+    def __init__(self, duration: float, spacing: float, recognize_iterations: int, network: float,
+                 tail: float = 1.0, seed: int = 0):
+        rng = random.Random(seed)
+        self.script: List[float] = []
+        at = 0.5
+        while at < duration:
+            self.script.append(at)
+            at += spacing * rng.uniform(0.6, 1.4)
+        self.words = [rng.choice(("down", "down", "up")) for _ in self.script]
+        self.duration = duration
+        self.tail = tail  # Quiet seconds after the last phrase before the session stops
+        self.recognize_iterations = recognize_iterations
+        self.network = network
+        self.is_running = True
+        self.repeatable_actions = ()
+        self.matcher = CommandMatcher({"down": self.scroll, "up": self.scroll})
+        self.latencies: List[float] = []
+        self.scheduler: Optional[VisionScheduler] = None
+        self.started = time.monotonic()
+        self._next = 0
+
+    def capture_phrase(self) -> Optional[Phrase]:
+        # The audio path wakes every 10 ms, like a microphone chunk; a starved thread notices speech late
+        now = time.monotonic()
+        if now - self.started > self.duration + self.tail:
+            self.is_running = False
+        if self._next >= len(self.script) or now < self.started + self.script[self._next]:
+            time.sleep(0.01)
+            return None
+        ended_at = self.started + self.script[self._next]
+        word = self.words[self._next]
+        self._next += 1
+        return Phrase(None, word, ended_at)
+
+    def transcribe(self, phrase: Phrase) -> str:
+        cpu_work(self.recognize_iterations)
+        time.sleep(self.network)
+        return phrase.transcript
+
+    def match_commands(self, text: str):
+        return self.matcher.match_all(text)
+
+    def report_unknown_command(self, text: str):
+        print(f"Unknown command: '{text}'")
+
+    def scroll(self):
+        if self.scheduler is not None:
+            self.scheduler.activity()
+
+    def execute(self, command):
+        command.action()
+        latency = time.monotonic() - command.speech_ended_at
+        self.latencies.append(latency)
+        if self.scheduler is not None:
+            self.scheduler.observe_latency(latency)
+
+
+def run(mode: str, args, detect_iterations: int, recognize_iterations: int,
+        latency_target: float = 0.0) -> Dict[str, float]:
+    # The back-off setup ends with enough quiet time for two recovery steps
+    tail = 2.5 * args.recover_after if mode == "back-off" else 1.0
+    controller = LoadController(args.duration, args.spacing, recognize_iterations, args.network, tail)
+    frames = [0]
+
+    def detect():
+        cpu_work(detect_iterations)
+        frames[0] += 1
+
+    stop_vision = threading.Event()
+    vision_thread = None
+    if mode == "unscheduled":
+        def vision_loop():
+            while not stop_vision.is_set():
+                started = time.monotonic()
+                detect()
+                stop_vision.wait(max(0.0, 1.0 / args.active_fps - (time.monotonic() - started)))
+        vision_thread = threading.Thread(target=vision_loop, name="vision", daemon=True)
+        vision_thread.start()
+    elif mode in ("scheduled", "back-off"):
+        controller.scheduler = VisionScheduler(detect, budget=args.budget, active_fps=args.active_fps,
+                                               idle_fps=args.idle_fps, latency_target=latency_target,
+                                               recover_after=args.recover_after)
+
+    started = time.monotonic()
+    CommandPipeline(controller, queue_size=4, poll_interval=0.05).run()
+    elapsed = time.monotonic() - started
+    stop_vision.set()
+    if vision_thread is not None:
+        vision_thread.join()
+
+    latencies = np.array(controller.latencies) * 1000
+    p50, p95 = np.percentile(latencies, (50, 95))
+    result = {"commands": len(latencies), "p50": float(p50), "p95": float(p95), "max": float(latencies.max()),
+              "fps": frames[0] / elapsed}
+    if controller.scheduler is not None:
+        result["backoffs"] = controller.scheduler.backoffs
+        result["recoveries"] = controller.scheduler.recoveries
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--duration", type=float, default=12.0, help="seconds of scripted commands per setup")
+    parser.add_argument("--spacing", type=float, default=0.4, help="mean seconds between phrases")
+    parser.add_argument("--detect-ms", type=float, default=120.0, help="CPU cost of one synthetic detection")
+    parser.add_argument("--recognize-ms", type=float, default=20.0, help="CPU cost of recognizing one phrase")
+    parser.add_argument("--network", type=float, default=0.1, help="recognizer round trip spent waiting, seconds")
+    parser.add_argument("--budget", type=float, default=0.25, help="share of each second vision may take")
+    parser.add_argument("--active-fps", type=float, default=30.0, help="frame rate while scrolling")
+    parser.add_argument("--idle-fps", type=float, default=1.0, help="frame rate while the page is still")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="the scheduler's command latency target")
+    parser.add_argument("--margin-ms", type=float, default=25.0,
+                        help="how far the scheduled p95 may be above the no-vision p95")
+    parser.add_argument("--recover-after", type=float, default=1.0,
+                        help="seconds without a slow command before the scheduler recovers a step")
+    args = parser.parse_args(argv)
+
+    detect_iterations = iterations_for(args.detect_ms)
+    recognize_iterations = iterations_for(args.recognize_ms)
+    print(f"Synthetic detector {args.detect_ms:g} ms of CPU per frame, recognition {args.recognize_ms:g} ms "
+          f"of CPU + {args.network * 1000:.0f} ms round trip, a phrase every ~{args.spacing:g} s")
+    print(f"{'setup':<12} {'commands':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'vision fps':>11}")
+    results = {}
+    for mode in ("no vision", "unscheduled", "scheduled", "back-off"):
+        if mode == "back-off":
+            target = results["no vision"]["p50"] / 2 / 1000  # Below what even the voice loop alone achieves
+        else:
+            target = args.target_ms / 1000
+        result = results[mode] = run(mode, args, detect_iterations, recognize_iterations, target)
+        extra = ""
+        if "backoffs" in result:
+            extra = (f"   target {target * 1000:.0f} ms, backed off {result['backoffs']} times, "
+                     f"recovered {result['recoveries']}")
+        print(f"{mode:<12} {result['commands']:>8} {result['p50']:>8.0f} {result['p95']:>8.0f} "
+              f"{result['max']:>8.0f} {result['fps']:>11.1f}{extra}")
+
+    failures = []
+    scheduled, unscheduled, alone = (results[mode]["p95"] for mode in ("scheduled", "unscheduled", "no vision"))
+    if scheduled >= unscheduled:
+        failures.append(f"scheduled p95 {scheduled:.0f} ms is not below the unscheduled {unscheduled:.0f} ms")
+    if scheduled > alone + args.margin_ms:
+        failures.append(f"scheduled p95 {scheduled:.0f} ms is more than {args.margin_ms:g} ms above "
+                        f"the no-vision {alone:.0f} ms")
+    if results["back-off"]["backoffs"] == 0:
+        failures.append("the scheduler never backed off from a target below the measured latency")
+    if results["back-off"]["recoveries"] == 0:
+        failures.append("the scheduler never recovered after the commands stopped")
+    if failures:
+        print("\n" + "\n".join(failures))
+        return 1
+    print(f"\nScheduled p95 {scheduled:.0f} ms: below the unscheduled {unscheduled:.0f} ms and within "
+          f"{args.margin_ms:g} ms of the no-vision {alone:.0f} ms; the scheduler backed off and recovered")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
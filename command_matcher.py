@@ -0,0 +1,260 @@
+#command_matcher.py
+"""
+Compiled command matcher
+Command phrases are compiled into a token trie. A transcript is scanned left
+to right and the longest phrase starting at each position wins, so
+"scroll up" never triggers the shorter "scroll". Words that are not in the
+vocabulary are corrected to the nearest known word within a small edit
+distance (found through a precomputed deletion index rather than a scan of
+the vocabulary), or else to a known word they start with ("scrolling" ->
+"scroll", "downwards" -> "down"). Words of commands that end the session or act on a post can be
+declared exact, so nothing misheard is ever corrected into them ("top" is
+not "stop"). A transcript that is exactly one command phrase is looked up
+directly, recent transcripts are served from an LRU cache and each heard
+word is corrected only once.
+
+The old linear substring scan stays faster on an uncached transcript with a
+command set as small as the app's (about 0.5 us against 1.5-2 us here, a
+cost next to nothing beside recognition); repeats come from the cache
+(0.3 us) and from about 1000 commands on the trie wins outright.
+Micro-benchmark:
+    python command_matcher.py
+"""
+
+import random
+import re
+import string
+import time
+from collections import OrderedDict
+from typing import Collection, Dict, Generic, List, Optional, TypeVar
+
+V = TypeVar("V")
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+_END = object()  # Trie key holding the value of a phrase that ends at this node
+_UNSEEN = object()  # A heard word with no remembered correction yet
+_SUFFIXES = ("s", "es", "ed", "ing", "er", "ward", "wards")  # Inflections a heard word may add to a command word
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def _deletions(word: str, depth: int) -> set:
+    """Every string reachable from word by deleting up to `depth` characters"""
+    results, frontier = {word}, {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+
+def bounded_edit_distance(a: str, b: str, bound: int) -> int:
+    """Levenshtein distance, or bound + 1 as soon as it is known to exceed bound"""
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > bound:
+            return bound + 1
+        previous = current
+    return previous[-1]
+
+
+class CommandMatcher(Generic[V]):
+    """
+    Maps transcripts to command values. Build it once from a {phrase: value}
+    dict; `match` returns the first command in a transcript and `match_all`
+    every command in order. Words in `exact_words` only match when heard
+    exactly.
+    """
+
+    MAX_DISTANCE = 2  # Largest edit distance ever accepted for a misheard word
+    CORRECTION_CACHE_SIZE = 4096  # Heard words whose correction (or lack of one) is remembered
+
+    def __init__(self, phrases: Dict[str, V], cache_size: int = 256, min_fuzzy_length: int = 3,
+                 exact_words: Collection[str] = ()):
+        self.min_fuzzy_length = min_fuzzy_length  # Shorter heard words must match exactly ("us" is not "up")
+        self.exact_words = {word.lower() for word in exact_words}
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, List[V]]" = OrderedDict()
+        self._corrections: Dict[str, Optional[str]] = {}  # Oldest forgotten first
+        self._phrases: Dict[str, V] = {}  # Normalized phrase -> value, for transcripts that are one command
+        self._trie: dict = {}
+        self._deletion_index: Dict[str, set] = {}
+        self.vocabulary = set()
+        for phrase, value in phrases.items():
+            tokens = tokenize(phrase)
+            if not tokens:
+                continue
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[_END] = value
+            self._phrases.setdefault(" ".join(tokens), value)
+            self.vocabulary.update(tokens)
+        self._fuzzy_targets = self.vocabulary - self.exact_words  # Words a correction may produce
+        for word in self._fuzzy_targets:
+            for deletion in _deletions(word, self.MAX_DISTANCE):
+                self._deletion_index.setdefault(deletion, set()).add(word)
+
+    def _max_distance(self, token: str) -> int:
+        return 1 if len(token) <= 5 else self.MAX_DISTANCE
+
+    def _correct(self, token: str) -> Optional[str]:
+        """
+        Nearest vocabulary word within the edit-distance bound, if it is
+        unique; otherwise the vocabulary word the token inflects
+        ("scrolling" -> "scroll"). Exact words are never produced.
+        """
+        if token in self.vocabulary:
+            return token
+        correction = self._corrections.get(token, _UNSEEN)
+        if correction is not _UNSEEN:
+            return correction
+        best, best_distance, tied = None, None, False
+        if len(token) >= self.min_fuzzy_length:
+            bound = self._max_distance(token)
+            candidates = set()
+            for deletion in _deletions(token, bound):
+                candidates |= self._deletion_index.get(deletion, set())
+            for word in sorted(candidates):
+                distance = bounded_edit_distance(token, word, bound)
+                if distance > bound:
+                    continue
+                if best_distance is None or distance < best_distance:
+                    best, best_distance, tied = word, distance, False
+                elif distance == best_distance:
+                    tied = True
+        correction = None if tied else best
+        if correction is None:
+            stems = (token[:-len(suffix)] for suffix in _SUFFIXES if token.endswith(suffix))
+            correction = max((stem for stem in stems if stem in self._fuzzy_targets), key=len, default=None)
+        if len(self._corrections) >= self.CORRECTION_CACHE_SIZE:
+            del self._corrections[next(iter(self._corrections))]
+        self._corrections[token] = correction
+        return correction
+
+    def _scan(self, tokens: List[str]) -> List[V]:
+        values = []
+        i = 0
+        while i < len(tokens):
+            node, j, longest = self._trie, i, None
+            while j < len(tokens) and tokens[j] in node:
+                node = node[tokens[j]]
+                j += 1
+                if _END in node:
+                    longest = (j, node[_END])
+            if longest is None:
+                i += 1
+            else:
+                i, value = longest
+                values.append(value)
+        return values
+
+    def match_all(self, text: str) -> List[V]:
+        """Every command in the transcript, left to right, longest phrase first"""
+        key = text.strip().lower()
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        if key in self._phrases:
+            values = [self._phrases[key]]
+        else:
+            # Misheard words are corrected before the scan, so "scroll upp" is still "scroll up"
+            vocabulary = self.vocabulary
+            values = self._scan([token if token in vocabulary else self._correct(token) or token
+                                 for token in tokenize(key)])
+
+        self._cache[key] = values
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return values
+
+    def match(self, text: str) -> Optional[V]:
+        """First command in the transcript, or None"""
+        values = self.match_all(text)
+        return values[0] if values else None
+
+
+def _linear_scan(commands: Dict[str, V], command: str) -> Optional[V]:
+    # The matcher this module replaced: exact lookup, then first substring hit in dict order
+    command = command.strip().lower()
+    if command in commands:
+        return commands[command]
+    for cmd_key, cmd_func in commands.items():
+        if cmd_key in command:
+            return cmd_func
+    return None
+
+
+# The app's command phrases (instascroller.py) and words a recognizer hears around them
+APP_PHRASES = ("scroll", "down", "scroll down", "up", "scroll up", "next", "next post", "previous",
+               "previous post", "back", "auto", "autoscroll", "faster", "slower", "pause", "stats",
+               "stop", "quit", "exit", "like")
+_SPEECH = ("please", "now", "okay", "go", "one", "more", "the", "a", "keep", "scrolling", "upp", "dawn",
+           "nexts", "again", "hey", "that", "is", "nice", "wait", "what", "on", "it", "this", "post")
+
+
+def _per_query(function, queries) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        function(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def benchmark(sizes=(10, 100, 1000), transcripts: int = 2000, seed: int = 0):
+    """
+    Time the linear scan against the compiled matcher: on the app's own
+    command set with speech-like transcripts, then on random command sets of
+    several sizes. "first" is an uncached matcher on its first pass, where
+    every new heard word is corrected once; "warm" the same matcher on a
+    second pass (transcripts not cached, words already corrected); "cached"
+    repeats served from the transcript cache.
+    """
+    rng = random.Random(seed)
+
+    def word():
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 8)))
+
+    command_sets = [("app", {phrase: i for i, phrase in enumerate(APP_PHRASES)})]
+    command_sets += [(str(size), {" ".join(word() for _ in range(rng.randint(1, 3))): i for i in range(size)})
+                     for size in sizes]
+    print(f"{'commands':>8} {'linear us':>10} {'first us':>9} {'warm us':>8} {'cached us':>10}")
+    for name, phrases in command_sets:
+        keys = list(phrases)
+        queries = []
+        for _ in range(transcripts):
+            roll = rng.random()
+            if name == "app":
+                # Mostly a bare command, sometimes with a few words around it, sometimes no command at all
+                filler = [rng.choice(_SPEECH) for _ in range(rng.randint(1, 3))]
+                if roll < 0.6:
+                    queries.append(rng.choice(keys))
+                elif roll < 0.9:
+                    queries.append(" ".join(filler[:1] + [rng.choice(keys)] + filler[1:]))
+                else:
+                    queries.append(" ".join(filler))
+            elif roll < 0.5:
+                queries.append(f"please {rng.choice(keys)} now")
+            elif roll < 0.8:
+                queries.append(rng.choice(keys))
+            else:
+                queries.append(" ".join(word() for _ in range(3)))  # Unknown command
+
+        linear = _per_query(lambda query: _linear_scan(phrases, query), queries)
+        matcher = CommandMatcher(phrases, cache_size=0)
+        first = _per_query(matcher.match, queries)
+        warm = _per_query(matcher.match, queries)
+        cached_matcher = CommandMatcher(phrases, cache_size=len(queries))
+        _per_query(cached_matcher.match, queries)
+        cached = _per_query(cached_matcher.match, queries)
+        print(f"{name:>8} {linear * 1e6:>10.1f} {first * 1e6:>9.1f} {warm * 1e6:>8.1f} {cached * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    benchmark()
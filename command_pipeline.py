@@ -0,0 +1,219 @@
+#command_pipeline.py
+"""
+Command pipeline
+Capture, recognition and dispatch each run in their own thread and are joined
+by bounded queues, so the microphone keeps being read while a scroll is
+executing and actions run while the next phrase is being recognized.
+"""
+
+import contextlib
+import queue
+import threading
+import time
+from typing import Callable, List, NamedTuple, Optional, Sequence
+
+import speech_recognition as sr
+
+
+class Phrase(NamedTuple):
+    """A captured phrase; transcript is already set when streaming recognition matched it"""
+    audio: Optional[sr.AudioData]
+    transcript: Optional[str]
+    speech_ended_at: Optional[float]
+
+
+class Command(NamedTuple):
+    """A recognized command waiting to be dispatched (count > 1 after repeats were merged)"""
+    action: Callable
+    transcript: str
+    speech_ended_at: Optional[float]
+    count: int = 1
+
+
+def coalesce(commands: Sequence[Command], repeatable: Sequence[Callable]) -> List[Command]:
+    """
+    Collapse runs of the same repeatable action into one command whose count
+    is the sum of theirs, e.g. three scroll-downs become a single scroll three
+    times as large. Other commands keep their order and count.
+    """
+    merged: List[Command] = []
+    for command in commands:
+        if merged and command.action in repeatable and merged[-1].action == command.action:
+            merged[-1] = merged[-1]._replace(count=merged[-1].count + command.count)
+        else:
+            merged.append(command)
+    return merged
+
+
+def parse_commands(controller, transcript: str, speech_ended_at: Optional[float] = None) -> List[Command]:
+    """Every action in a transcript, in order, with adjacent repeats merged ("down down down" -> one x3)"""
+    actions = controller.match_commands(transcript)
+    return coalesce([Command(action, transcript, speech_ended_at) for action in actions],
+                    controller.repeatable_actions)
+
+
+def input_batch(controller):
+    """The controller's input batch (one pause for a run of events), if it has an input backend"""
+    backend = getattr(controller, "input", None)
+    return backend.batch() if backend is not None else contextlib.nullcontext()
+
+
+class CommandPipeline:
+    """
+    capture -> recognition -> dispatch for an InstagramVoiceController.
+    Capture and recognition run in background threads; dispatch runs in the
+    thread that calls `run`, which keeps signal handling on the main thread.
+    Every command in a transcript is queued, in order. When the executor
+    falls behind, every queued command is drained at once, repeated scrolls
+    are merged and the whole batch pays the input pause only once. While no
+    command is waiting, the dispatch thread also drives the controller's
+    autoscroller (if it has one), which gives way as soon as a command is
+    queued, and lets the controller pre-warm (if it can) while a phrase is
+    being recognized. Vision work from the controller's scheduler (if it has
+    one) gets the slots that are left: never while a phrase is pending or a
+    command is queued.
+    """
+
+    def __init__(self, controller, queue_size: int = 4, poll_interval: float = 0.1):
+        self.controller = controller
+        self.phrases: "queue.Queue[Phrase]" = queue.Queue(maxsize=queue_size)
+        self.commands: "queue.Queue[Command]" = queue.Queue(maxsize=queue_size)
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+        self._pending = 0                        # Phrases captured whose commands are not queued yet
+        self._pending_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def running(self) -> bool:
+        return not self.stop_event.is_set() and self.controller.is_running
+
+    @property
+    def speech_pending(self) -> bool:
+        return self._pending > 0
+
+    def _count_pending(self, change: int):
+        with self._pending_lock:
+            self._pending += change
+
+    def start(self):
+        self.stop_event.clear()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._recognition_loop, name="recognition", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 3.0):
+        """Signal every stage to finish and wait for the background threads"""
+        self.stop_event.set()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def run(self):
+        """Start the background stages and dispatch commands until the session stops"""
+        self.start()
+        try:
+            self._dispatch_loop()
+        finally:
+            self.stop()
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        # Block while the next stage is busy (the audio ring buffer keeps capturing meanwhile)
+        while self.running:
+            try:
+                target.put(item, timeout=self.poll_interval)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue, timeout: Optional[float] = None):
+        try:
+            return source.get(timeout=self.poll_interval if timeout is None else timeout)
+        except queue.Empty:
+            return None
+
+    def _command_waiting(self) -> bool:
+        return not self.commands.empty() or not self.running
+
+    def _voice_waiting(self) -> bool:
+        return self.speech_pending or self._command_waiting()
+
+    def _capture_loop(self):
+        while self.running:
+            phrase = self.controller.capture_phrase()
+            if phrase is not None:
+                # Counted before it is queued, so there is no moment where a captured phrase looks handled
+                self._count_pending(1)
+                if not self._put(self.phrases, phrase):
+                    self._count_pending(-1)
+
+    def _recognition_loop(self):
+        while self.running:
+            phrase = self._get(self.phrases)
+            if phrase is None:
+                continue
+            try:
+                self._recognize(phrase)
+            finally:
+                self._count_pending(-1)
+
+    def _recognize(self, phrase: Phrase):
+        transcript = self.controller.transcribe(phrase)
+        if not transcript:
+            return
+        commands = parse_commands(self.controller, transcript, phrase.speech_ended_at)
+        if not commands:
+            self.controller.report_unknown_command(transcript)
+            return
+        for command in commands:
+            if not self._put(self.commands, command):
+                break
+
+    def _dispatch_loop(self):
+        autoscroller = getattr(self.controller, "autoscroller", None)
+        prewarm = getattr(self.controller, "prewarm", None)
+        scheduler = getattr(self.controller, "scheduler", None)
+        while self.running:
+            due_in = autoscroller.due_in() if autoscroller is not None else None
+            # While a phrase is pending, vision is not offered a slot, so it must not shorten the wait either
+            vision_in = scheduler.due_in() if scheduler is not None and not self.speech_pending else None
+            timeout = min(wait for wait in (self.poll_interval, due_in, vision_in) if wait is not None)
+            first = self._get(self.commands, timeout)
+            if first is None:
+                if prewarm is not None and self.speech_pending:
+                    try:
+                        prewarm()
+                    except Exception as e:
+                        print(f"Unexpected error: {e}")
+                    continue
+                moved = False
+                if due_in is not None:
+                    try:
+                        moved = autoscroller.tick(cancel=self._command_waiting)
+                    except Exception as e:
+                        print(f"Unexpected error: {e}")
+                if scheduler is not None and not moved:
+                    try:
+                        scheduler.tick(cancel=self._voice_waiting)
+                    except Exception as e:
+                        print(f"Unexpected error: {e}")
+                continue
+            batch = [first]
+            while True:
+                try:
+                    batch.append(self.commands.get_nowait())
+                except queue.Empty:
+                    break
+            with input_batch(self.controller):
+                for command in coalesce(batch, self.controller.repeatable_actions):
+                    try:
+                        self.controller.execute(command)
+                    except Exception as e:
+                        print(f"Unexpected error: {e}")
+                    if not self.controller.is_running:
+                        break
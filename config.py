@@ -13,3 +13,60 @@ PAUSE_BETWEEN_ACTIONS = 0.1  # Pause between actions (seconds)
 
 # Microphone Calibration
 CALIBRATION_DURATION = 2      # How long to calibrate microphone (seconds)
+
+# Audio Capture
+CONTINUOUS_CAPTURE = True     # Keep one microphone stream open instead of reopening it per command
+AUDIO_BUFFER_SECONDS = 5      # How much captured audio the ring buffer holds (seconds)
+
+# Speech Recognition
+RECOGNIZER_BACKEND = "google"         # "google" (Web Speech API) or "keyword" (offline keyword spotting)
+KEYWORD_SAMPLES_DIR = "keyword_samples"  # Recorded samples per keyword: keyword_samples/<keyword>/*.wav
+KEYWORD_MAX_DISTANCE = 4.0            # Reject keyword matches with a larger DTW distance
+STREAMING_RECOGNITION = True          # With the keyword backend, act on confident partial matches before the phrase ends
+
+# Transcript Cache
+TRANSCRIPT_CACHE_SIZE = 64            # Recent phrases whose transcripts are reused for similar-sounding ones (0 = off)
+TRANSCRIPT_CACHE_MIN_SIMILARITY = 0.85  # Confidence floor: share of fingerprint bits a phrase must share with a cached one
+
+# Pre-warming
+PREWARM = True                # While a phrase is recognized, prepare input and layout for the likely next command
+PREWARM_IDLE_AFTER = 10.0     # Wake the input backend when no command has run for this long (seconds)
+
+# Command Pipeline
+COMMAND_QUEUE_SIZE = 4        # Bounded queue between capture, recognition and dispatch stages
+
+# Screen Capture
+DETECTION_SCALE = 0.25        # Detect video players on a frame downscaled by this factor
+ROI_MARGIN = 64               # Pixels kept around tracked posts when capturing a region of interest
+
+# Frame Cache
+FRAME_CACHE_SIZE = 8          # Recent frames whose detections are reused while the screen is unchanged (0 = off)
+
+# Vision Scheduler
+VISION_SCHEDULER = True       # Keep the post layout fresh between commands, within a budget (once vision is in use)
+VISION_BUDGET = 0.25          # Share of each second that vision work may take
+VISION_BUDGET_CLOCK = "wall"  # Charge vision by "wall" time or by "cpu" time of the dispatch thread
+VISION_ACTIVE_FPS = 30        # Frame rate while the page is moving (after a scroll, or autoscrolling)
+VISION_IDLE_FPS = 1           # Frame rate while the page is still
+VISION_LATENCY_TARGET = 1.0   # Back vision off while the p95 of end of speech to action is above this (seconds)
+
+# Next Post
+NEXT_POST_MAX_STEPS = 8       # Scroll steps allowed while looking for the next post
+NEXT_POST_TIMEOUT = 3.0       # Give up aligning the next post after this long (seconds)
+
+# Autoscroll
+AUTOSCROLL_IMAGE_DWELL = 3.0  # Seconds spent on a static post before advancing (at speed x1)
+AUTOSCROLL_VIDEO_DWELL = 8.0  # Seconds spent on a post with a video player before advancing (at speed x1)
+
+# Voice Activity Detection
+VAD_ENABLED = True            # Skip recognition for captured sounds that are not speech (coughs, clicks, noise)
+VAD_MIN_SPEECH = 0.1          # Seconds of voiced audio a phrase needs to be sent to recognition
+
+# Noise Adaptation
+NOISE_ADAPTATION = True                 # Track the background noise level and adjust the energy threshold live
+NOISE_PROFILE_PATH = None               # Last threshold, loaded at startup instead of calibrating
+                                        # (None = noise_profile.json in the per-user config directory)
+
+# Instrumentation
+INSTRUMENTATION = True        # Time every stage (capture, recognition, matching, input, detection); say "stats" for a report
+LATENCY_EXPORT_PATH = None    # e.g. "latency.jsonl": append raw stage timings there at shutdown
@@ -0,0 +1,264 @@
+#detect_batch.py
+"""
+Headless batch detection
+Runs VideoPlayerDetector over recorded screen captures (a video file or a
+directory of .png/.jpg/.npy frames) and writes the rectangles per frame as
+JSON lines or CSV. No window is opened.
+
+The source is split into contiguous frame ranges that worker processes
+decode and analyse themselves, so frames never cross process boundaries and
+each worker holds one frame at a time; only the rectangles come back.
+Results are written in frame order as they arrive, with at most two chunks
+per worker submitted at a time, so memory does not grow with the capture.
+
+    python detect_batch.py recording.mp4 -o rects.jsonl
+    python detect_batch.py frames_dir --format csv --workers 8 --scale 0.5
+"""
+
+import argparse
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+from video_detector_demo import VideoPlayerDetector
+
+Rect = Tuple[int, int, int, int]
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".npy")
+
+
+class FrameResult(NamedTuple):
+    index: int
+    source: str      # Image file name, or the timestamp in seconds for video frames
+    rectangles: List[Rect]
+
+
+def list_images(directory: str) -> List[str]:
+    return sorted(path for path in glob.glob(os.path.join(directory, "*"))
+                  if path.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def video_frame_count(source: str) -> Optional[int]:
+    """
+    Frame count from the container, or None when it cannot be trusted for
+    seeking: some containers report 0 or an estimate, and some seek
+    inexactly. The count is checked by seeking to the last frame and
+    reading it back.
+    """
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise ValueError(f"Cannot open video {source}")
+    try:
+        count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        if count <= 0:
+            return None
+        capture.set(cv2.CAP_PROP_POS_FRAMES, count - 1)
+        if not capture.grab() or int(capture.get(cv2.CAP_PROP_POS_FRAMES)) != count or capture.grab():
+            return None
+        return count
+    finally:
+        capture.release()
+
+
+def iter_images(paths: Sequence[str], first_index: int = 0,
+                step: int = 1) -> Iterator[Tuple[int, str, np.ndarray]]:
+    """(index, file name, BGR frame) for every `step`-th image, loaded one at a time"""
+    for offset in range(0, len(paths), step):
+        path = paths[offset]
+        frame = np.load(path) if path.endswith(".npy") else cv2.imread(path, cv2.IMREAD_COLOR)
+        if frame is not None:
+            yield first_index + offset, os.path.basename(path), frame
+
+
+def iter_video(source: str, start: int = 0, stop: Optional[int] = None,
+               step: int = 1) -> Iterator[Tuple[int, str, np.ndarray]]:
+    """(index, timestamp, BGR frame) for every `step`-th frame from start to stop of a video"""
+    capture = cv2.VideoCapture(source)
+    fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+    if start:
+        capture.set(cv2.CAP_PROP_POS_FRAMES, start)
+    index = start
+    frame = None
+    try:
+        while stop is None or index < stop:
+            # grab() skips decoding frames that are stepped over
+            if (index - start) % step:
+                if not capture.grab():
+                    break
+            else:
+                ok, frame = capture.read(frame)  # Decode into the previous frame's buffer
+                if not ok:
+                    break
+                yield index, f"{index / fps:.3f}" if fps else str(index), frame
+            index += 1
+    finally:
+        capture.release()
+
+
+_detector: Optional[VideoPlayerDetector] = None
+
+
+def _init_worker():
+    global _detector
+    cv2.setNumThreads(1)  # One process per core already; OpenCV's own threads would oversubscribe
+    _detector = VideoPlayerDetector()
+
+
+def detect_range(task: Tuple[Union[str, List[str]], int, int, int, float]) -> List[FrameResult]:
+    """Worker: decode and detect one contiguous range of frames (a video path, or that range's image paths)"""
+    source, start, stop, step, scale = task
+    frames = iter_images(source, start, step) if isinstance(source, list) else iter_video(source, start, stop, step)
+    results = []
+    for index, label, frame in frames:
+        if scale != 1.0:
+            height, width = frame.shape[:2]
+            small = cv2.resize(frame, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+            rectangles = _detector.detect_video_players(small, scale=scale, screen_size=(width, height))
+        else:
+            rectangles = _detector.detect_video_players(frame)
+        results.append(FrameResult(index, label, rectangles))
+    return results
+
+
+def _warn(message: str):
+    print(f"detect_batch: {message}", file=sys.stderr)
+
+
+def detect_source(source: str, workers: int = 0, chunk_size: int = 120, step: int = 1,
+                  scale: float = 1.0) -> Iterator[FrameResult]:
+    """
+    Rectangles for every `step`-th frame of `source`, in frame order.
+    `chunk_size` is rounded up to a multiple of `step`. A video whose frame
+    count cannot be trusted is read by one sequential worker instead of in
+    seeked chunks.
+    """
+    if step < 1:
+        raise ValueError("step must be at least 1")
+    # Chunks start on a multiple of chunk_size; keep the stepping aligned across them
+    chunk_size = max(step, -(-chunk_size // step) * step)
+    if os.path.isdir(source):
+        paths = list_images(source)
+        tasks = [(paths[start:start + chunk_size], start, min(start + chunk_size, len(paths)), step, scale)
+                 for start in range(0, len(paths), chunk_size)]
+    else:
+        total = video_frame_count(source)
+        if total is None:
+            _warn(f"{source} has no reliable frame count; reading it sequentially in one worker")
+            tasks = [(source, 0, None, step, scale)]
+        else:
+            tasks = [(source, start, min(start + chunk_size, total), step, scale)
+                     for start in range(0, total, chunk_size)]
+    workers = min(workers or os.cpu_count() or 1, max(1, len(tasks)))
+    if workers == 1:
+        _init_worker()
+        yield from _checked(tasks, map(detect_range, tasks))
+        return
+    with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+        yield from _checked(tasks, _bounded_map(pool, detect_range, tasks, 2 * workers))
+
+
+def _bounded_map(pool, function, tasks, in_flight: int) -> Iterator[List[FrameResult]]:
+    # Pool.imap submits every task at once and buffers results without limit; submit a window
+    # at a time instead, so a long capture never holds more than `in_flight` chunks of results
+    pending: "deque" = deque()
+    for task in tasks:
+        pending.append(pool.apply_async(function, (task,)))
+        if len(pending) >= in_flight:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def _checked(tasks, chunks: Iterator[List[FrameResult]]) -> Iterator[FrameResult]:
+    # Yield each chunk's results, warning when a chunk came back short of the frames it was assigned
+    for (_, start, stop, step, _), results in zip(tasks, chunks):
+        expected = len(range(start, stop, step)) if stop is not None else None
+        if expected is not None and len(results) < expected:
+            _warn(f"frames {start}-{stop - 1} gave {len(results)} of {expected} frames "
+                  f"(unreadable images, or a video that ends early or seeks inexactly)")
+        yield from results
+
+
+class ResultWriter:
+    """Writes FrameResults as JSON lines (one object per frame) or CSV (one row per rectangle)"""
+
+    def __init__(self, stream, fmt: str = "jsonl"):
+        self.stream = stream
+        self.fmt = fmt
+        self.csv = None
+        if fmt == "csv":
+            self.csv = csv.writer(stream)
+            self.csv.writerow(["frame", "source", "x", "y", "w", "h"])
+
+    def write(self, result: FrameResult):
+        if self.csv is not None:
+            for x, y, w, h in result.rectangles:
+                self.csv.writerow([result.index, result.source, x, y, w, h])
+        else:
+            self.stream.write(json.dumps({"frame": result.index, "source": result.source,
+                                          "rectangles": [list(rect) for rect in result.rectangles]}) + "\n")
+
+
+def write_synthetic_video(path: str, frames: int = 600, width: int = 1920, height: int = 1080, fps: int = 30):
+    """A recording of a scrolling synthetic feed, for trying the batch mode without real captures"""
+    from video_tracker import synthetic_sequence
+
+    sequence, _ = synthetic_sequence(count=min(frames, 120), width=width, height=height, scroll_every=30)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    for i in range(frames):
+        writer.write(sequence[i % len(sequence)])
+    writer.release()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Detect video players in recorded screen captures")
+    parser.add_argument("source", help="video file or directory of .png/.jpg/.npy frames")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="output format (default: from the extension)")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=120, help="frames per worker task")
+    parser.add_argument("--step", type=int, default=1, help="process every n-th frame")
+    parser.add_argument("--scale", type=float, default=1.0, help="detect on frames downscaled by this factor")
+    parser.add_argument("--make-synthetic", type=int, metavar="FRAMES",
+                        help="first write a synthetic 1080p recording of FRAMES frames to SOURCE")
+    args = parser.parse_args(argv)
+    if args.step < 1:
+        parser.error("--step must be at least 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    if args.workers < 0:
+        parser.error("--workers must not be negative")
+    if args.scale <= 0:
+        parser.error("--scale must be positive")
+
+    if args.make_synthetic:
+        write_synthetic_video(args.source, args.make_synthetic)
+    fmt = args.format or ("csv" if args.output and args.output.endswith(".csv") else "jsonl")
+    stream = open(args.output, "w", newline="") if args.output else sys.stdout
+    writer = ResultWriter(stream, fmt)
+    started = time.perf_counter()
+    frames = rectangles = 0
+    try:
+        for result in detect_source(args.source, args.workers, args.chunk_size, args.step, args.scale):
+            writer.write(result)
+            frames += 1
+            rectangles += len(result.rectangles)
+    finally:
+        if args.output:
+            stream.close()
+    elapsed = time.perf_counter() - started
+    print(f"{frames} frames, {rectangles} rectangles in {elapsed:.1f} s ({frames / max(elapsed, 1e-9):.0f} fps, "
+          f"{args.workers or os.cpu_count()} workers)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+#frame_bus.py
+"""
+Shared-memory frame bus
+One capture producer writes BGRA frames into a fixed ring of slots in a
+`multiprocessing.shared_memory` block; any number of consumers, in this or
+other processes, read them as read-only NumPy views tagged with sequence
+numbers. Past the mss grab itself, the frame is copied once (into its slot)
+however many consumers there are; consumers allocate nothing per frame and
+never convert it, since the detector works on BGRA directly.
+
+Slots are guarded like a seqlock. The producer marks a slot as being
+written, copies the frame, then stamps it with the frame's sequence number;
+a consumer checks `is_current(view)` after using a view to learn whether the
+producer lapped it meanwhile (the ring holds the last `slots` frames).
+
+Consumer processes should be started with multiprocessing from the process
+that created the bus, so they share its resource tracker and the block is
+released exactly once, by the producer's `close`.
+
+Bytes copied per frame, one capture per consumer vs. the bus:
+    python frame_bus.py
+"""
+
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from screen_capture import ScreenCapture
+
+Rect = Tuple[int, int, int, int]
+
+_HEADER = 4   # width, height, slots, latest sequence number
+_WRITING = -1
+
+
+class FrameView(NamedTuple):
+    seq: int
+    captured_at: float  # Monotonic time the producer published the frame
+    frame: np.ndarray   # Read-only BGRA view into the slot; valid while `is_current` holds
+
+
+class FrameBus:
+    """
+    Ring of `slots` BGRA frames of width x height in shared memory. Create it
+    in the producer with `FrameBus(width, height)` and open it elsewhere with
+    `FrameBus.attach(bus.name)`.
+    """
+
+    def __init__(self, width: int = 0, height: int = 0, slots: int = 4, name: Optional[str] = None):
+        self.owner = name is None
+        if self.owner:
+            header_bytes = (_HEADER + 2 * slots) * 8
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + slots * height * width * 4)
+            np.ndarray((_HEADER,), np.int64, buffer=self.shm.buf)[:] = (width, height, slots, _WRITING)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            width, height, slots = (int(value) for value in np.ndarray((3,), np.int64, buffer=self.shm.buf))
+        self.width, self.height, self.slots = width, height, slots
+        self._header = np.ndarray((_HEADER,), np.int64, buffer=self.shm.buf)
+        self._slot_seqs = np.ndarray((slots,), np.int64, buffer=self.shm.buf, offset=_HEADER * 8)
+        self._slot_times = np.ndarray((slots,), np.float64, buffer=self.shm.buf, offset=(_HEADER + slots) * 8)
+        frames = np.ndarray((slots, height, width, 4), np.uint8, buffer=self.shm.buf,
+                            offset=(_HEADER + 2 * slots) * 8)
+        if self.owner:
+            self._slot_seqs[:] = _WRITING
+        self._frames = frames                         # Writable, used by the producer
+        self._views = [frame.view() for frame in frames]
+        for view in self._views:
+            view.flags.writeable = False              # What consumers get
+        self.published = 0
+        self.bytes_copied = 0  # Bytes written by the last publish, including the mss grab
+
+    @classmethod
+    def attach(cls, name: str) -> "FrameBus":
+        return cls(name=name)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def latest_seq(self) -> int:
+        return int(self._header[3])
+
+    def publish(self, bgra: np.ndarray, source_bytes: int = 0) -> int:
+        """Copy a BGRA frame into the next slot and return its sequence number (producer only)"""
+        seq = self.latest_seq + 1
+        slot = seq % self.slots
+        self._slot_seqs[slot] = _WRITING
+        np.copyto(self._frames[slot], bgra)
+        self._slot_times[slot] = time.monotonic()
+        self._slot_seqs[slot] = seq
+        self._header[3] = seq
+        self.published += 1
+        self.bytes_copied = source_bytes + bgra.nbytes
+        return seq
+
+    def capture(self, screen: ScreenCapture) -> int:
+        """Grab the whole monitor with `screen` and publish it"""
+        bgra = screen.grab_bgra()
+        return self.publish(bgra, screen.bytes_copied)
+
+    def latest(self, after: int = -1, timeout: Optional[float] = None,
+               poll_interval: float = 0.001) -> Optional[FrameView]:
+        """Newest frame with a sequence number above `after`, waiting up to `timeout`; None on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            seq = self.latest_seq
+            if seq > after:
+                slot = seq % self.slots
+                captured_at = float(self._slot_times[slot])
+                if self._slot_seqs[slot] == seq:
+                    return FrameView(seq, captured_at, self._views[slot])
+                continue  # Lapped while reading the header; take the newer frame
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(poll_interval)
+
+    def is_current(self, view: FrameView) -> bool:
+        """True while the slot behind `view` still holds its frame (check after using the pixels)"""
+        return int(self._slot_seqs[view.seq % self.slots]) == view.seq
+
+    def close(self):
+        """Detach; the producer also frees the shared memory"""
+        self._frames = self._views = self._header = self._slot_seqs = self._slot_times = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self) -> "FrameBus":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def run_producer(bus: FrameBus, screen: ScreenCapture, stop_event: threading.Event, fps: float = 30.0):
+    """Capture loop: publish one frame every 1/fps seconds until `stop_event` is set"""
+    interval = 1.0 / fps
+    next_at = time.monotonic()
+    while not stop_event.is_set():
+        bus.capture(screen)
+        next_at += interval
+        delay = next_at - time.monotonic()
+        if delay > 0:
+            stop_event.wait(delay)
+        else:
+            next_at = time.monotonic()
+
+
+def detect_consumer(name: str, results, stop_event, screen_size: Optional[Tuple[int, int]] = None):
+    """
+    Process target: attach to the bus, run BGRA-native detection on the
+    newest frame whenever one arrives and put (seq, rectangles, stale) on
+    `results`. `stale` is True when the producer overwrote the slot while
+    it was being analysed.
+    """
+    from video_detector_demo import VideoPlayerDetector
+
+    bus = FrameBus.attach(name)
+    detector = VideoPlayerDetector()
+    seq = -1
+    try:
+        while not stop_event.is_set():
+            view = bus.latest(after=seq, timeout=0.1)
+            if view is None:
+                continue
+            rectangles = detector.detect_video_players(view.frame, screen_size=screen_size)
+            results.put((view.seq, rectangles, not bus.is_current(view)))
+            seq = view.seq
+    finally:
+        bus.close()
+
+
+def benchmark(duration: float = 3.0, fps: float = 30.0, slots: int = 4):
+    """Bytes copied per frame and detection results: separate captures vs. one producer and a consumer process"""
+    from screen_capture import SyntheticScreen, synthetic_frame
+    from video_detector_demo import VideoPlayerDetector
+
+    frame = synthetic_frame(1920, 1080)
+    sct = SyntheticScreen(frame)
+    height, width = frame.shape[:2]
+    print(f"Synthetic {width}x{height} frames, a controller and a detector both reading every frame")
+
+    # Before: the controller and the detector each capture and convert the frame themselves
+    controller_screen, detector_screen = ScreenCapture(sct), ScreenCapture(sct)
+    controller_screen.grab()
+    detector_screen.grab()
+    separate = controller_screen.bytes_copied + detector_screen.bytes_copied
+    expected = VideoPlayerDetector().detect_video_players(detector_screen.grab())
+
+    # After: one producer publishes into the ring, a detector process reads it, the controller reads it in place
+    with FrameBus(width, height, slots) as bus:
+        ctx = multiprocessing.get_context()
+        results, stop_consumer = ctx.Queue(), ctx.Event()
+        consumer = ctx.Process(target=detect_consumer, args=(bus.name, results, stop_consumer), daemon=True)
+        consumer.start()
+        stop_producer = threading.Event()
+        producer = threading.Thread(target=run_producer, args=(bus, ScreenCapture(sct), stop_producer, fps))
+        producer.start()
+
+        controller_reads, seq = 0, -1
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            view = bus.latest(after=seq, timeout=0.1)
+            if view is not None:
+                controller_reads += 1  # e.g. a frame-cache fingerprint over view.frame
+                seq = view.seq
+        stop_producer.set()
+        producer.join()
+        stop_consumer.set()
+        detections: List[Tuple[int, List[Rect], bool]] = []
+        consumer.join(timeout=5)
+        while not results.empty():
+            detections.append(results.get())
+        shared = bus.bytes_copied
+        published = bus.published
+
+    fresh = [rectangles for _, rectangles, stale in detections if not stale]
+    agree = sum(rectangles == expected for rectangles in fresh)
+    print(f"{'':<28} {'MB copied/frame':>16}")
+    print(f"{'separate captures (before)':<28} {separate / 1e6:>16.1f}")
+    print(f"{'frame bus (after)':<28} {shared / 1e6:>16.1f}   (consumers copy 0 bytes)")
+    print(f"Published {published} frames at {fps:g} fps; the detector process analysed {len(detections)} "
+          f"({len(detections) - len(fresh)} lapped), {agree}/{len(fresh)} match in-process detection; "
+          f"the controller read {controller_reads}")
+
+
+if __name__ == "__main__":
+    benchmark()
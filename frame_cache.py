@@ -0,0 +1,173 @@
+#frame_cache.py
+"""
+Frame fingerprint cache
+Sits in front of `detect_video_players` and skips detection when the screen
+has not changed. Every frame is reduced to a small grayscale thumbnail; a
+difference hash of the thumbnail keys a small LRU of recent results, and a
+hit is confirmed by comparing the stored thumbnail pixel by pixel, so a
+short scroll that leaves the 64-bit hash unchanged still misses. A blinking
+cursor or a clock stays under the tolerance; a playing video does not, and
+is detected as usual.
+
+Hash cost against full detection, and hit rate on a static and a changing
+feed:
+    python frame_cache.py
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from instrumentation import record
+
+Rect = Tuple[int, int, int, int]
+
+
+class _Entry(NamedTuple):
+    thumbnail: np.ndarray
+    rectangles: List[Rect]
+
+
+def thumbnail(img: np.ndarray, size: Tuple[int, int] = (64, 36), rows_per_cell: int = 3) -> np.ndarray:
+    """
+    Grayscale thumbnail of a BGR or BGRA frame, `size` = (width, height).
+    Only `rows_per_cell` evenly spaced rows per thumbnail row are read, and
+    the frame is cropped to a whole number of cells, so INTER_AREA takes its
+    integer-factor fast path.
+    """
+    width, height = size
+    step = max(1, img.shape[0] // (height * rows_per_cell))
+    rows = img[:step * height * rows_per_cell:step, :img.shape[1] - img.shape[1] % width or None]
+    small = cv2.resize(rows, size, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_BGRA2GRAY if img.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+
+
+def difference_hash(gray: np.ndarray, hash_size: int = 8) -> int:
+    """64-bit dHash: is each cell of a (hash_size x hash_size + 1) grid brighter than its left neighbour"""
+    cells = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = np.packbits(cells[:, 1:] > cells[:, :-1])
+    return int.from_bytes(bits.tobytes(), "big")
+
+
+class FrameCache:
+    """
+    Wraps a detector and has the same `detect_video_players` signature, so it
+    can stand in for one anywhere (ScreenCapture.detect, PostLocator, the
+    tracker). Results are keyed on the frame's fingerprint together with the
+    detection arguments, since the same pixels at another offset or scale
+    map to other screen coordinates.
+    """
+
+    def __init__(self, detector, capacity: int = 8, tolerance: int = 8,
+                 thumbnail_size: Tuple[int, int] = (64, 36)):
+        self.detector = detector
+        self.capacity = capacity
+        self.tolerance = tolerance            # Largest per-pixel thumbnail change (0-255) still counted as unchanged
+        self.thumbnail_size = thumbnail_size
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.hash_seconds = 0.0    # Time spent fingerprinting frames (hits and misses)
+        self.detect_seconds = 0.0  # Time spent in the wrapped detector on misses
+
+    def __getattr__(self, name):
+        # Everything else (capture_screen, draw_rectangles, ...) is the wrapped detector's
+        if name == "detector":
+            raise AttributeError(name)
+        return getattr(self.detector, name)
+
+    def clear(self):
+        self._entries.clear()
+
+    def detect_video_players(self, img: np.ndarray, scale: float = 1.0,
+                             offset: Tuple[int, int] = (0, 0),
+                             screen_size: Optional[Tuple[int, int]] = None) -> List[Rect]:
+        started = time.perf_counter()
+        thumb = thumbnail(img, self.thumbnail_size)
+        key = (difference_hash(thumb), img.shape, scale, tuple(offset), screen_size)
+        entry = self._entries.get(key)
+        hit = entry is not None and int(cv2.absdiff(entry.thumbnail, thumb).max()) <= self.tolerance
+        self.hash_seconds += time.perf_counter() - started
+        record("frame_hash", started)
+        if hit:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry.rectangles)
+
+        started = time.perf_counter()
+        rectangles = self.detector.detect_video_players(img, scale=scale, offset=offset, screen_size=screen_size)
+        self.detect_seconds += time.perf_counter() - started
+        self.misses += 1
+        self._entries[key] = _Entry(thumb, list(rectangles))
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        return rectangles
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def saved_seconds(self) -> float:
+        """Detection time skipped on hits (at the mean cost of a miss), net of all hashing"""
+        if not self.misses:
+            return -self.hash_seconds
+        return self.hits * self.detect_seconds / self.misses - self.hash_seconds
+
+    def stats(self) -> Dict[str, float]:
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate,
+                "hash_ms": self.hash_seconds * 1000, "saved_ms": self.saved_seconds * 1000}
+
+    def report(self):
+        print(f"Frame cache: {self.hits}/{self.hits + self.misses} hits ({self.hit_rate:.0%}), "
+              f"{self.saved_seconds * 1000:.0f} ms of detection saved net of "
+              f"{self.hash_seconds * 1000:.0f} ms hashing")
+
+
+def benchmark(repeats: int = 30):
+    """Fingerprint cost vs full detection, then hit rates on a static screen and on a playing video"""
+    from video_detector_demo import VideoPlayerDetector
+    from video_tracker import synthetic_sequence
+
+    frames, _ = synthetic_sequence(count=60)
+    detector = VideoPlayerDetector()  # Warmed up below, so misses are timed at their steady cost
+    height, width = frames[0].shape[:2]
+
+    def per_call_ms(function, frame) -> float:
+        function(frame)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            function(frame)
+        return (time.perf_counter() - start) / repeats * 1000
+
+    hash_ms = per_call_ms(lambda frame: difference_hash(thumbnail(frame)), frames[0])
+    detect_ms = per_call_ms(detector.detect_video_players, frames[0])
+    print(f"{width}x{height} frame: fingerprint {hash_ms:.2f} ms, detect_video_players {detect_ms:.2f} ms "
+          f"({detect_ms / hash_ms:.0f}x)")
+
+    # Static feed between commands: the same frame with a blinking text cursor
+    static = []
+    for i in range(len(frames)):
+        frame = frames[0].copy()
+        if i % 2:
+            frame[500:520, 200:202] = 255
+        static.append(frame)
+    # After a short scroll the layout moves by a few pixels: the hash may match, the thumbnail must not
+    shifted = np.roll(frames[0], 12, axis=0)
+    for name, sequence in (("static screen", static), ("playing video", frames), ("12 px scroll", [frames[0], shifted])):
+        cache = FrameCache(detector)
+        start = time.perf_counter()
+        results = [cache.detect_video_players(frame) for frame in sequence]
+        elapsed = (time.perf_counter() - start) / len(sequence) * 1000
+        correct = sum(result == detector.detect_video_players(frame) for result, frame in zip(results, sequence))
+        print(f"{name:<14} {elapsed:>6.2f} ms/frame, hit rate {cache.hit_rate:>4.0%}, "
+              f"saved {cache.saved_seconds * 1000:>6.1f} ms, {correct}/{len(sequence)} match full detection")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,122 @@
+#input_backend.py
+"""
+Input backends
+Actions send scrolls and clicks through an input backend instead of calling
+pyautogui directly, so they can be replayed against a recording fake in
+harnesses and benchmarks. Events sent inside `batch()` skip the per-event
+pause (pyautogui.PAUSE); the pause is paid once when the batch ends, or
+earlier through `settle()` when an action needs the screen to catch up.
+"""
+
+import contextlib
+import time
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from instrumentation import span
+
+
+class InputEvent(NamedTuple):
+    kind: str          # "scroll" or "double_click"
+    args: tuple
+    timestamp: float   # Monotonic time the event was sent
+
+
+class _Batching:
+    """Shared batch bookkeeping; subclasses provide `_sleep_pause`"""
+
+    _batch_depth = 0
+    _pause_owed = False  # A batched event was sent and its pause has not been paid yet
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Send the enclosed events back to back and pause once at the end (batches nest)"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.settle()
+
+    @property
+    def batching(self) -> bool:
+        return self._batch_depth > 0
+
+    def settle(self):
+        """Pay the pause owed for batched events, e.g. before reading the screen"""
+        if self._pause_owed:
+            self._pause_owed = False
+            self._sleep_pause()
+
+    def _sleep_pause(self):
+        raise NotImplementedError
+
+
+class PyAutoGUIBackend(_Batching):
+    """Sends real mouse input with pyautogui"""
+
+    def __init__(self, pause: float = 0.1, failsafe: bool = True):
+        import pyautogui
+        self.pyautogui = pyautogui
+        pyautogui.FAILSAFE = failsafe  # Move mouse to corner to stop
+        pyautogui.PAUSE = pause
+
+    def size(self) -> Tuple[int, int]:
+        return tuple(self.pyautogui.size())
+
+    def scroll(self, clicks: int):
+        with span("input"):  # Includes pyautogui.PAUSE unless batching
+            self.pyautogui.scroll(clicks, _pause=not self.batching)
+        self._pause_owed = self.batching
+
+    def double_click(self, x: int, y: int):
+        with span("input"):
+            self.pyautogui.doubleClick(x, y, _pause=not self.batching)
+        self._pause_owed = self.batching
+
+    def warm(self):
+        """Wake the platform input layer with a query that sends no event (the first call after idle is slow)"""
+        self.pyautogui.position()
+
+    def _sleep_pause(self):
+        time.sleep(self.pyautogui.PAUSE)
+
+
+class RecordingBackend(_Batching):
+    """
+    Records events with timestamps instead of sending them. `on_scroll` lets
+    a fake screen follow the scrolls; `pause` mimics pyautogui.PAUSE.
+    """
+
+    def __init__(self, screen_size: Tuple[int, int] = (1920, 1080),
+                 on_scroll: Optional[Callable[[int], None]] = None, pause: float = 0.0):
+        self.screen_size = screen_size
+        self.on_scroll = on_scroll
+        self.pause = pause
+        self.events: List[InputEvent] = []
+        self.warms = 0
+
+    def _record(self, kind: str, *args):
+        self.events.append(InputEvent(kind, args, time.monotonic()))
+        if self.batching:
+            self._pause_owed = True
+        elif self.pause:
+            time.sleep(self.pause)
+
+    def size(self) -> Tuple[int, int]:
+        return self.screen_size
+
+    def scroll(self, clicks: int):
+        if self.on_scroll is not None:
+            self.on_scroll(clicks)
+        self._record("scroll", clicks)
+
+    def double_click(self, x: int, y: int):
+        self._record("double_click", x, y)
+
+    def warm(self):
+        self.warms += 1
+
+    def _sleep_pause(self):
+        if self.pause:
+            time.sleep(self.pause)
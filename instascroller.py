@@ -1,15 +1,33 @@
 #instascroller.py
 
 import speech_recognition as sr
-import pyautogui
 import time
 import sys
 import signal
-from typing import Optional, List, Tuple
-import cv2
-import mss
-import numpy as np
+import threading
+from typing import TYPE_CHECKING, Callable, Optional, List, Tuple
 
+from audio_stream import AudioStream, AudioStreamEnded
+from autoscroll import AutoScroller
+from command_matcher import CommandMatcher
+from command_pipeline import Command, CommandPipeline, Phrase, parse_commands
+import instrumentation
+from input_backend import PyAutoGUIBackend
+from noise_estimator import NoiseFloorEstimator, default_profile_path
+from prewarm import Prewarmer
+from recognizers import KeywordSpotter, create_backend
+from scheduler import VisionScheduler
+from streaming import listen_streaming
+from transcript_cache import TranscriptCache
+from vad import EnergyVAD
+
+if TYPE_CHECKING:
+    # The vision stack (OpenCV, mss) is imported on first use; plain voice scrolling never loads it.
+    # numpy is not deferred: audio_stream, vad and recognizers load it at import for every audio chunk
+    import numpy as np
+    from post_locator import PostLocator
+    from screen_capture import ScreenCapture
+    from scroll_feedback import NextPostScroller
 
 # Import configuration
 try:
@@ -21,21 +39,71 @@ except ImportError:
     SCROLL_AMOUNT = 3
     PAUSE_BETWEEN_ACTIONS = 0.1
     CALIBRATION_DURATION = 2
+    CONTINUOUS_CAPTURE = True
+    AUDIO_BUFFER_SECONDS = 5
+    RECOGNIZER_BACKEND = "google"
+    KEYWORD_SAMPLES_DIR = "keyword_samples"
+    KEYWORD_MAX_DISTANCE = 4.0
+    STREAMING_RECOGNITION = True
+    COMMAND_QUEUE_SIZE = 4
+    DETECTION_SCALE = 0.25
+    ROI_MARGIN = 64
+    FRAME_CACHE_SIZE = 8
+    VISION_SCHEDULER = True
+    VISION_BUDGET = 0.25
+    VISION_BUDGET_CLOCK = "wall"
+    VISION_ACTIVE_FPS = 30
+    VISION_IDLE_FPS = 1
+    VISION_LATENCY_TARGET = 1.0
+    NEXT_POST_MAX_STEPS = 8
+    NEXT_POST_TIMEOUT = 3.0
+    AUTOSCROLL_IMAGE_DWELL = 3.0
+    AUTOSCROLL_VIDEO_DWELL = 8.0
+    VAD_ENABLED = True
+    VAD_MIN_SPEECH = 0.1
+    NOISE_ADAPTATION = True
+    NOISE_PROFILE_PATH = None
+    INSTRUMENTATION = True
+    LATENCY_EXPORT_PATH = None
+    TRANSCRIPT_CACHE_SIZE = 64
+    TRANSCRIPT_CACHE_MIN_SIMILARITY = 0.85
+    PREWARM = True
+    PREWARM_IDLE_AFTER = 10.0
 
 
 class InstagramVoiceController:
     def __init__(self, listen_timeout=None, phrase_limit=None):
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        # Opening the microphone (PyAudio init, device query) overlaps with the rest of initialization
+        self._microphone = None
+        self._microphone_error = None
+        self._microphone_ready = threading.Thread(target=self._open_microphone, args=(sr.Microphone,),
+                                                  name="microphone-setup", daemon=True)
+        self._microphone_ready.start()
+        self.audio_stream = None  # Long-lived capture, started after calibration
+        self.noise_estimator = (NoiseFloorEstimator(self.recognizer,
+                                                    profile_path=NOISE_PROFILE_PATH or default_profile_path())
+                                if NOISE_ADAPTATION else None)  # Keeps the energy threshold current
+        self.backend = create_backend(RECOGNIZER_BACKEND, self.recognizer,
+                                      samples_dir=KEYWORD_SAMPLES_DIR, max_distance=KEYWORD_MAX_DISTANCE)
+        if TRANSCRIPT_CACHE_SIZE:
+            # Phrases that sound like a recent one reuse its transcript instead of another recognizer call
+            self.backend = TranscriptCache(self.backend, capacity=TRANSCRIPT_CACHE_SIZE,
+                                           min_similarity=TRANSCRIPT_CACHE_MIN_SIMILARITY)
+        self.vad = EnergyVAD(min_speech=VAD_MIN_SPEECH) if VAD_ENABLED else None  # Drops non-speech before recognition
+        self.speech_ended_at = None  # Monotonic time the last phrase stopped
+        instrumentation.configure(enabled=INSTRUMENTATION)  # Per-stage timings, reported by "stats" and at shutdown
         self.is_running = True
+        self.repeatable_actions = (self.scroll_down, self.scroll_up)  # Queued runs of these are merged
+        self.autoscroller = AutoScroller(self._auto_advance, image_dwell=AUTOSCROLL_IMAGE_DWELL,
+                                         video_dwell=AUTOSCROLL_VIDEO_DWELL)
         
         # Listening configuration (use config file or defaults)
         self.listen_timeout = listen_timeout or LISTEN_TIMEOUT
         self.phrase_limit = phrase_limit or PHRASE_LIMIT
         
-        # Configure pyautogui
-        pyautogui.FAILSAFE = True  # Move mouse to corner to stop
-        pyautogui.PAUSE = PAUSE_BETWEEN_ACTIONS
+        # Mouse input goes through a backend (pyautogui; a recording fake in harnesses)
+        self.input = PyAutoGUIBackend(pause=PAUSE_BETWEEN_ACTIONS)
         
         # Command mappings
         self.commands = {
@@ -44,6 +112,17 @@ class InstagramVoiceController:
             'scroll down': self.scroll_down,
             'up': self.scroll_up,
             'scroll up': self.scroll_up,
+            'next': self.next_post,
+            'next post': self.next_post,
+            'previous': self.previous_post,
+            'previous post': self.previous_post,
+            'back': self.previous_post,
+            'auto': self.start_autoscroll,
+            'autoscroll': self.start_autoscroll,
+            'faster': self.autoscroll_faster,
+            'slower': self.autoscroll_slower,
+            'pause': self.pause_autoscroll,
+            'stats': self.show_stats,
             'stop': self.stop_session,
             'quit': self.stop_session,
             'exit': self.stop_session,
@@ -57,31 +136,85 @@ class InstagramVoiceController:
             # 'message': self.message_post,
             # 'search': self.search_post, 
         }
+        # Misheard words are corrected, but never into a command that ends the session or acts on a post
+        self.matcher = CommandMatcher(self.commands, exact_words=('stop', 'quit', 'exit', 'like'))
+
+        # Wakes the input backend and detects the layout ahead of the likely next command
+        self.prewarmer = (Prewarmer(lambda: self.input.warm(), self._warm_layout, layout_actions=(self.like_post,),
+                                    idle_after=PREWARM_IDLE_AFTER) if PREWARM else None)
+
+        # Vision work between commands, capped by a time budget and backed off when commands get slow
+        self.scheduler = (VisionScheduler(self._watch_layout, scrolling=lambda: self.autoscroller.active,
+                                          budget=VISION_BUDGET, active_fps=VISION_ACTIVE_FPS,
+                                          idle_fps=VISION_IDLE_FPS, latency_target=VISION_LATENCY_TARGET,
+                                          budget_clock=VISION_BUDGET_CLOCK)
+                          if VISION_SCHEDULER and VISION_BUDGET > 0 else None)
         
         # Setup signal handler for graceful shutdown
         signal.signal(signal.SIGINT, self.signal_handler)
 
-        # Setup screenshot capture
-        self.sct = mss.mss()
-    
-    def capture_screen(self, region: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
-        if region:
-            monitor = {"top": region[1], "left": region[0], "width": region[2], "height": region[3]}
+        # Screen capture and post layout are created on first use, in the thread that uses them
+        self._screen = None
+        self._detector = None
+        self._post_locator = None
+        self._post_scroller = None
 
-        else:
-            monitor = self.sct.monitors[1]  # Primary monitor
-            
-        screenshot = self.sct.grab(monitor)
-        img = np.array(screenshot)
-        return cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+    def _open_microphone(self, microphone_factory: Callable[[], sr.Microphone]):
+        try:
+            self._microphone = microphone_factory()
+        except Exception as e:
+            self._microphone_error = e  # Raised where the microphone is first needed
+
+    @property
+    def microphone(self) -> sr.Microphone:
+        # Waits for the background setup started in __init__
+        self._microphone_ready.join()
+        if self._microphone_error is not None:
+            raise self._microphone_error
+        return self._microphone
 
-    def mo
+    @property
+    def screen(self) -> "ScreenCapture":
+        if self._screen is None:
+            import mss
+            from screen_capture import ScreenCapture
+            self._screen = ScreenCapture(mss.mss(), scale=DETECTION_SCALE, roi_margin=ROI_MARGIN)
+        return self._screen
+
+    @property
+    def detector(self):
+        # One detector for the layout and the next-post feedback, behind the frame cache when enabled
+        if self._detector is None:
+            from video_detector_demo import VideoPlayerDetector
+            self._detector = VideoPlayerDetector()
+            if FRAME_CACHE_SIZE:
+                from frame_cache import FrameCache
+                self._detector = FrameCache(self._detector, capacity=FRAME_CACHE_SIZE)
+        return self._detector
+
+    @property
+    def post_locator(self) -> "PostLocator":
+        if self._post_locator is None:
+            from post_locator import PostLocator
+            self._post_locator = PostLocator(self.screen, self.detector, input_size=self.input.size())
+        return self._post_locator
+
+    @property
+    def post_scroller(self) -> "NextPostScroller":
+        if self._post_scroller is None:
+            from scroll_feedback import NextPostScroller
+            self._post_scroller = NextPostScroller(self.input, self.screen, self.detector,
+                                                   max_steps=NEXT_POST_MAX_STEPS, timeout=NEXT_POST_TIMEOUT)
+        return self._post_scroller
+    
+    def capture_screen(self, region: Optional[Tuple[int, int, int, int]] = None) -> "np.ndarray":
+        # Grab the screen (or a region) into a reused BGR buffer
+        return self.screen.grab(region)
         
     def signal_handler(self, signum, frame):
 
         print("\n\nShutting down gracefully...")
-        self.is_running = False
-        sys.exit(0)
+        self.is_running = False  # The pipeline stages see this and wind down
         
     def calibrate_microphone(self) -> bool:
         # Calibrate microphone for ambient noise
@@ -90,77 +223,266 @@ class InstagramVoiceController:
             with self.microphone as source:
                 self.recognizer.adjust_for_ambient_noise(source, duration=CALIBRATION_DURATION)
             print("Microphone calibrated successfully!")
+            if self.noise_estimator is not None:
+                self.noise_estimator.save()
             return True
         except Exception as e:
             print(f"Error calibrating microphone: {e}")
             return False
+
+    def start_audio_stream(self):
+        # Open the microphone once and keep capturing in the background
+        self.audio_stream = AudioStream(self.microphone, buffer_seconds=AUDIO_BUFFER_SECONDS)
+        if self.noise_estimator is not None:
+            # Track the noise floor from every captured chunk and move the threshold with it
+            estimator, seconds = self.noise_estimator, self.audio_stream.seconds_per_chunk
+            self.audio_stream.monitors.append(lambda chunk: estimator.observe(chunk, self.microphone.SAMPLE_WIDTH, seconds))
+        self.audio_stream.start()
+
+    def stop_audio_stream(self):
+        if self.audio_stream is not None:
+            self.audio_stream.stop()
+            self.audio_stream = None
+        if self.noise_estimator is not None:
+            self.noise_estimator.save()
             
-    def listen_for_command(self) -> Optional[str]:
-        # Listen for voice command and return recognized text
+    def capture_phrase(self) -> Optional[Phrase]:
+        # Record the next phrase; streaming recognition may already have transcribed it
         try:
+            spotter = getattr(self.backend, "backend", self.backend)  # Streaming talks to the spotter, not the cache
+            if self.audio_stream is not None and STREAMING_RECOGNITION and isinstance(spotter, KeywordSpotter):
+                # Recognize while the phrase is still being recorded and stop at the first confident match
+                command, early = listen_streaming(self.audio_stream, self.recognizer, spotter,
+                                                  timeout=self.listen_timeout, phrase_time_limit=self.phrase_limit)
+                if early:
+                    print("Matched before end of phrase")
+                instrumentation.record("endpoint", self.audio_stream.last_speech_at)
+                return Phrase(None, command, self.audio_stream.last_speech_at)
+
+            if self.audio_stream is not None:
+                # Segment the next phrase out of the continuously captured audio
+                audio = self.audio_stream.listen(self.recognizer, timeout=self.listen_timeout, phrase_time_limit=self.phrase_limit)
+                instrumentation.record("endpoint", self.audio_stream.last_speech_at)  # Last voiced chunk -> phrase closed
+                return self._speech_only(Phrase(audio, None, self.audio_stream.last_speech_at))
+
             with self.microphone as source:
                 # Listen for audio with configurable timeout
                 audio = self.recognizer.listen(source, timeout=self.listen_timeout, phrase_time_limit=self.phrase_limit)
-                
-            # Recognize speech using Google Web Speech API
-            command = self.recognizer.recognize_google(audio).lower()
-            print(f"Heard: {command}")
-            return command
-            
+            return self._speech_only(Phrase(audio, None, time.monotonic()))
+
         except sr.WaitTimeoutError:
             # No speech detected within timeout
             return None
-        except sr.UnknownValueError:
-            print("Could not understand audio")
+        except AudioStreamEnded as e:
+            # The device failed or the source ran out; polling a dead stream would spin forever
+            print(f"Audio capture stopped: {e}")
+            self.is_running = False
             return None
-        except sr.RequestError as e:
-            print(f"Could not request results from Google Speech Recognition service: {e}")
+        except Exception as e:
+            self._report_speech_error(e)
             return None
+
+    def _speech_only(self, phrase: Phrase) -> Optional[Phrase]:
+        # Coughs, clicks and background noise never reach the recognizer
+        if self.vad is not None:
+            with instrumentation.span("vad"):
+                if not self.vad.is_speech(phrase.audio, self.recognizer.energy_threshold):
+                    return None
+        return phrase
+
+    def transcribe(self, phrase: Phrase) -> Optional[str]:
+        # Recognize speech with the configured backend (Google or local keyword spotting)
+        try:
+            command = phrase.transcript
+            if command is None:
+                with instrumentation.span("recognition"):
+                    command = self.backend.recognize(phrase.audio)
+            print(f"Heard: {command}")
+            return command
         except Exception as e:
-            print(f"Unexpected error during speech recognition: {e}")
+            self._report_speech_error(e)
             return None
+
+    def _report_speech_error(self, error: Exception):
+        if isinstance(error, sr.UnknownValueError):
+            print("Could not understand audio")
+        elif isinstance(error, sr.RequestError):
+            print(f"Could not request results from {self.backend.name} speech recognition: {error}")
+        else:
+            print(f"Unexpected error during speech recognition: {error}")
             
-    def scroll_down(self):
-        #Scroll down on Instagram
-        print("Scrolling down...")
-        pyautogui.scroll(-SCROLL_AMOUNT)  # Scroll down
+    def listen_for_command(self) -> Optional[str]:
+        # Listen for voice command and return recognized text
+        phrase = self.capture_phrase()
+        if phrase is None:
+            return None
+        self.speech_ended_at = phrase.speech_ended_at
+        return self.transcribe(phrase)
+            
+    def scroll_down(self, count: int = 1):
+        #Scroll down on Instagram (count > 1 when queued scrolls were merged)
+        print("Scrolling down..." if count == 1 else f"Scrolling down x{count}...")
+        self.input.scroll(-SCROLL_AMOUNT * count)  # Scroll down
+        self._layout_changed()
         
-    def scroll_up(self):
-        #Scroll up on Instagram
-        print("Scrolling up...")
-        pyautogui.scroll(SCROLL_AMOUNT)  # Scroll up
+    def scroll_up(self, count: int = 1):
+        #Scroll up on Instagram (count > 1 when queued scrolls were merged)
+        print("Scrolling up..." if count == 1 else f"Scrolling up x{count}...")
+        self.input.scroll(SCROLL_AMOUNT * count)  # Scroll up
+        self._layout_changed()
+
+    def next_post(self):
+        #Scroll until the next post is aligned at the top of the screen
+        print("Next post...")
+        self._scroll_to_post(-1)
+
+    def previous_post(self):
+        #Scroll back until the previous post is aligned at the top of the screen
+        print("Previous post...")
+        self._scroll_to_post(1)
+
+    def _scroll_to_post(self, direction: int):
+        self.input.settle()  # Let scrolls batched before this one land before the first feedback frame
+        self.screen.reset_roi()  # Feedback frames need the whole screen
+        result = self.post_scroller.next_post(direction)
+        if not result.aligned:
+            print(f"No post aligned after {result.steps} steps ({result.elapsed:.1f}s)")
+        self._layout_changed()
+
+    def _layout_changed(self):
+        # Posts moved; the cached layout is refreshed on next use and autoscroll dwells from here
+        if self._post_locator is not None:
+            self._post_locator.invalidate()
+        self.autoscroller.postpone()
+        if self.scheduler is not None:
+            self.scheduler.activity()
+
+    def start_autoscroll(self):
+        #Advance posts automatically (dwell is longer on video posts)
+        print(f"Autoscroll on (speed x{self.autoscroller.speed:.2f})")
+        self.autoscroller.start()
+
+    def pause_autoscroll(self):
+        #Stop advancing posts automatically
+        print("Autoscroll paused")
+        self.autoscroller.pause()
+
+    def autoscroll_faster(self):
+        #Shorten the autoscroll dwell time
+        self.autoscroller.faster()
+        print(f"Autoscroll speed x{self.autoscroller.speed:.2f}")
+
+    def autoscroll_slower(self):
+        #Lengthen the autoscroll dwell time
+        self.autoscroller.slower()
+        print(f"Autoscroll speed x{self.autoscroller.speed:.2f}")
+
+    def _auto_advance(self, cancel: Callable[[], bool]) -> Optional[bool]:
+        # One autoscroll step: next post, then whether it is playing a video (None when cancelled)
+        self.screen.reset_roi()
+        self.post_scroller.next_post(-1, cancel)
+        self._layout_changed()
+        if cancel():
+            return None
+        post = self.post_locator.current_post()
+        if post is None:
+            return False
+        return self.post_locator.is_playing(post, cancel=cancel)
         
     def stop_session(self):
         #Stop the voice control session
         print("Stopping session...")
+        self.autoscroller.pause()
         self.is_running = False
 
     def like_post(self):
         #Like the post
         print("Liking post...")
-        pyautogui.click(100, 100)
-        pyautogui.click(100, 100)
+        # Double-click the center of the current post (cached layout, refreshed only after scrolls)
+        self.input.settle()  # A scroll batched just before must land before the layout is read
+        center = self.post_locator.post_center()
+        if center is None:
+            # Clicking the middle of an unknown layout could hit anything
+            print("No post found to like")
+            return
+        self.input.double_click(*center)
         
     def comment_post(self):
         #Comment on the post
         pass
         
+    def match_command(self, command: str) -> Optional[Callable]:
+        #Find the action for a recognized command (longest phrase wins, misheard words are corrected)
+        with instrumentation.span("match"):
+            return self.matcher.match(command)
+
+    def match_commands(self, command: str) -> List[Callable]:
+        #Every action in a recognized transcript, in order ("down down down" -> three scroll-downs)
+        with instrumentation.span("match"):
+            return self.matcher.match_all(command)
+
     def process_command(self, command: str) -> bool:
-        #Process voice command and execute corresponding action
-        command = command.strip().lower()
-        
-        # Check for exact matches first
-        if command in self.commands:
-            self.commands[command]()
-            return True
-            
-        # Check for partial matches
-        for cmd_key, cmd_func in self.commands.items():
-            if cmd_key in command:
-                cmd_func()
-                return True
-                
-        return False
+        #Process voice command and execute every action in it as one input batch
+        commands = parse_commands(self, command)
+        if not commands:
+            return False
+        with self.input.batch():
+            for parsed in commands:
+                self.execute(parsed)
+                if not self.is_running:
+                    break
+        return True
+
+    def execute(self, command: Command):
+        #Run a dispatched command from the pipeline (count > 1 when repeats were merged)
+        if self.prewarmer is not None:
+            self.prewarmer.observe(command.action)
+        with instrumentation.span("action"):
+            if command.count > 1:
+                command.action(command.count)
+            else:
+                command.action()
+        if command.speech_ended_at is not None:
+            instrumentation.record("speech_to_action", command.speech_ended_at)
+            latency = time.monotonic() - command.speech_ended_at
+            if self.scheduler is not None:
+                self.scheduler.observe_latency(latency)
+            print(f"Latency: {latency * 1000:.0f} ms (end of speech to action)")
+
+    def prewarm(self):
+        #Called by the pipeline while a phrase is being recognized
+        if self.prewarmer is not None:
+            self.prewarmer.warm()
+
+    def _warm_layout(self):
+        with instrumentation.span("prewarm"):
+            self.post_locator.layout()
+
+    def _watch_layout(self):
+        # Scheduled vision task; does nothing until a command has brought the vision stack in
+        if self._post_locator is not None:
+            with instrumentation.span("vision"):
+                self._post_locator.refresh()
+
+    def show_stats(self):
+        #Print p50/p95/p99 per stage (capture, recognition, matching, input, frame analysis)
+        recorder = instrumentation.recorder()
+        if recorder is None:
+            print("Instrumentation is off (set INSTRUMENTATION = True in config.py)")
+        else:
+            recorder.report()
+        if hasattr(self._detector, "hit_rate"):  # Frame cache counters, once the vision stack is in use
+            self._detector.report()
+        if isinstance(self.backend, TranscriptCache):
+            self.backend.report()
+        if self.prewarmer is not None:
+            self.prewarmer.report()
+        if self.scheduler is not None:
+            self.scheduler.report()
+
+    def report_unknown_command(self, command: str):
+        print(f"Unknown command: '{command}'")
+        print("Available commands: scroll, down, up, next, previous, auto, faster, slower, pause, stats, stop, like")
         
     def run(self):
         """Main application loop"""
@@ -176,31 +498,34 @@ class InstagramVoiceController:
         print("3. Say commands like 'scroll', 'down', 'up', or 'stop'")
         print("4. Press Ctrl+C to exit anytime")
         print("\nStarting voice recognition...")
+        self.microphone  # Waits for the background setup; raises here if it could not open the device
         
-        # Calibrate microphone
-        if not self.calibrate_microphone():
+        # Calibrate microphone (skipped when a saved noise profile exists; the threshold keeps adapting)
+        if self.noise_estimator is not None and self.noise_estimator.load():
+            print(f"Loaded noise profile (energy threshold {self.recognizer.energy_threshold:.0f}), skipping calibration")
+        elif not self.calibrate_microphone():
             print("Failed to calibrate microphone. Exiting...")
             return
+
+        if CONTINUOUS_CAPTURE:
+            self.start_audio_stream()
             
         print("\nListening for commands... (Say 'stop' to quit)")
         print("-" * 40)
         
-        while self.is_running:
-            try:
-                command = self.listen_for_command()
-                
-                if command:
-                    if not self.process_command(command):
-                        print(f"Unknown command: '{command}'")
-                        print("Available commands: scroll, down, up, stop, like")
-                        
-            except KeyboardInterrupt:
-                print("\n\nReceived interrupt signal. Shutting down...")
-                break
-            except Exception as e:
-                print(f"Unexpected error: {e}")
-                time.sleep(1)  # Brief pause before continuing
+        # Capture, recognition and dispatch run concurrently until the session stops
+        try:
+            CommandPipeline(self, queue_size=COMMAND_QUEUE_SIZE).run()
+        except Exception as e:
+            print(f"Unexpected error: {e}")
                 
+        self.stop_audio_stream()
+        recorder = instrumentation.recorder()
+        if recorder is not None and recorder.recorded:
+            print("\nLatency by stage:")
+            recorder.report()
+            if LATENCY_EXPORT_PATH:
+                print(f"Wrote {recorder.export_jsonl(LATENCY_EXPORT_PATH)} timings to {LATENCY_EXPORT_PATH}")
         print("\nVoice control session ended. Goodbye!")
 
 
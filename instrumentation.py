@@ -0,0 +1,190 @@
+#instrumentation.py
+"""
+Latency instrumentation
+Stage timings (monotonic start/end per capture, recognition, match, action,
+frame detection, ...) are written into a fixed-size ring buffer that never
+grows or locks. Summaries with p50/p95/p99 per stage are computed only when
+asked for, and the raw spans can be exported as JSON lines for offline
+analysis.
+
+Instrumentation is off until `configure()` is called; while it is off,
+`span()` returns a shared no-op context manager, so instrumented code pays
+one function call per stage.
+
+Overhead per span, disabled and enabled:
+    python instrumentation.py
+"""
+
+import itertools
+import json
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class LatencyRecorder:
+    """Ring buffer of (stage, start, end) spans; the oldest spans are overwritten"""
+
+    def __init__(self, capacity: int = 8192):
+        self.capacity = capacity
+        self._stage_ids: Dict[str, int] = {}
+        self._stage_names: List[str] = []
+        self._stages = [0] * capacity
+        self._starts = [0.0] * capacity
+        self._ends = [0.0] * capacity
+        self._counter = itertools.count()  # next() is atomic, so writers never need a lock
+        self._lock = threading.Lock()      # Only taken when a new stage name appears
+        self.recorded = 0                  # Spans recorded so far, including ones already overwritten
+
+    def _stage_id(self, stage: str) -> int:
+        stage_id = self._stage_ids.get(stage)
+        if stage_id is None:
+            with self._lock:
+                stage_id = self._stage_ids.setdefault(stage, len(self._stage_names))
+                if stage_id == len(self._stage_names):
+                    self._stage_names.append(stage)
+        return stage_id
+
+    def record(self, stage: str, start: float, end: Optional[float] = None):
+        """Store one span; times are time.monotonic() values"""
+        index = next(self._counter)
+        slot = index % self.capacity
+        self._stages[slot] = self._stage_id(stage)
+        self._starts[slot] = start
+        self._ends[slot] = time.monotonic() if end is None else end
+        self.recorded = max(self.recorded, index + 1)
+
+    def span(self, stage: str) -> "_Span":
+        return _Span(self, stage)
+
+    def spans(self) -> List[Tuple[str, float, float]]:
+        """Spans still in the buffer, oldest first"""
+        total = self.recorded
+        count = min(total, self.capacity)
+        first = total - count
+        slots = [(first + i) % self.capacity for i in range(count)]
+        return [(self._stage_names[self._stages[s]], self._starts[s], self._ends[s]) for s in slots]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per stage: count, p50, p95, p99 and max duration in milliseconds"""
+        spans = self.spans()
+        if not spans:
+            return {}
+        stages = np.array([self._stage_ids[name] for name, _, _ in spans])
+        durations = np.array([end - start for _, start, end in spans]) * 1000
+        result = {}
+        for stage_id, name in enumerate(self._stage_names):
+            values = durations[stages == stage_id]
+            if values.size == 0:
+                continue
+            p50, p95, p99 = np.percentile(values, (50, 95, 99))
+            result[name] = {"count": int(values.size), "p50": float(p50), "p95": float(p95),
+                            "p99": float(p99), "max": float(values.max())}
+        return result
+
+    def report(self):
+        """Print the per-stage latency table"""
+        summary = self.summary()
+        if not summary:
+            print("No timings recorded yet")
+            return
+        print(f"{'stage':<20} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for name, stats in summary.items():
+            print(f"{name:<20} {stats['count']:>6} {stats['p50']:>8.1f} {stats['p95']:>8.1f} "
+                  f"{stats['p99']:>8.1f} {stats['max']:>8.1f}")
+
+    def export_jsonl(self, path: str) -> int:
+        """Append the buffered spans to a JSON-lines file; returns the number written"""
+        spans = self.spans()
+        with open(path, "a") as f:
+            for stage, start, end in spans:
+                f.write(json.dumps({"stage": stage, "start": start, "end": end,
+                                    "ms": round((end - start) * 1000, 3)}) + "\n")
+        return len(spans)
+
+
+class _Span:
+    __slots__ = ("recorder", "stage", "start")
+
+    def __init__(self, recorder: LatencyRecorder, stage: str):
+        self.recorder = recorder
+        self.stage = stage
+
+    def __enter__(self) -> "_Span":
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.recorder.record(self.stage, self.start)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+_recorder: Optional[LatencyRecorder] = None
+
+
+def configure(enabled: bool = True, capacity: int = 8192) -> Optional[LatencyRecorder]:
+    """Turn process-wide instrumentation on (with a fresh buffer) or off"""
+    global _recorder
+    _recorder = LatencyRecorder(capacity) if enabled else None
+    return _recorder
+
+
+def recorder() -> Optional[LatencyRecorder]:
+    """The active recorder, or None when instrumentation is off"""
+    return _recorder
+
+
+def span(stage: str):
+    """Context manager timing one stage (a shared no-op when instrumentation is off)"""
+    active = _recorder
+    if active is None:
+        return _NULL_SPAN
+    return _Span(active, stage)
+
+
+def record(stage: str, start: float, end: Optional[float] = None):
+    """Record a span measured elsewhere (e.g. from a timestamp taken in another thread)"""
+    active = _recorder
+    if active is not None:
+        active.record(stage, start, end)
+
+
+def benchmark(iterations: int = 200000):
+    """Cost of an instrumented stage with instrumentation off and on"""
+    def run():
+        start = time.perf_counter()
+        for _ in range(iterations):
+            with span("stage"):
+                pass
+        return (time.perf_counter() - start) / iterations * 1e9
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        pass
+    baseline = (time.perf_counter() - start) / iterations * 1e9
+
+    configure(enabled=False)
+    disabled = run()
+    configure(enabled=True)
+    enabled = run()
+    print(f"Empty loop:            {baseline:>6.0f} ns/iteration")
+    print(f"span() when disabled:  {disabled - baseline:>6.0f} ns")
+    print(f"span() when enabled:   {enabled - baseline:>6.0f} ns")
+    recorder().report()
+    configure(enabled=False)
+
+
+if __name__ == "__main__":
+    benchmark()
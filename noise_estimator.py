@@ -0,0 +1,154 @@
+#noise_estimator.py
+"""
+Background noise-floor tracking
+Replaces the one-off `adjust_for_ambient_noise` at startup. Every captured
+chunk is fed to the estimator from the audio producer thread; chunks below
+the current energy threshold (non-speech) update an exponential moving
+average of the noise floor, and the recognizer's energy_threshold follows
+it live. If the room gets louder than the threshold, nothing looks like
+non-speech any more; a run of loud audio longer than any command is then
+taken as the new noise (its quietest chunk becomes the floor).
+
+The threshold is saved to a small JSON profile, so the next start can skip
+the blocking calibration: config.NOISE_PROFILE_PATH, or by default
+instascroller/noise_profile.json under %APPDATA% on Windows and under
+$XDG_CONFIG_HOME (or ~/.config) elsewhere.
+
+Threshold tracking on a simulated room that gets louder:
+    python noise_estimator.py
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+import speech_recognition as sr
+
+from audio_stream import rms
+
+
+def default_profile_path() -> str:
+    """noise_profile.json in the per-user config directory (%APPDATA% on Windows, $XDG_CONFIG_HOME or ~/.config)"""
+    if os.name == "nt" and os.environ.get("APPDATA"):
+        base = os.environ["APPDATA"]
+    else:
+        base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, "instascroller", "noise_profile.json")
+
+
+class NoiseFloorEstimator:
+    """
+    Keeps `recognizer.energy_threshold` at `ratio` times the tracked noise
+    floor (the same rule as SpeechRecognition's dynamic threshold).
+    """
+
+    def __init__(self, recognizer: sr.Recognizer, profile_path: Optional[str] = None,
+                 alpha: float = 0.05, ratio: float = 1.5, min_threshold: float = 50.0,
+                 max_speech: float = 3.0, save_interval: float = 30.0):
+        self.recognizer = recognizer
+        self.profile_path = profile_path
+        self.alpha = alpha                  # EMA weight of each non-speech chunk
+        self.ratio = ratio
+        self.min_threshold = min_threshold
+        self.max_speech = max_speech        # Loud runs longer than this (seconds) are noise, not a command
+        self.save_interval = save_interval  # Seconds between profile writes
+        self.noise_floor: Optional[float] = None
+        self.updates = 0
+        self._loud_seconds = 0.0
+        self._loud_min = float("inf")
+        self._last_saved = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _set_floor(self, floor: float):
+        self.noise_floor = floor
+        self.recognizer.energy_threshold = max(self.min_threshold, floor * self.ratio)
+        self.updates += 1
+
+    def observe(self, chunk: bytes, sample_width: int, seconds: float):
+        """Feed one captured chunk of `seconds` duration"""
+        energy = rms(chunk, sample_width)
+        with self._lock:
+            if self.noise_floor is None:
+                self._set_floor(min(energy, self.recognizer.energy_threshold / self.ratio))
+            elif energy <= self.recognizer.energy_threshold:
+                self._loud_seconds, self._loud_min = 0.0, float("inf")
+                self._set_floor((1 - self.alpha) * self.noise_floor + self.alpha * energy)
+            else:
+                # Possibly speech; only a run longer than any command is treated as the new noise level
+                self._loud_seconds += seconds
+                self._loud_min = min(self._loud_min, energy)
+                if self._loud_seconds > self.max_speech:
+                    self._set_floor(self._loud_min)
+                    self._loud_seconds, self._loud_min = 0.0, float("inf")
+        if self.profile_path and time.monotonic() - self._last_saved > self.save_interval:
+            self.save()
+
+    def load(self) -> bool:
+        """Restore the saved threshold; False when there is no usable profile"""
+        if not self.profile_path or not os.path.exists(self.profile_path):
+            return False
+        try:
+            with open(self.profile_path) as f:
+                profile = json.load(f)
+            threshold = float(profile["energy_threshold"])
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring noise profile {self.profile_path}: {e}")
+            return False
+        with self._lock:
+            self.recognizer.energy_threshold = max(self.min_threshold, threshold)
+            self.noise_floor = self.recognizer.energy_threshold / self.ratio
+        return True
+
+    def save(self):
+        """Write the current threshold to the profile (atomically)"""
+        self._last_saved = time.monotonic()
+        if not self.profile_path:
+            return
+        profile = {"energy_threshold": self.recognizer.energy_threshold, "noise_floor": self.noise_floor,
+                   "saved_at": time.time()}
+        temp_path = self.profile_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.profile_path)), exist_ok=True)
+            with open(temp_path, "w") as f:
+                json.dump(profile, f)
+            os.replace(temp_path, self.profile_path)
+        except OSError as e:
+            print(f"Could not save noise profile: {e}")
+
+
+def simulate(seed: int = 0):
+    """Quiet room, then a TV turns on; commands are spoken throughout"""
+    rng = np.random.default_rng(seed)
+    rate, chunk_size = 16000, 1024
+    seconds = chunk_size / rate
+    recognizer = sr.Recognizer()  # Default threshold 300, as if never calibrated
+    estimator = NoiseFloorEstimator(recognizer)
+
+    def chunk(level: float) -> bytes:
+        return np.clip(rng.normal(0, level, chunk_size), -32768, 32767).astype(np.int16).tobytes()
+
+    timeline = []
+    for second in range(60):
+        noise = 60.0 if second < 20 else 900.0  # TV on at 20 s
+        speaking = second % 5 == 2               # A one-second command every five seconds
+        heard = missed = false = 0
+        for _ in range(int(1 / seconds)):
+            level = noise + 3000.0 if speaking else noise
+            above = rms(chunk(level), 2) > recognizer.energy_threshold
+            heard += speaking and above
+            missed += speaking and not above
+            false += not speaking and above
+            estimator.observe(chunk(level), 2, seconds)
+        timeline.append((second, noise, recognizer.energy_threshold, speaking, heard, missed, false))
+
+    print(f"{'t (s)':>5} {'noise rms':>9} {'threshold':>9} {'speech chunks heard':>20} {'noise chunks over':>18}")
+    for second, noise, threshold, speaking, heard, missed, false in timeline[::2] + [timeline[-1]]:
+        speech = f"{heard}/{heard + missed}" if speaking else "-"
+        print(f"{second:>5} {noise:>9.0f} {threshold:>9.0f} {speech:>20} {false:>18}")
+
+
+if __name__ == "__main__":
+    simulate()
@@ -0,0 +1,109 @@
+#post_locator.py
+"""
+Post locator
+Keeps a cached layout map of the feed (the post rectangles found by
+VideoPlayerDetector) so actions such as liking can target the current post
+with one cached lookup. The cache is refreshed only after the page scrolls.
+"""
+
+import time
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+
+from screen_capture import ScreenCapture
+from video_detector_demo import VideoPlayerDetector
+
+Rect = Tuple[int, int, int, int]
+
+
+class PostLocator:
+    """
+    `input_size` is the (width, height) the input backend uses for the
+    screen; on HiDPI displays it differs from the captured pixel size, and
+    points are scaled accordingly.
+    """
+
+    def __init__(self, screen: ScreenCapture, detector: VideoPlayerDetector,
+                 input_size: Optional[Tuple[int, int]] = None):
+        self.screen = screen
+        self.detector = detector
+        self.input_size = input_size
+        self._layout: Optional[List[Rect]] = None
+        self.refreshes = 0
+
+    def invalidate(self):
+        """Forget the layout (call after every scroll)"""
+        self._layout = None
+        self.screen.reset_roi()
+
+    def layout(self) -> List[Rect]:
+        """Post rectangles in captured-pixel coordinates, detected once per scroll position"""
+        if self._layout is None:
+            self._layout = self.screen.detect(self.detector)
+            self.refreshes += 1
+        return self._layout
+
+    def refresh(self) -> List[Rect]:
+        """Detect the layout again now, e.g. while the page is still loading or moving"""
+        self._layout = None
+        return self.layout()
+
+    def current_post(self) -> Optional[Rect]:
+        """The post covering most of the middle band (middle third) of the screen, or None if none reaches it"""
+        rectangles = self.layout()
+        height = self.screen.screen_size[1]
+        band_top, band_bottom = height / 3, 2 * height / 3
+
+        def band_area(rect: Rect) -> float:
+            _, y, w, h = rect
+            return w * max(0.0, min(y + h, band_bottom) - max(y, band_top))
+
+        best = max(rectangles, key=band_area, default=None)
+        return best if best is not None and band_area(best) > 0 else None
+
+    def is_playing(self, post: Rect, interval: float = 0.15, diff_threshold: float = 6.0,
+                   cancel: Optional[Callable[[], bool]] = None) -> Optional[bool]:
+        """
+        Whether the content inside `post` changes over `interval` seconds (a
+        playing video), by frame differencing two downscaled grabs of it the
+        way VideoPlayerTracker checks for movement. None when `cancel`
+        returned True while waiting.
+        """
+        width, height = self.screen.screen_size
+        x, y, w, h = post
+        left, top = max(0, x), max(0, y)
+        region = (left, top, min(width, x + w) - left, min(height, y + h) - top)
+        if region[2] <= 0 or region[3] <= 0:
+            return False
+        before = self._gray(region)
+        deadline = time.monotonic() + interval
+        while time.monotonic() < deadline:
+            if cancel is not None and cancel():
+                return None
+            time.sleep(min(0.02, max(0.0, deadline - time.monotonic())))
+        return float(cv2.absdiff(before, self._gray(region)).mean()) > diff_threshold
+
+    def _gray(self, region: Rect):
+        bgra = self.screen.grab_bgra(region)
+        scale = self.screen.scale
+        if scale != 1.0:
+            bgra = cv2.resize(bgra, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY)
+
+    def to_input(self, x: float, y: float) -> Tuple[int, int]:
+        """Map a captured-pixel point to input-backend coordinates"""
+        width, height = self.screen.screen_size
+        left, top = self.screen.monitor["left"], self.screen.monitor["top"]
+        if self.input_size:
+            x, y = x * self.input_size[0] / width, y * self.input_size[1] / height
+            left, top = left * self.input_size[0] / width, top * self.input_size[1] / height
+        return int(round(left + x)), int(round(top + y))
+
+    def post_center(self) -> Optional[Tuple[int, int]]:
+        """Center of the current post in input coordinates, or None when no post is found"""
+        post = self.current_post()
+        if post is None:
+            return None
+        x, y, w, h = post
+        return self.to_input(x + w / 2, y + h / 2)
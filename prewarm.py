@@ -0,0 +1,87 @@
+#prewarm.py
+"""
+Speculative pre-warming
+While a phrase is still being recognized, the dispatch thread has nothing
+to do. It uses that time to get ready for the command most likely to come
+next: the input backend is woken up if it has been idle (the first
+pyautogui call after a pause is slow), and if the predicted command reads
+the post layout (e.g. "like" after "down"), the layout is detected ahead of
+time. Predictions come from first-order transition counts over the
+commands actually executed in this session.
+"""
+
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Collection, Dict, Optional
+
+
+class NextCommandPredictor:
+    """Most frequent successor of the last executed action"""
+
+    def __init__(self):
+        self.transitions: Dict[Optional[Callable], Counter] = defaultdict(Counter)
+        self.last: Optional[Callable] = None
+
+    def observe(self, action: Callable):
+        self.transitions[self.last][action] += 1
+        self.last = action
+
+    def predict(self) -> Optional[Callable]:
+        successors = self.transitions.get(self.last)
+        if not successors:
+            return None
+        return successors.most_common(1)[0][0]
+
+
+class Prewarmer:
+    """
+    `warm_input` wakes the input backend and `warm_layout` fills the layout
+    cache; `layout_actions` are the actions that read the layout. Call
+    `observe` for every executed action and `warm` whenever a phrase is
+    pending. The layout is only detected once the page has had `settle`
+    seconds to stop moving after the last action.
+    """
+
+    def __init__(self, warm_input: Callable[[], None], warm_layout: Callable[[], None],
+                 layout_actions: Collection[Callable], idle_after: float = 10.0, settle: float = 0.3,
+                 clock: Callable[[], float] = time.monotonic):
+        self.warm_input = warm_input
+        self.warm_layout = warm_layout
+        self.layout_actions = layout_actions
+        self.idle_after = idle_after
+        self.settle = settle
+        self.clock = clock
+        self.predictor = NextCommandPredictor()
+        self.last_action_at = clock()
+        self._input_warm = False
+        self._layout_warm = False
+        self.input_warms = 0
+        self.layout_warms = 0
+        self.layout_used = 0   # Layout warmed and the next command did read it
+        self.warm_seconds = 0.0
+
+    def observe(self, action: Callable):
+        if self._layout_warm and action in self.layout_actions:
+            self.layout_used += 1
+        self.predictor.observe(action)
+        self.last_action_at = self.clock()
+        self._input_warm = False
+        self._layout_warm = False
+
+    def warm(self):
+        """Prepare for the predicted command; cheap to call repeatedly while a phrase is pending"""
+        idle = self.clock() - self.last_action_at
+        started = time.perf_counter()
+        if not self._input_warm and idle >= self.idle_after:
+            self._input_warm = True
+            self.warm_input()
+            self.input_warms += 1
+        if not self._layout_warm and idle >= self.settle and self.predictor.predict() in self.layout_actions:
+            self._layout_warm = True
+            self.warm_layout()
+            self.layout_warms += 1
+        self.warm_seconds += time.perf_counter() - started
+
+    def report(self):
+        print(f"Pre-warming: input woken {self.input_warms} times, layout warmed {self.layout_warms} times "
+              f"({self.layout_used} used by the next command), {self.warm_seconds * 1000:.0f} ms spent")
@@ -0,0 +1,249 @@
+#recognizers.py
+"""
+Pluggable speech recognizer backends
+The controller hands captured phrases to a RecognizerBackend and gets a
+transcript back. GoogleBackend wraps the Google Web Speech API; KeywordSpotter
+matches MFCC features against a few recorded samples per keyword with DTW and
+runs entirely on the CPU, with no network.
+"""
+
+import glob
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import speech_recognition as sr
+
+
+class RecognizerBackend:
+    """Turns an sr.AudioData phrase into a lowercase transcript"""
+
+    name = "base"
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        """Return the transcript, or raise sr.UnknownValueError / sr.RequestError"""
+        raise NotImplementedError
+
+
+class GoogleBackend(RecognizerBackend):
+    """Google Web Speech API (needs a network connection)"""
+
+    name = "google"
+
+    def __init__(self, recognizer: sr.Recognizer):
+        self.recognizer = recognizer
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        return self.recognizer.recognize_google(audio).lower()
+
+
+# Feature extraction ---------------------------------------------------------
+
+FEATURE_RATE = 16000   # All audio is resampled to this rate before feature extraction
+FRAME_LENGTH = 400     # 25 ms analysis window
+FRAME_STEP = 160       # 10 ms hop
+FFT_SIZE = 512
+MEL_BANDS = 26
+MFCC_COUNT = 13
+
+
+def _mel_filterbank(sample_rate: int = FEATURE_RATE, fft_size: int = FFT_SIZE,
+                    bands: int = MEL_BANDS) -> np.ndarray:
+    """Triangular mel filters as a (bands, fft_size // 2 + 1) matrix"""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    mel_points = np.linspace(hz_to_mel(0.0), hz_to_mel(sample_rate / 2.0), bands + 2)
+    bins = np.floor((fft_size + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+    filters = np.zeros((bands, fft_size // 2 + 1))
+    for i in range(1, bands + 1):
+        left, center, right = bins[i - 1], bins[i], bins[i + 1]
+        if center > left:
+            filters[i - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            filters[i - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return filters
+
+
+def _dct_matrix(bands: int = MEL_BANDS, count: int = MFCC_COUNT) -> np.ndarray:
+    """Orthonormal DCT-II basis, (bands, count)"""
+    n = np.arange(bands)
+    k = np.arange(count)[:, None]
+    basis = np.cos(np.pi * k * (2 * n + 1) / (2 * bands)) * np.sqrt(2.0 / bands)
+    basis[0] /= np.sqrt(2.0)
+    return basis.T
+
+
+_MEL_FILTERS = _mel_filterbank()
+_DCT = _dct_matrix()
+_WINDOW = np.hamming(FRAME_LENGTH)
+
+
+def audio_to_samples(audio: sr.AudioData) -> np.ndarray:
+    """Mono float samples in [-1, 1] at FEATURE_RATE"""
+    raw = audio.get_raw_data(convert_rate=FEATURE_RATE, convert_width=2)
+    return np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def frame_signal(samples: np.ndarray) -> np.ndarray:
+    """Split samples into overlapping analysis frames without copying"""
+    if samples.size < FRAME_LENGTH:
+        samples = np.pad(samples, (0, FRAME_LENGTH - samples.size))
+    count = 1 + (samples.size - FRAME_LENGTH) // FRAME_STEP
+    return np.lib.stride_tricks.as_strided(
+        samples, shape=(count, FRAME_LENGTH),
+        strides=(samples.strides[0] * FRAME_STEP, samples.strides[0]), writeable=False)
+
+
+def mfcc(samples: np.ndarray, trim_db: float = 35.0) -> np.ndarray:
+    """
+    MFCC features, one row per 10 ms frame, with cepstral mean normalization.
+    Leading and trailing frames more than `trim_db` below the loudest frame are
+    dropped so templates line up on the spoken word rather than the silence.
+    """
+    emphasized = np.append(samples[:1], samples[1:] - 0.97 * samples[:-1]).astype(np.float32)
+    frames = frame_signal(emphasized) * _WINDOW
+    power = np.abs(np.fft.rfft(frames, FFT_SIZE)) ** 2 / FFT_SIZE
+    log_mel = np.log(power @ _MEL_FILTERS.T + 1e-10)
+
+    energy_db = 10.0 * np.log10(power.sum(axis=1) + 1e-10)
+    voiced = np.flatnonzero(energy_db > energy_db.max() - trim_db)
+    if voiced.size:
+        log_mel = log_mel[voiced[0]:voiced[-1] + 1]
+
+    features = log_mel @ _DCT
+    return features - features.mean(axis=0)
+
+
+def dtw_distance(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Dynamic time warping distance between two feature sequences, normalized by
+    path length. The recurrence is evaluated one anti-diagonal at a time so
+    each step is a single vectorized NumPy operation.
+    """
+    n, m = len(a), len(b)
+    if n == 0 or m == 0:
+        return float("inf")
+    cost = np.sqrt(np.maximum(
+        (a * a).sum(axis=1)[:, None] + (b * b).sum(axis=1)[None, :] - 2.0 * a @ b.T, 0.0))
+    acc = np.full((n + 1, m + 1), np.inf)
+    acc[0, 0] = 0.0
+    for k in range(2, n + m + 1):
+        i = np.arange(max(1, k - m), min(n, k - 1) + 1)
+        j = k - i
+        acc[i, j] = cost[i - 1, j - 1] + np.minimum(np.minimum(acc[i - 1, j - 1], acc[i - 1, j]), acc[i, j - 1])
+    return float(acc[n, m] / (n + m))
+
+
+# Keyword spotting -----------------------------------------------------------
+
+class KeywordSpotter(RecognizerBackend):
+    """
+    Offline recognizer for a small, fixed command set. Each keyword is
+    described by a few recorded samples; a phrase is labelled with the keyword
+    of its nearest template, provided the DTW distance is below `max_distance`.
+    """
+
+    name = "keyword"
+
+    def __init__(self, max_distance: float = 4.0, partial_ratio: float = 0.75, partial_margin: float = 1.5):
+        self.max_distance = max_distance
+        self.partial_ratio = partial_ratio    # Partial matches must be this much closer than max_distance
+        self.partial_margin = partial_margin  # ...and beat the runner-up keyword by this distance
+        self.templates: Dict[str, List[np.ndarray]] = {}
+
+    def add_template(self, keyword: str, audio: sr.AudioData):
+        self.templates.setdefault(keyword, []).append(mfcc(audio_to_samples(audio)))
+
+    def train_from_directory(self, samples_dir: str) -> int:
+        """
+        Load templates from `samples_dir/<keyword>/*.wav`. Underscores in the
+        directory name become spaces, so `scroll_down/` trains "scroll down".
+        Returns the number of samples loaded.
+        """
+        loaded = 0
+        for path in sorted(glob.glob(os.path.join(samples_dir, "*", "*.wav"))):
+            keyword = os.path.basename(os.path.dirname(path)).replace("_", " ").lower()
+            with sr.AudioFile(path) as source:
+                self.add_template(keyword, sr.Recognizer().record(source))
+            loaded += 1
+        return loaded
+
+    def score(self, features: np.ndarray) -> List[Tuple[str, float]]:
+        """Best distance per keyword, nearest first"""
+        scores = [(keyword, min(dtw_distance(features, t) for t in templates))
+                  for keyword, templates in self.templates.items()]
+        return sorted(scores, key=lambda item: item[1])
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        if not self.templates:
+            raise sr.UnknownValueError("no keyword templates loaded")
+        scores = self.score(mfcc(audio_to_samples(audio)))
+        keyword, distance = scores[0]
+        if distance > self.max_distance:
+            raise sr.UnknownValueError(f"closest keyword '{keyword}' too far ({distance:.2f})")
+        return keyword
+
+    def recognize_partial(self, audio: sr.AudioData) -> Optional[str]:
+        """
+        Match a phrase that may still be in progress. Returns a keyword only when
+        the match is confident and no longer keyword starts with it (so
+        "scroll" never fires while the speaker may be saying "scroll up").
+        """
+        if not self.templates:
+            return None
+        scores = self.score(mfcc(audio_to_samples(audio)))
+        keyword, distance = scores[0]
+        if distance > self.max_distance * self.partial_ratio:
+            return None
+        if len(scores) > 1 and scores[1][1] - distance < self.partial_margin:
+            return None
+        if any(other.startswith(keyword + " ") for other in self.templates):
+            return None
+        return keyword
+
+
+def create_backend(name: str, recognizer: sr.Recognizer, samples_dir: Optional[str] = None,
+                   max_distance: float = 4.0) -> RecognizerBackend:
+    """Build the backend named in config.py ('google' or 'keyword')"""
+    if name == GoogleBackend.name:
+        return GoogleBackend(recognizer)
+    if name == KeywordSpotter.name:
+        spotter = KeywordSpotter(max_distance=max_distance)
+        if not samples_dir or spotter.train_from_directory(samples_dir) == 0:
+            raise ValueError(f"No keyword samples found in '{samples_dir}'. "
+                             f"Record some with: python recognizers.py record <keyword>")
+        return spotter
+    raise ValueError(f"Unknown recognizer backend: '{name}'")
+
+
+def record_samples(keyword: str, samples_dir: str, count: int = 5):
+    """Record `count` samples of a keyword from the microphone for KeywordSpotter"""
+    target = os.path.join(samples_dir, keyword.replace(" ", "_"))
+    os.makedirs(target, exist_ok=True)
+    recognizer = sr.Recognizer()
+    with sr.Microphone() as source:
+        recognizer.adjust_for_ambient_noise(source, duration=1)
+        for i in range(count):
+            print(f"[{i + 1}/{count}] Say '{keyword}'...")
+            audio = recognizer.listen(source, phrase_time_limit=2)
+            path = os.path.join(target, f"{int(time.time() * 1000)}.wav")
+            with open(path, "wb") as f:
+                f.write(audio.get_wav_data())
+            print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == "record":
+        try:
+            from config import KEYWORD_SAMPLES_DIR
+        except ImportError:
+            KEYWORD_SAMPLES_DIR = "keyword_samples"
+        record_samples(sys.argv[2], KEYWORD_SAMPLES_DIR, int(sys.argv[3]) if len(sys.argv) > 3 else 5)
+    else:
+        print("Usage: python recognizers.py record <keyword> [count]")
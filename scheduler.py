@@ -0,0 +1,152 @@
+#scheduler.py
+"""
+Vision scheduler
+Shares the dispatch thread (and the CPU) between voice commands and vision
+work such as capture_screen + detect_video_players. Commands and phrases
+being recognized always come first: the pipeline only offers the scheduler
+a slot when no command is queued and no phrase is pending. Within those
+slots a vision task runs only when
+
+- its frame interval has elapsed: `active_fps` while the page is moving
+  (for `active_for` seconds after a scroll, or while autoscrolling),
+  `idle_fps` otherwise, and
+- it fits the budget: a token bucket refilled with `budget` seconds of work
+  (wall or CPU time of the dispatch thread) per second. A run may overdraw
+  it, and the next run waits until the debt is paid back, so over time
+  vision never takes more than that share whatever a frame costs.
+
+When the p95 of recent command latencies rises above `latency_target`, the
+interval is lengthened and the budget divided by a back-off factor that
+doubles (up to `max_backoff`); it halves again once latencies are back under
+the target, or after `recover_after` seconds without a slow command.
+
+Command latency under a CPU-heavy detector, unscheduled vs scheduled:
+    python benchmarks/vision_load.py
+"""
+
+import math
+import time
+from collections import deque
+from typing import Callable, Optional
+
+BUDGET_CLOCKS = {"wall": time.perf_counter, "cpu": time.thread_time}
+
+
+class VisionScheduler:
+    """
+    `task()` does one unit of vision work (one frame); `scrolling()` says
+    whether the page is moving on its own (autoscroll). Call `activity()`
+    whenever the page moves, `observe_latency(seconds)` for every executed
+    command, and `tick(cancel)` whenever the dispatch thread is idle.
+    """
+
+    def __init__(self, task: Callable[[], None], scrolling: Callable[[], bool] = lambda: False,
+                 budget: float = 0.25, active_fps: float = 30.0, idle_fps: float = 1.0, active_for: float = 2.0,
+                 latency_target: float = 1.0, latency_window: int = 10, max_backoff: float = 8.0, recover_after: float = 10.0,
+                 budget_clock: str = "wall", clock: Callable[[], float] = time.monotonic):
+        self.task = task
+        self.scrolling = scrolling
+        self.budget = budget
+        self.active_fps = active_fps
+        self.idle_fps = idle_fps
+        self.active_for = active_for
+        self.latency_target = latency_target
+        self.max_backoff = max_backoff
+        self.recover_after = recover_after
+        self.cost_clock = BUDGET_CLOCKS[budget_clock]
+        self.clock = clock
+        self.latencies: "deque[float]" = deque(maxlen=latency_window)
+        self.backoff = 1.0
+        self.credit = budget          # Seconds of work the next run may spend; negative while in debt
+        self._refilled_at = clock()
+        self._active_until = 0.0
+        self._last_run: Optional[float] = None
+        self._slow_at = clock()       # Last time a command came in over the target
+        self.runs = 0
+        self.skipped = 0              # Slots where a frame was due but the budget was spent
+        self.backoffs = 0
+        self.recoveries = 0
+        self.work_seconds = 0.0
+
+    def activity(self):
+        """The page moved: run at the active frame rate for a while"""
+        self._active_until = self.clock() + self.active_for
+
+    @property
+    def active(self) -> bool:
+        return self.clock() < self._active_until or self.scrolling()
+
+    def interval(self) -> float:
+        fps = self.active_fps if self.active else self.idle_fps
+        return self.backoff / fps if fps > 0 else math.inf
+
+    def _refill(self, now: float):
+        rate = self.budget / self.backoff
+        self.credit = min(rate, self.credit + (now - self._refilled_at) * rate)
+        self._refilled_at = now
+
+    def due_in(self) -> Optional[float]:
+        """Seconds until the next frame may run (frame rate and budget), or None when vision is off"""
+        now = self.clock()
+        interval = self.interval()
+        if math.isinf(interval):
+            return None
+        self._refill(now)
+        frame_wait = 0.0 if self._last_run is None else self._last_run + interval - now
+        budget_wait = -self.credit * self.backoff / self.budget if self.credit < 0 else 0.0
+        return max(0.0, frame_wait, budget_wait)
+
+    def tick(self, cancel: Callable[[], bool] = lambda: False) -> bool:
+        """Run the task once if it is due and affordable; returns True when it ran"""
+        self._recover()
+        due_in = self.due_in()
+        if due_in is None or cancel():
+            return False
+        if due_in > 0.0:
+            if self.credit < 0:
+                self.skipped += 1
+            return False
+        self._last_run = self.clock()
+        started = self.cost_clock()
+        try:
+            self.task()
+        finally:
+            spent = self.cost_clock() - started
+            self.credit -= spent
+            self.work_seconds += spent
+            self.runs += 1
+        return True
+
+    def observe_latency(self, seconds: float):
+        """One command's latency (end of speech to action); backs off or recovers against the target"""
+        self.latencies.append(seconds)
+        if self.p95() > self.latency_target:
+            self._slow_at = self.clock()
+            if self.backoff < self.max_backoff:
+                self.backoff = min(self.max_backoff, self.backoff * 2)
+                self.backoffs += 1
+        elif self.backoff > 1.0:
+            self.backoff = max(1.0, self.backoff / 2)
+            self.recoveries += 1
+
+    def _recover(self):
+        # No slow command for a while (or no commands at all): give vision its share back step by step
+        now = self.clock()
+        if self.backoff > 1.0 and now - self._slow_at >= self.recover_after:
+            self.backoff = max(1.0, self.backoff / 2)
+            self.recoveries += 1
+            self._slow_at = now
+
+    def p95(self) -> Optional[float]:
+        """95th percentile (nearest rank) of the recent command latencies, in seconds"""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+    def report(self):
+        p95 = self.p95()
+        latency = "no commands yet" if p95 is None else f"command p95 {p95 * 1000:.0f} ms"
+        print(f"Vision scheduler: {self.runs} runs ({self.work_seconds * 1000:.0f} ms of work), "
+              f"{self.skipped} skipped over budget, backed off {self.backoffs} times and recovered "
+              f"{self.recoveries} (now x{self.backoff:g}), {latency} (target {self.latency_target * 1000:.0f} ms)")
@@ -0,0 +1,194 @@
+#screen_capture.py
+"""
+Screen capture with reusable buffers
+Wraps an mss session so that frames are converted into preallocated output
+arrays instead of new ones, can be downscaled before detection, and can be
+restricted to a tracked region of interest around the last detections.
+
+Benchmark on synthetic 4K frames (no display needed):
+    python screen_capture.py
+"""
+
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import mss
+import numpy as np
+from mss.screenshot import ScreenShot
+
+from instrumentation import span
+
+Rect = Tuple[int, int, int, int]
+
+
+class ScreenCapture:
+    """
+    Grabs the primary monitor (or a region of it) into reused BGR buffers.
+
+    Regions and rectangles are (x, y, w, h) in full-resolution coordinates of
+    the monitor image. Arrays returned by `grab` and `grab_scaled` are
+    overwritten by the next call of the same kind; copy them to keep them.
+    """
+
+    def __init__(self, sct=None, scale: float = 1.0, roi_margin: int = 64):
+        self.sct = sct if sct is not None else mss.mss()
+        self.monitor = self.sct.monitors[1]  # Primary monitor
+        self.scale = scale
+        self.roi_margin = roi_margin
+        self.roi: Optional[Rect] = None  # Region tracked around the last detections
+        self.bytes_copied = 0  # Bytes written by the last grab, including the mss grab itself
+        self._buffers = {}
+
+    @property
+    def screen_size(self) -> Tuple[int, int]:
+        return self.monitor["width"], self.monitor["height"]
+
+    def _buffer(self, name: str, shape: Tuple[int, ...]) -> np.ndarray:
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, np.uint8)
+            self._buffers[name] = buffer
+        return buffer
+
+    def grab_bgra(self, region: Optional[Rect] = None) -> np.ndarray:
+        """Zero-copy BGRA view over the mss grab of `region` (or the whole monitor)"""
+        if region:
+            monitor = {"left": self.monitor["left"] + region[0], "top": self.monitor["top"] + region[1],
+                       "width": region[2], "height": region[3]}
+        else:
+            monitor = self.monitor
+        with span("frame_capture"):
+            screenshot = self.sct.grab(monitor)
+        self.bytes_copied = len(screenshot.raw)
+        return np.frombuffer(screenshot.raw, np.uint8).reshape(screenshot.height, screenshot.width, 4)
+
+    def grab(self, region: Optional[Rect] = None) -> np.ndarray:
+        """Full-resolution BGR frame, converted into a reused buffer"""
+        bgra = self.grab_bgra(region)
+        out = self._buffer("bgr", bgra.shape[:2] + (3,))
+        cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=out)
+        self.bytes_copied += out.nbytes
+        return out
+
+    def grab_scaled(self, region: Optional[Rect] = None) -> np.ndarray:
+        """BGR frame downscaled by `self.scale`; resizing first keeps the color conversion small"""
+        bgra = self.grab_bgra(region)
+        if self.scale == 1.0:
+            out = self._buffer("bgr", bgra.shape[:2] + (3,))
+            cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=out)
+            self.bytes_copied += out.nbytes
+            return out
+        size = (max(1, round(bgra.shape[1] * self.scale)), max(1, round(bgra.shape[0] * self.scale)))
+        small = self._buffer("small_bgra", (size[1], size[0], 4))
+        cv2.resize(bgra, size, dst=small, interpolation=cv2.INTER_AREA)
+        out = self._buffer("small_bgr", (size[1], size[0], 3))
+        cv2.cvtColor(small, cv2.COLOR_BGRA2BGR, dst=out)
+        self.bytes_copied += small.nbytes + out.nbytes
+        return out
+
+    def track(self, rectangles: Sequence[Rect]):
+        """Restrict the next capture to the union of `rectangles` plus a margin (whole screen if empty)"""
+        if not rectangles:
+            self.roi = None
+            return
+        width, height = self.screen_size
+        left = max(0, min(x for x, _, _, _ in rectangles) - self.roi_margin)
+        top = max(0, min(y for _, y, _, _ in rectangles) - self.roi_margin)
+        right = min(width, max(x + w for x, _, w, _ in rectangles) + self.roi_margin)
+        bottom = min(height, max(y + h for _, y, _, h in rectangles) + self.roi_margin)
+        self.roi = (left, top, right - left, bottom - top)
+
+    def reset_roi(self):
+        """Go back to full-screen capture, e.g. after a scroll moved the layout"""
+        self.roi = None
+
+    def detect(self, detector) -> List[Rect]:
+        """
+        Capture the tracked region at reduced scale, run `detector` on it and
+        return rectangles in full-resolution monitor coordinates. The region
+        of interest follows the detections; when nothing is found the next
+        call falls back to the whole screen.
+        """
+        region = self.roi
+        img = self.grab_scaled(region)
+        offset = region[:2] if region else (0, 0)
+        rectangles = detector.detect_video_players(img, scale=self.scale, offset=offset,
+                                                   screen_size=self.screen_size)
+        self.track(rectangles)
+        return rectangles
+
+
+class SyntheticScreen:
+    """
+    Stand-in for an mss session that serves crops of a synthetic frame.
+    Like mss it copies the requested pixels into a fresh bytearray per grab.
+    """
+
+    def __init__(self, frame_bgra: np.ndarray):
+        self.frame = frame_bgra
+        height, width = frame_bgra.shape[:2]
+        monitor = {"left": 0, "top": 0, "width": width, "height": height}
+        self.monitors = [monitor, monitor]
+
+    def grab(self, monitor: dict) -> ScreenShot:
+        crop = self.frame[monitor["top"]:monitor["top"] + monitor["height"],
+                          monitor["left"]:monitor["left"] + monitor["width"]]
+        return ScreenShot(bytearray(crop.tobytes()), monitor)
+
+
+def synthetic_frame(width: int = 3840, height: int = 2160, seed: int = 0) -> np.ndarray:
+    """Dark page with a couple of post-sized panels, as a BGRA frame"""
+    rng = np.random.default_rng(seed)
+    frame = np.full((height, width, 4), 12, np.uint8)
+    frame[..., 3] = 255
+    post_w, post_h = width // 4, height // 2
+    for i, x in enumerate((width // 3, width // 3 + post_w // 2)):
+        y = height // 5 + i * (post_h + 80)
+        if y + post_h > height - 100:
+            continue
+        frame[y:y + post_h, x:x + post_w, :3] = rng.integers(60, 255, 3, dtype=np.uint8)
+    return frame
+
+
+def benchmark(frames: int = 30):
+    """FPS and bytes copied per frame: old full-frame path vs reused buffers vs ROI + 1/4 scale"""
+    from video_detector_demo import VideoPlayerDetector
+
+    screen = SyntheticScreen(synthetic_frame())
+    detector = VideoPlayerDetector()
+    width, height = screen.monitors[1]["width"], screen.monitors[1]["height"]
+    print(f"Synthetic {width}x{height} frames, {frames} per mode")
+    print(f"{'mode':<24} {'fps':>7} {'MB copied/frame':>16} {'detections':>11}")
+
+    def report(name, run):
+        run()  # Warm-up (allocates the reused buffers)
+        start = time.perf_counter()
+        for _ in range(frames):
+            rectangles, copied = run()
+        fps = frames / (time.perf_counter() - start)
+        print(f"{name:<24} {fps:>7.1f} {copied / 1e6:>16.1f} {len(rectangles):>11}")
+
+    def old_path():
+        screenshot = screen.grab(screen.monitors[1])
+        img = np.array(screenshot)
+        bgr = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+        return detector.detect_video_players(bgr), len(screenshot.raw) + img.nbytes + bgr.nbytes
+
+    full = ScreenCapture(sct=screen)
+
+    def reused_path():
+        return detector.detect_video_players(full.grab()), full.bytes_copied
+
+    tracked = ScreenCapture(sct=screen, scale=0.25)
+
+    def roi_path():
+        return tracked.detect(detector), tracked.bytes_copied
+
+    report("full frame (old)", old_path)
+    report("full frame, reused", reused_path)
+    report("ROI + 1/4 scale", roi_path)
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,232 @@
+#scroll_feedback.py
+"""
+Closed-loop "next post" scrolling
+Instead of one blind scroll of SCROLL_AMOUNT, the page is scrolled in steps
+and a downscaled frame is checked after each one: phase correlation between
+consecutive frames measures how far the page actually moved (and so how many
+pixels one scroll click is worth), and the detected post rectangles tell how
+far the next post still is from the alignment line. Scrolling stops once a
+new post is aligned, the page stops moving, or the step or time budget runs
+out.
+
+Harness against a synthetic scrolling feed and a recording input backend:
+    python scroll_feedback.py
+"""
+
+import time
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+from mss.screenshot import ScreenShot
+
+from screen_capture import ScreenCapture
+from video_detector_demo import VideoPlayerDetector
+
+Rect = Tuple[int, int, int, int]
+
+
+class ScrollResult(NamedTuple):
+    aligned: bool
+    steps: int
+    clicks: int      # Total scroll clicks sent
+    elapsed: float   # Seconds
+    post: Optional[Rect]
+
+
+class NextPostScroller:
+    """
+    Scrolls until the next post's top edge sits at `align_fraction` of the
+    screen height (within `tolerance` of the height).
+    """
+
+    def __init__(self, input_backend, screen: ScreenCapture, detector: VideoPlayerDetector,
+                 initial_clicks: int = 120, max_steps: int = 8, timeout: float = 3.0,
+                 align_fraction: float = 0.08, tolerance: float = 0.03,
+                 settle_timeout: float = 0.4, min_advance: float = 0.2, max_step: float = 0.35):
+        self.input = input_backend
+        self.screen = screen
+        self.detector = detector
+        self.initial_clicks = initial_clicks  # First probe step, before the click size is known
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.align_fraction = align_fraction
+        self.tolerance = tolerance
+        self.settle_timeout = settle_timeout  # Longest wait for smooth scrolling to come to rest
+        self.min_advance = min_advance        # Fraction of the screen to move before a post counts as "next"
+        self.max_step = max_step              # Largest move per step as a fraction of the screen; phase
+                                              # correlation cannot tell shifts past half a frame from wrap-around
+        self.pixels_per_click: Optional[float] = None  # Learned, kept across calls
+        self._window: Optional[np.ndarray] = None
+
+    def _grab(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(downscaled BGR frame copy, float32 gray thumbnail for motion estimation)"""
+        frame = self.screen.grab_scaled().copy()
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY).astype(np.float32)
+        return frame, gray
+
+    def _shift(self, before: np.ndarray, after: np.ndarray) -> float:
+        """Full-resolution pixels the content moved up between two thumbnails"""
+        if self._window is None or self._window.shape != before.shape:
+            self._window = cv2.createHanningWindow(before.shape[::-1], cv2.CV_32F)
+        (_, dy), _ = cv2.phaseCorrelate(before, after, self._window)
+        return -dy / self.screen.scale
+
+    def _settle(self, cancel: Optional[Callable[[], bool]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        # Grab until two consecutive frames match (smooth scrolling finished) or the settle time is up
+        deadline = time.monotonic() + self.settle_timeout
+        frame, current = self._grab()
+        while time.monotonic() < deadline and not (cancel and cancel()):
+            next_frame, following = self._grab()
+            if cv2.absdiff(current, following).mean() < 0.5:
+                return frame, current
+            frame, current = next_frame, following
+        return frame, current
+
+    def _posts(self, frame: np.ndarray) -> List[Rect]:
+        return self.detector.detect_video_players(frame, scale=self.screen.scale, screen_size=self.screen.screen_size)
+
+    def next_post(self, direction: int = -1, cancel: Optional[Callable[[], bool]] = None) -> ScrollResult:
+        """
+        Scroll to the next post (direction -1, down) or the previous one (+1,
+        up). `cancel` is polled between steps; returning True abandons the
+        scroll where it is.
+        """
+        started = time.monotonic()
+        height = self.screen.screen_size[1]
+        target = self.align_fraction * height
+        tolerance = self.tolerance * height
+        edge = 1.0 / self.screen.scale  # A post cut off by the top of the screen has no real top edge
+        frame, gray = self._grab()
+        moved = last_shift = 0.0
+        steps = clicks_sent = 0
+
+        while True:
+            posts = self._posts(frame)
+            aligned = [p for p in posts if abs(p[1] - target) <= tolerance]
+            if aligned and moved >= self.min_advance * height:
+                return ScrollResult(True, steps, clicks_sent, time.monotonic() - started, aligned[0])
+            if steps >= self.max_steps or time.monotonic() - started > self.timeout or (cancel and cancel()):
+                break
+
+            # Pixels each visible post top still has to travel to reach the line (negative once past it)
+            remaining = [(p[1] - target) * -direction for p in posts if p[1] > edge]
+            overshot = [r for r in remaining if r < -tolerance and r + last_shift > tolerance]
+            ahead = [r for r in remaining if r > tolerance]
+            step_direction = direction
+            if overshot and moved >= self.min_advance * height:
+                # The last step carried a post past the line: come back to it
+                distance = -max(overshot)
+                step_direction = -direction
+            else:
+                distance = min(ahead) if ahead else height  # Nothing ahead on screen: keep going
+            if self.pixels_per_click:
+                distance = min(distance, self.max_step * height)
+                clicks = max(1, int(round(distance / self.pixels_per_click)))
+            else:
+                clicks = self.initial_clicks
+
+            self.input.scroll(step_direction * clicks)
+            steps += 1
+            clicks_sent += clicks
+            new_frame, new_gray = self._settle(cancel)
+            shift = self._shift(gray, new_gray) * -step_direction
+            if abs(shift) < 1.0:
+                break  # The page did not move: end of the feed
+            expected = clicks * self.pixels_per_click if self.pixels_per_click else None
+            if expected is not None and not 0 < shift < 2.0 * expected:
+                # Implausible estimate (repetitive content, a page reflow): trust the learned click size instead
+                shift = expected
+            elif expected is None or shift > 0.5 * expected:
+                # A much shorter move means the feed ended mid-step; it says nothing about the click size
+                self.pixels_per_click = shift / clicks
+            last_shift = shift if step_direction == direction else -shift
+            moved += last_shift
+            frame, gray = new_frame, new_gray
+
+        return ScrollResult(False, steps, clicks_sent, time.monotonic() - started, None)
+
+
+class ScrollingFeed:
+    """
+    Fake screen over a tall synthetic feed. `scroll(clicks)` moves the
+    viewport like a browser would; wire it to RecordingBackend(on_scroll=...).
+    Posts whose index is in `playing` are videos: the middle of each shows
+    bars that move 7 rows down 30 times a second.
+    """
+
+    def __init__(self, width: int = 1920, height: int = 1080, posts: int = 12,
+                 pixels_per_click: float = 1.7, seed: int = 0, playing: Sequence[int] = ()):
+        rng = np.random.default_rng(seed)
+        self.pixels_per_click = pixels_per_click
+        self.height = height
+        self.playing = set(playing)
+        self.post_tops = []
+        self.post_rects: List[Rect] = []  # (x, y, w, h) in strip coordinates
+        post_w, gap = width // 3, 140
+        heights = rng.integers(height // 2, height * 4 // 5, posts)
+        total = int(heights.sum()) + gap * (posts + 1) + height
+        self.strip = np.full((total, width, 4), 14, np.uint8)
+        self.strip[..., 3] = 255
+        y = gap
+        for post_h in heights:
+            x = (width - post_w) // 2
+            self.strip[y:y + post_h, x:x + post_w, :3] = rng.integers(50, 255, 3, dtype=np.uint8)
+            # Irregular texture so motion can be measured inside posts too
+            rows = y + 20 + np.sort(rng.choice(post_h - 40, post_h // 25, replace=False))
+            self.strip[rows, x + 20:x + post_w - 20, :3] //= 2
+            self.post_tops.append(y)
+            self.post_rects.append((x, y, post_w, int(post_h)))
+            y += int(post_h) + gap
+        self.offset = 0.0
+        monitor = {"left": 0, "top": 0, "width": width, "height": height}
+        self.monitors = [monitor, monitor]
+
+    def scroll(self, clicks: int):
+        max_offset = self.strip.shape[0] - self.height
+        self.offset = float(np.clip(self.offset - clicks * self.pixels_per_click, 0, max_offset))
+
+    def post_at(self, y: float) -> Optional[int]:
+        """Index of the post under screen row `y`, if any"""
+        for index, (_, top, _, h) in enumerate(self.post_rects):
+            if top <= self.offset + y < top + h:
+                return index
+        return None
+
+    def grab(self, monitor: dict) -> ScreenShot:
+        top = int(self.offset) + monitor["top"]
+        left = monitor["left"]
+        crop = self.strip[top:top + monitor["height"], left:left + monitor["width"]]
+        if self.playing:
+            crop = crop.copy()
+            shift = int(time.monotonic() * 30) * 7
+            bars = np.where((np.arange(top, top + crop.shape[0]) + shift) // 32 % 2, 220, 60).astype(np.uint8)
+            for index in self.playing:
+                x, y, w, h = self.post_rects[index]
+                rows = slice(max(0, y + h // 4 - top), max(0, y + 3 * h // 4 - top))
+                cols = slice(max(0, x + w // 4 - left), max(0, x + 3 * w // 4 - left))
+                crop[rows, cols, :3] = bars[rows, None, None]
+        return ScreenShot(bytearray(crop.tobytes()), monitor)
+
+
+def main():
+    """Step through the synthetic feed and report alignment error, steps and time per post"""
+    from input_backend import RecordingBackend
+
+    feed = ScrollingFeed()
+    backend = RecordingBackend(on_scroll=feed.scroll)
+    scroller = NextPostScroller(backend, ScreenCapture(feed, scale=0.25), VideoPlayerDetector(),
+                                settle_timeout=0.0)
+    target = scroller.align_fraction * feed.height
+    print(f"{'post':>4} {'aligned':>8} {'steps':>6} {'clicks':>7} {'error px':>9} {'ms':>7}")
+    for i in range(8):
+        result = scroller.next_post()
+        visible = [top - feed.offset for top in feed.post_tops]
+        error = min(abs(top - target) for top in visible)
+        print(f"{i + 1:>4} {str(result.aligned):>8} {result.steps:>6} {result.clicks:>7} "
+              f"{error:>9.1f} {result.elapsed * 1000:>7.1f}")
+    print(f"Learned {scroller.pixels_per_click:.2f} px per click (feed uses {feed.pixels_per_click})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#streaming.py
+"""
+Streaming recognition
+Runs the keyword spotter on the phrase while it is still being recorded and
+ends the phrase as soon as a confident partial match appears, instead of
+waiting out the trailing silence before recognition even starts.
+
+Timing harness:
+    python streaming.py <keyword_samples_dir> clip1.wav [clip2.wav ...]
+replays each clip in real time and reports time-to-action for batch and
+streaming recognition.
+"""
+
+import sys
+import time
+from typing import List, Optional, Tuple
+
+import speech_recognition as sr
+
+from audio_stream import AudioStream, AudioStreamEnded, WavAudioSource, rms
+from recognizers import KeywordSpotter
+
+
+class PartialHypothesis:
+    """
+    `on_chunk` callback for AudioStream.listen. Every `interval_chunks` chunks
+    it runs the spotter on the phrase so far and asks the stream to stop once
+    a keyword is confidently matched.
+    """
+
+    def __init__(self, spotter: KeywordSpotter, sample_rate: int, sample_width: int,
+                 interval_chunks: int = 2, min_chunks: int = 3):
+        self.spotter = spotter
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.interval_chunks = interval_chunks
+        self.min_chunks = min_chunks
+        self.keyword: Optional[str] = None
+
+    def __call__(self, frames: List[bytes]) -> bool:
+        if len(frames) < self.min_chunks or len(frames) % self.interval_chunks:
+            return False
+        audio = sr.AudioData(b"".join(frames), self.sample_rate, self.sample_width)
+        self.keyword = self.spotter.recognize_partial(audio)
+        return self.keyword is not None
+
+
+def listen_streaming(audio_stream: AudioStream, recognizer: sr.Recognizer, spotter: KeywordSpotter,
+                     timeout: Optional[float] = None, phrase_time_limit: Optional[float] = None) -> Tuple[str, bool]:
+    """
+    Listen for one command with partial-hypothesis recognition.
+    Returns (transcript, early) where early is True if the command was
+    recognized before the phrase ended. Raises the same sr exceptions as
+    listening plus recognition.
+    """
+    partial = PartialHypothesis(spotter, audio_stream.source.SAMPLE_RATE, audio_stream.source.SAMPLE_WIDTH)
+    audio = audio_stream.listen(recognizer, timeout=timeout, phrase_time_limit=phrase_time_limit, on_chunk=partial)
+    if partial.keyword is not None:
+        return partial.keyword, True
+    return spotter.recognize(audio), False
+
+
+def speech_end_offset(path: str, energy_threshold: float, chunk_size: int = 1024) -> float:
+    """Seconds from the start of a clip to the end of its last voiced chunk"""
+    source = WavAudioSource(path, chunk_size=chunk_size)
+    end = 0.0
+    with source:
+        position = 0
+        while True:
+            chunk = source.stream.read(chunk_size)
+            if not chunk:
+                break
+            position += len(chunk) // source.SAMPLE_WIDTH
+            if rms(chunk, source.SAMPLE_WIDTH) > energy_threshold:
+                end = position / source.SAMPLE_RATE
+    return end
+
+
+def time_to_action(path: str, spotter: KeywordSpotter, streaming: bool,
+                   energy_threshold: float = 300, trailing_silence: float = 2.0) -> Tuple[Optional[str], float]:
+    """Replay a clip in real time; return (transcript, seconds from end of speech to recognized command)"""
+    recognizer = sr.Recognizer()
+    recognizer.energy_threshold = energy_threshold
+    offset = speech_end_offset(path, energy_threshold)
+    stream = AudioStream(WavAudioSource(path, realtime=True, trailing_silence=trailing_silence)).start()
+    try:
+        started_at = stream.source.stream.started_at
+        try:
+            if streaming:
+                transcript, _ = listen_streaming(stream, recognizer, spotter)
+            else:
+                transcript = spotter.recognize(stream.listen(recognizer))
+        except (sr.UnknownValueError, sr.WaitTimeoutError, AudioStreamEnded):
+            transcript = None
+        return transcript, time.monotonic() - (started_at + offset)
+    finally:
+        stream.stop()
+
+
+def main():
+    """Timing harness"""
+    if len(sys.argv) < 3:
+        print("Usage: python streaming.py <keyword_samples_dir> clip1.wav [clip2.wav ...]")
+        sys.exit(1)
+
+    spotter = KeywordSpotter()
+    print(f"Loaded {spotter.train_from_directory(sys.argv[1])} keyword samples")
+    print(f"{'clip':<32} {'transcript':<12} {'batch ms':>9} {'stream ms':>10}")
+    totals = [0.0, 0.0]
+    clips = sys.argv[2:]
+    for path in clips:
+        batch_text, batch_time = time_to_action(path, spotter, streaming=False)
+        stream_text, stream_time = time_to_action(path, spotter, streaming=True)
+        totals[0] += batch_time
+        totals[1] += stream_time
+        label = stream_text if stream_text == batch_text else f"{batch_text}/{stream_text}"
+        print(f"{path[-32:]:<32} {str(label):<12} {batch_time * 1000:>9.0f} {stream_time * 1000:>10.0f}")
+
+    batch_mean, stream_mean = totals[0] / len(clips), totals[1] / len(clips)
+    print(f"\nMean time-to-action: batch {batch_mean * 1000:.0f} ms, streaming {stream_mean * 1000:.0f} ms "
+          f"({stream_mean / batch_mean:.0%} of batch)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+#tests/conftest.py
+"""Shared fixtures: the repository root and benchmarks/ (for the device fakes) are importable"""
+
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from fakes import FakeMicrophone, FakeMss, FakePyAutoGUI, load_screen_frames, patched_devices  # noqa: E402
+
+
+@pytest.fixture
+def controller():
+    """A real InstagramVoiceController wired to the headless fakes"""
+    microphone, screen, pyautogui = FakeMicrophone([]), FakeMss(load_screen_frames(None)[:1]), FakePyAutoGUI()
+    with patched_devices(microphone, screen, pyautogui):
+        import instascroller
+        with contextlib.redirect_stdout(io.StringIO()):
+            controller = instascroller.InstagramVoiceController()
+        if controller.noise_estimator is not None:
+            controller.noise_estimator.profile_path = None  # Never touch the user's noise profile
+        yield controller
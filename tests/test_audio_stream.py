@@ -0,0 +1,67 @@
+#tests/test_audio_stream.py
+
+import contextlib
+import io
+
+import pytest
+import speech_recognition as sr
+
+from audio_stream import AudioStream, AudioStreamEnded
+from fakes import FakeMicrophone
+
+
+class FailingMicrophone(FakeMicrophone):
+    """Delivers a little silence, then the device read fails"""
+
+    class Stream(FakeMicrophone.Stream):
+        def read(self, size: int) -> bytes:
+            if self.position >= 4 * size:
+                raise OSError("device unplugged")
+            return super().read(size)
+
+    def __enter__(self) -> "FailingMicrophone":
+        self.stream = FailingMicrophone.Stream(self)
+        return self
+
+
+def quiet_recognizer() -> sr.Recognizer:
+    recognizer = sr.Recognizer()
+    recognizer.energy_threshold = 10 ** 6  # Nothing counts as speech
+    return recognizer
+
+
+def test_listen_raises_once_the_source_is_exhausted():
+    with AudioStream(FakeMicrophone([], speedup=1000.0)) as stream:
+        with pytest.raises(AudioStreamEnded) as ended:
+            stream.listen(quiet_recognizer())
+    assert ended.value.__cause__ is None
+    assert stream.exhausted
+
+
+def test_listen_raises_the_device_error():
+    with AudioStream(FailingMicrophone([], speedup=1000.0)) as stream:
+        with pytest.raises(AudioStreamEnded) as ended:
+            stream.listen(quiet_recognizer())
+    assert isinstance(ended.value.__cause__, OSError)
+    assert isinstance(stream.error, OSError)
+
+
+def test_timeouts_are_still_timeouts_while_audio_flows():
+    with AudioStream(FakeMicrophone([], speedup=1000.0)) as stream:
+        with pytest.raises(sr.WaitTimeoutError):
+            stream.listen(quiet_recognizer(), timeout=0.2)
+
+
+def test_controller_stops_the_session_on_a_dead_stream(controller):
+    controller.recognizer.energy_threshold = 10 ** 6
+    controller.audio_stream = AudioStream(FailingMicrophone([], speedup=1000.0)).start()
+    try:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            for _ in range(100):
+                if controller.capture_phrase() is None and not controller.is_running:
+                    break
+        assert not controller.is_running
+        assert "Audio capture stopped: audio device failed: device unplugged" in output.getvalue()
+    finally:
+        controller.audio_stream.stop()
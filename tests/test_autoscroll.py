@@ -0,0 +1,62 @@
+#tests/test_autoscroll.py
+
+from autoscroll import AutoScroller
+from post_locator import PostLocator
+from screen_capture import ScreenCapture
+from scroll_feedback import ScrollingFeed
+from video_detector_demo import VideoPlayerDetector
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_dwell_follows_the_advanced_post():
+    clock = FakeClock()
+    results = iter([True, False])
+    scroller = AutoScroller(lambda cancel: next(results), image_dwell=3.0, video_dwell=8.0, clock=clock)
+    scroller.start()
+    clock.now = 3.0
+    assert scroller.tick(cancel=lambda: False)
+    assert scroller.due_in() == 8.0   # Landed on a video
+    clock.now = 11.0
+    assert scroller.tick(cancel=lambda: False)
+    assert scroller.due_in() == 3.0   # Landed on an image
+
+
+def test_cancelled_advance_keeps_the_dwell():
+    clock = FakeClock()
+    scroller = AutoScroller(lambda cancel: None, image_dwell=3.0, clock=clock)
+    scroller.start()
+    clock.now = 3.0
+    assert not scroller.tick(cancel=lambda: True)
+    assert scroller.advances == 0
+
+
+def locator_over(feed: ScrollingFeed) -> PostLocator:
+    return PostLocator(ScreenCapture(feed, scale=0.25), VideoPlayerDetector())
+
+
+def test_playing_post_is_a_video_and_a_still_one_is_not():
+    feed = ScrollingFeed(posts=4, playing=[1])
+    locator = locator_over(feed)
+    feed.offset = feed.post_tops[0] - 100
+    still = locator.current_post()
+    assert feed.post_at(540) == 0
+    assert locator.is_playing(still, interval=0.1) is False
+
+    feed.offset = feed.post_tops[1] - 100
+    locator.invalidate()
+    playing = locator.current_post()
+    assert feed.post_at(540) == 1
+    assert locator.is_playing(playing, interval=0.1) is True
+
+
+def test_is_playing_gives_way_to_a_command():
+    feed = ScrollingFeed(posts=2, playing=[0])
+    locator = locator_over(feed)
+    assert locator.is_playing((0, 0, 100, 100), interval=1.0, cancel=lambda: True) is None
@@ -0,0 +1,80 @@
+#tests/test_command_matcher.py
+
+import pytest
+
+from command_matcher import CommandMatcher, bounded_edit_distance
+
+PHRASES = {"scroll": "down", "down": "down", "scroll down": "down", "up": "up", "scroll up": "up",
+           "next": "next", "next post": "next", "stop": "stop", "quit": "stop", "like": "like"}
+
+
+@pytest.fixture
+def matcher():
+    return CommandMatcher(PHRASES, exact_words=("stop", "quit", "like"))
+
+
+def test_longest_phrase_wins(matcher):
+    assert matcher.match_all("scroll up") == ["up"]
+    assert matcher.match_all("scroll down") == ["down"]
+    assert matcher.match_all("next post please") == ["next"]
+
+
+def test_every_command_in_order(matcher):
+    assert matcher.match_all("down down up") == ["down", "down", "up"]
+    assert matcher.match_all("scroll up then stop") == ["up", "stop"]
+
+
+def test_misheard_words_are_corrected(matcher):
+    assert matcher.match_all("dawn") == ["down"]
+    assert matcher.match_all("nex") == ["next"]
+
+
+def test_each_word_is_corrected_before_the_scan(matcher):
+    assert matcher.match_all("scroll upp") == ["up"]
+
+
+def test_inflected_forms_match(matcher):
+    assert matcher.match_all("scrolling") == ["down"]
+    assert matcher.match_all("keep scrolling") == ["down"]
+    assert matcher.match_all("downwards") == ["down"]
+
+
+@pytest.mark.parametrize("heard", ["top", "shop", "quite", "bike", "stopping", "liked"])
+def test_exact_words_are_never_produced_by_correction(matcher, heard):
+    assert matcher.match_all(heard) == []
+
+
+def test_exact_words_still_match_when_heard(matcher):
+    assert matcher.match_all("please stop") == ["stop"]
+    assert matcher.match_all("like") == ["like"]
+
+
+def test_short_words_are_not_corrected(matcher):
+    assert matcher.match_all("us") == []
+
+
+def test_correction_memo_is_bounded(matcher):
+    for i in range(CommandMatcher.CORRECTION_CACHE_SIZE + 100):
+        matcher.match_all(f"word{i}")
+    assert len(matcher._corrections) <= CommandMatcher.CORRECTION_CACHE_SIZE
+    assert len(matcher._cache) <= matcher.cache_size
+
+
+def test_controller_never_corrects_into_destructive_commands(controller):
+    for heard, expected in (("top", None), ("shop", None), ("bike", None), ("exist", None),
+                            ("scroll upp", controller.scroll_up), ("scrolling", controller.scroll_down)):
+        assert controller.match_command(heard) == expected, heard
+
+
+def test_bounded_edit_distance():
+    assert bounded_edit_distance("down", "dawn", 2) == 1
+    assert bounded_edit_distance("scroll", "down", 2) == 3
+
+
+def test_uncached_matcher_gives_the_same_answers():
+    matcher = CommandMatcher(PHRASES, cache_size=0, exact_words=("stop", "quit", "like"))
+    for _ in range(2):  # The second pass uses the remembered corrections
+        assert matcher.match_all("  Scroll Up ") == ["up"]
+        assert matcher.match_all("scroll upp") == ["up"]
+        assert matcher.match_all("top") == []
+    assert matcher._corrections == {"upp": "up", "top": None}
@@ -0,0 +1,115 @@
+#tests/test_command_pipeline.py
+
+import threading
+import time
+
+from command_pipeline import Command, CommandPipeline, Phrase, coalesce, parse_commands
+
+
+class ScriptedController:
+    """Captures the scripted phrases once each; transcribing "hold" waits until `release` is set"""
+
+    def __init__(self, transcripts):
+        self.transcripts = list(transcripts)
+        self.release = threading.Event()
+        self.recognizing = threading.Event()
+        self.is_running = True
+        self.repeatable_actions = ()
+
+    def capture_phrase(self):
+        if not self.transcripts:
+            time.sleep(0.01)
+            return None
+        return Phrase(None, self.transcripts.pop(0), time.monotonic())
+
+    def transcribe(self, phrase):
+        if phrase.transcript == "hold":
+            self.recognizing.set()
+            self.release.wait(2.0)
+        return phrase.transcript
+
+    def match_commands(self, text):
+        return [self.scroll] if text in ("hold", "down") else []
+
+    def report_unknown_command(self, text):
+        pass
+
+    def scroll(self):
+        pass
+
+
+def down():
+    pass
+
+
+def up():
+    pass
+
+
+def like():
+    pass
+
+
+def test_coalesce_merges_runs_of_a_repeatable_action():
+    commands = [Command(down, "down", 1.0), Command(down, "down", 2.0, count=2), Command(up, "up", 3.0),
+                Command(down, "down", 4.0)]
+    merged = coalesce(commands, repeatable=(down, up))
+    assert [(command.action, command.count) for command in merged] == [(down, 3), (up, 1), (down, 1)]
+    assert merged[0].speech_ended_at == 1.0  # The run keeps its first command's timing
+
+
+def test_coalesce_keeps_other_actions_separate():
+    commands = [Command(like, "like", None), Command(like, "like", None)]
+    assert coalesce(commands, repeatable=(down,)) == commands
+    assert coalesce([], repeatable=(down,)) == []
+
+
+def test_parse_commands_keeps_order_and_merges_repeats(controller):
+    commands = parse_commands(controller, "down down down up like", 5.0)
+    assert [(command.action, command.count) for command in commands] == [
+        (controller.scroll_down, 3), (controller.scroll_up, 1), (controller.like_post, 1)]
+    assert all(command.speech_ended_at == 5.0 and command.transcript == "down down down up like"
+               for command in commands)
+
+
+def test_parse_commands_with_nothing_to_do(controller):
+    assert parse_commands(controller, "good morning") == []
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_phrase_stays_pending_until_its_commands_are_queued():
+    controller = ScriptedController(["hold", "down"])
+    pipeline = CommandPipeline(controller, poll_interval=0.01)
+    pipeline.start()
+    try:
+        assert controller.recognizing.wait(2.0)
+        # "down" is queued behind "hold": the phrase queue may be empty while both are pending
+        assert wait_for(lambda: pipeline._pending == 2)
+        assert pipeline.speech_pending
+        controller.release.set()
+        assert wait_for(lambda: pipeline.commands.qsize() == 2)
+        assert wait_for(lambda: not pipeline.speech_pending)
+    finally:
+        controller.release.set()
+        pipeline.stop()
+
+
+def test_unknown_and_dropped_phrases_are_no_longer_pending():
+    controller = ScriptedController(["hello", "hold"])
+    pipeline = CommandPipeline(controller, poll_interval=0.01)
+    pipeline.start()
+    try:
+        assert controller.recognizing.wait(2.0)
+        assert pipeline._pending == 1  # "hello" matched nothing and is done
+        controller.is_running = False  # "hold" finds the pipeline stopped and queues nothing
+        controller.release.set()
+        assert wait_for(lambda: pipeline._pending == 0)
+    finally:
+        controller.release.set()
+        pipeline.stop()
@@ -0,0 +1,93 @@
+#tests/test_detect_batch.py
+
+import pytest
+
+import detect_batch
+from detect_batch import detect_source, main, write_synthetic_video
+
+
+@pytest.fixture(scope="module")
+def video(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("batch") / "feed.mp4")
+    write_synthetic_video(path, frames=40, width=640, height=360)
+    return path
+
+
+def indices(results):
+    return [result.index for result in results]
+
+
+def test_step_that_does_not_divide_the_chunk_size(video):
+    assert indices(detect_source(video, workers=1, chunk_size=10, step=7)) == list(range(0, 40, 7))
+
+
+def test_chunking_matches_one_sequential_read(video, monkeypatch):
+    chunked = list(detect_source(video, workers=1, chunk_size=8, step=3))
+    monkeypatch.setattr(detect_batch, "video_frame_count", lambda source: None)
+    sequential = list(detect_source(video, workers=1, chunk_size=8, step=3))
+    assert sequential == chunked
+
+
+def test_unreliable_frame_count_falls_back_to_one_reader(video, monkeypatch, capsys):
+    monkeypatch.setattr(detect_batch, "video_frame_count", lambda source: None)
+    assert indices(detect_source(video, workers=1)) == list(range(40))
+    assert "reading it sequentially" in capsys.readouterr().err
+
+
+def test_short_chunk_is_reported(video, monkeypatch, capsys):
+    monkeypatch.setattr(detect_batch, "video_frame_count", lambda source: 50)  # Overestimated
+    assert indices(detect_source(video, workers=1, chunk_size=25)) == list(range(40))
+    assert "frames 25-49 gave 15 of 25 frames" in capsys.readouterr().err
+
+
+class CountingPool:
+    """Runs tasks on apply_async and records how many were submitted but not collected"""
+
+    def __init__(self):
+        self.outstanding = 0
+        self.most_outstanding = 0
+
+    def apply_async(self, function, args):
+        pool = self
+        pool.outstanding += 1
+        pool.most_outstanding = max(pool.most_outstanding, pool.outstanding)
+
+        class Result:
+            def get(self):
+                pool.outstanding -= 1
+                return function(*args)
+        return Result()
+
+
+def test_only_a_window_of_chunks_is_in_flight():
+    pool = CountingPool()
+    chunks = detect_batch._bounded_map(pool, list, [[index] for index in range(20)], in_flight=4)
+    assert list(chunks) == [[index] for index in range(20)]
+    assert pool.most_outstanding == 4
+
+
+def test_worker_processes_give_the_sequential_results(video):
+    assert list(detect_source(video, workers=2, chunk_size=6)) == list(detect_source(video, workers=1, chunk_size=6))
+
+
+def test_reported_frame_count_is_verified(video):
+    assert detect_batch.video_frame_count(video) == 40
+
+
+def test_step_below_one_is_rejected(video):
+    with pytest.raises(ValueError):
+        list(detect_source(video, step=0))
+
+
+@pytest.mark.parametrize("option", [["--step", "0"], ["--chunk-size", "0"], ["--workers", "-1"], ["--scale", "0"]])
+def test_cli_rejects_bad_options_without_a_traceback(video, option, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main([video, *option])
+    assert exit_info.value.code == 2
+    assert "error:" in capsys.readouterr().err
+
+
+def test_cli_with_step_7_and_the_default_chunk_size(video, tmp_path):
+    output = tmp_path / "rects.jsonl"
+    assert main([video, "--step", "7", "--workers", "1", "-o", str(output)]) == 0
+    assert len(output.read_text().splitlines()) == 6
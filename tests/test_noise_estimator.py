@@ -0,0 +1,31 @@
+#tests/test_noise_estimator.py
+
+import os
+
+import speech_recognition as sr
+
+from noise_estimator import NoiseFloorEstimator, default_profile_path
+
+
+def test_profile_lives_in_the_user_config_directory(monkeypatch, tmp_path):
+    monkeypatch.setattr(os, "name", "posix")
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path))
+    assert default_profile_path() == str(tmp_path / "instascroller" / "noise_profile.json")
+    monkeypatch.delenv("XDG_CONFIG_HOME")
+    monkeypatch.setenv("HOME", str(tmp_path))
+    assert default_profile_path() == str(tmp_path / ".config" / "instascroller" / "noise_profile.json")
+
+
+def test_saved_threshold_is_loaded_on_the_next_start(tmp_path):
+    path = str(tmp_path / "instascroller" / "noise_profile.json")  # Directory does not exist yet
+    recognizer = sr.Recognizer()
+    recognizer.energy_threshold = 420.0
+    NoiseFloorEstimator(recognizer, profile_path=path).save()
+
+    fresh = sr.Recognizer()
+    assert NoiseFloorEstimator(fresh, profile_path=path).load()
+    assert fresh.energy_threshold == 420.0
+
+
+def test_missing_profile_means_calibration(tmp_path):
+    assert not NoiseFloorEstimator(sr.Recognizer(), profile_path=str(tmp_path / "none.json")).load()
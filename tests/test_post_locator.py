@@ -0,0 +1,54 @@
+#tests/test_post_locator.py
+
+from input_backend import RecordingBackend
+from post_locator import PostLocator
+
+
+class LayoutScreen:
+    """Just enough of ScreenCapture: a fixed layout on a 1920x1080 monitor"""
+
+    screen_size = (1920, 1080)
+    monitor = {"left": 0, "top": 0}
+
+    def __init__(self, rectangles):
+        self.rectangles = rectangles
+
+    def detect(self, detector):
+        return list(self.rectangles)
+
+    def reset_roi(self):
+        pass
+
+
+def test_current_post_is_the_one_covering_the_middle_band():
+    post = (660, 200, 600, 700)
+    sidebar_box = (1500, 500, 80, 80)  # Its centre is nearest the middle, but it barely covers the band
+    locator = PostLocator(LayoutScreen([post, sidebar_box]), detector=None)
+    assert locator.current_post() == post
+
+
+def test_post_cut_by_the_band_loses_to_one_filling_it():
+    leaving = (660, -500, 600, 900)   # Covers the top of the band
+    arriving = (660, 420, 600, 700)   # Covers most of it
+    locator = PostLocator(LayoutScreen([leaving, arriving]), detector=None)
+    assert locator.current_post() == arriving
+
+
+def test_no_post_when_nothing_reaches_the_band():
+    header = (0, 0, 1920, 120)
+    locator = PostLocator(LayoutScreen([header]), detector=None)
+    assert locator.current_post() is None
+    assert locator.post_center() is None
+
+
+def test_post_center_is_the_middle_of_the_current_post():
+    locator = PostLocator(LayoutScreen([(660, 200, 600, 700)]), detector=None)
+    assert locator.post_center() == (960, 550)
+
+
+def test_like_without_a_post_clicks_nothing(controller, capsys):
+    controller.input = RecordingBackend()
+    controller._post_locator = PostLocator(LayoutScreen([]), detector=None)
+    controller.like_post()
+    assert controller.input.events == []
+    assert "No post found to like" in capsys.readouterr().out
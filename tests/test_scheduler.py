@@ -0,0 +1,124 @@
+#tests/test_scheduler.py
+
+import pytest
+
+from scheduler import VisionScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_scheduler(cost: float = 0.0, **kwargs):
+    """A scheduler on a fake clock whose task takes `cost` seconds of it"""
+    clock = FakeClock()
+    runs = []
+
+    def task():
+        runs.append(clock.now)
+        clock.now += cost
+
+    scheduler = VisionScheduler(task, clock=clock, **kwargs)
+    scheduler.cost_clock = clock
+    return scheduler, clock, runs
+
+
+def test_frame_rate_follows_activity():
+    scheduler, clock, runs = make_scheduler(active_fps=10.0, idle_fps=1.0, active_for=2.0, budget=1.0)
+    assert scheduler.interval() == pytest.approx(1.0)
+    scheduler.activity()
+    assert scheduler.interval() == pytest.approx(0.1)
+    assert scheduler.tick()
+    clock.now += 0.05
+    assert not scheduler.tick()
+    clock.now += 0.05
+    assert scheduler.tick()
+    clock.now += 2.0
+    assert scheduler.interval() == pytest.approx(1.0)
+    assert len(runs) == 2
+
+
+def test_autoscroll_counts_as_active():
+    scheduler, _, _ = make_scheduler(active_fps=10.0, idle_fps=1.0, scrolling=lambda: True)
+    assert scheduler.interval() == pytest.approx(0.1)
+
+
+def test_no_idle_frames_when_idle_fps_is_zero():
+    scheduler, _, runs = make_scheduler(idle_fps=0.0)
+    assert scheduler.due_in() is None
+    assert not scheduler.tick()
+    assert runs == []
+
+
+def test_an_expensive_frame_is_paid_back_before_the_next():
+    # A quarter of each second for vision; one frame costs half a second
+    scheduler, clock, runs = make_scheduler(cost=0.5, budget=0.25, active_fps=30.0, idle_fps=30.0)
+    started = clock.now
+    assert scheduler.tick()
+    assert scheduler.credit == pytest.approx(-0.25)
+    # The debt is refilled at 0.25 s per second from the start of the run: one second in all
+    assert clock.now + scheduler.due_in() == pytest.approx(started + 1.0)
+    clock.now += 0.25
+    assert not scheduler.tick()
+    assert scheduler.skipped == 1
+    clock.now += 0.25
+    assert scheduler.tick()
+    assert len(runs) == 2
+    assert scheduler.work_seconds == pytest.approx(1.0)
+
+
+def test_credit_does_not_pile_up_while_idle():
+    scheduler, clock, _ = make_scheduler(budget=0.25)
+    clock.now += 60.0
+    scheduler.due_in()
+    assert scheduler.credit == pytest.approx(0.25)
+
+
+def test_slow_commands_double_the_backoff_up_to_the_limit():
+    scheduler, _, _ = make_scheduler(active_fps=10.0, idle_fps=10.0, latency_target=0.2, max_backoff=8.0)
+    for expected in (2.0, 4.0, 8.0, 8.0):
+        scheduler.observe_latency(0.5)
+        assert scheduler.backoff == expected
+    assert scheduler.backoffs == 3
+    assert scheduler.interval() == pytest.approx(0.8)
+
+
+def test_fast_commands_halve_the_backoff():
+    scheduler, _, _ = make_scheduler(latency_target=0.2, latency_window=1)
+    scheduler.observe_latency(0.5)
+    scheduler.observe_latency(0.5)
+    assert scheduler.backoff == 4.0
+    scheduler.observe_latency(0.1)
+    assert scheduler.backoff == 2.0
+    scheduler.observe_latency(0.1)
+    scheduler.observe_latency(0.1)
+    assert scheduler.backoff == 1.0
+    assert scheduler.recoveries == 2
+
+
+def test_backoff_recovers_without_commands():
+    scheduler, clock, _ = make_scheduler(latency_target=0.2, recover_after=10.0)
+    scheduler.observe_latency(0.5)
+    scheduler.observe_latency(0.5)
+    clock.now += 9.0
+    scheduler.tick()
+    assert scheduler.backoff == 4.0
+    clock.now += 1.0
+    scheduler.tick()
+    assert scheduler.backoff == 2.0
+    clock.now += 10.0
+    scheduler.tick()
+    assert scheduler.backoff == 1.0
+    assert scheduler.recoveries == 2
+
+
+def test_tick_gives_way_to_voice():
+    scheduler, _, runs = make_scheduler()
+    assert not scheduler.tick(cancel=lambda: True)
+    assert runs == []
+    assert scheduler.tick(cancel=lambda: False)
+    assert len(runs) == 1
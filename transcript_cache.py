@@ -0,0 +1,209 @@
+#transcript_cache.py
+"""
+Transcript cache
+A handful of short utterances ("down", "scroll", "up") make up nearly all
+commands, so a phrase that sounds like one recognized recently is answered
+from a cache instead of another recognizer round trip. Each phrase is
+reduced to a coarse spectral fingerprint: MFCCs of the spoken part
+(silence trimmed, cepstral mean removed) pooled into a few time segments,
+then binarized by sign and by change between segments. A cached transcript
+is reused only when the nearest fingerprint is similar enough (the
+confidence floor) and clearly nearer than any cached phrase with a
+different transcript; everything else goes to the wrapped backend, whose
+answers fill the LRU.
+
+Hit rate, wrong answers and time saved on synthetic utterances:
+    python transcript_cache.py
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+import speech_recognition as sr
+
+from recognizers import RecognizerBackend, audio_to_samples, mfcc
+
+
+class _Entry(NamedTuple):
+    transcript: str
+    bits: np.ndarray
+    frames: int  # Length of the spoken part, in 10 ms frames
+
+
+def fingerprint(samples: np.ndarray, segments: int = 8, coefficients: int = 12) -> Tuple[np.ndarray, int]:
+    """
+    Boolean fingerprint of a phrase and its spoken length in frames. The
+    MFCC sequence (c1..c12) is averaged over `segments` equal time slices;
+    the bits are the sign of every pooled coefficient plus whether it rose
+    from one slice to the next, so tempo changes barely move them.
+    """
+    features = mfcc(samples)[:, 1:coefficients + 1]
+    frames = len(features)
+    if frames < segments:
+        features = np.repeat(features, -(-segments // max(frames, 1)), axis=0)
+    pooled = np.stack([chunk.mean(axis=0) for chunk in np.array_split(features, segments)])
+    bits = np.concatenate(((pooled > 0).ravel(), (pooled[1:] > pooled[:-1]).ravel()))
+    return bits, frames
+
+
+class TranscriptCache(RecognizerBackend):
+    """
+    Wraps any RecognizerBackend. `min_similarity` is the confidence floor
+    (share of equal fingerprint bits); `margin` is how much closer the best
+    entry must be than the nearest entry with another transcript; phrases
+    whose spoken length differs by more than `max_length_ratio` never match.
+    """
+
+    def __init__(self, backend: RecognizerBackend, capacity: int = 64, min_similarity: float = 0.85,
+                 margin: float = 0.05, max_length_ratio: float = 1.5):
+        self.backend = backend
+        self.capacity = capacity
+        self.min_similarity = min_similarity
+        self.margin = margin
+        self.max_length_ratio = max_length_ratio
+        self._entries: "OrderedDict[bytes, _Entry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.fingerprint_seconds = 0.0  # Spent on every lookup
+        self.backend_seconds = 0.0      # Spent in the wrapped backend on misses
+
+    @property
+    def name(self) -> str:
+        return self.backend.name
+
+    def lookup(self, bits: np.ndarray, frames: int) -> Optional[str]:
+        """Cached transcript for a fingerprint, if one clears the confidence floor and the margin"""
+        if not self._entries:
+            return None
+        keys = list(self._entries)
+        entries = [self._entries[key] for key in keys]
+        lengths = np.array([entry.frames for entry in entries])
+        similarity = (np.stack([entry.bits for entry in entries]) == bits).mean(axis=1)
+        ratio = np.maximum(lengths, frames) / np.maximum(np.minimum(lengths, frames), 1)
+        similarity[ratio > self.max_length_ratio] = 0.0
+        best = int(np.argmax(similarity))
+        if similarity[best] < self.min_similarity:
+            return None
+        transcript = entries[best].transcript
+        rivals = [s for s, entry in zip(similarity, entries) if entry.transcript != transcript]
+        if rivals and similarity[best] - max(rivals) < self.margin:
+            return None
+        self._entries.move_to_end(keys[best])
+        return transcript
+
+    def remember(self, bits: np.ndarray, frames: int, transcript: str):
+        self._entries[np.packbits(bits).tobytes() + frames.to_bytes(4, "little")] = _Entry(transcript, bits, frames)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        started = time.perf_counter()
+        bits, frames = fingerprint(audio_to_samples(audio))
+        transcript = self.lookup(bits, frames)
+        self.fingerprint_seconds += time.perf_counter() - started
+        if transcript is not None:
+            self.hits += 1
+            return transcript
+
+        started = time.perf_counter()
+        try:
+            transcript = self.backend.recognize(audio)
+        finally:
+            self.backend_seconds += time.perf_counter() - started
+            self.misses += 1
+        self.remember(bits, frames, transcript)
+        return transcript
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def saved_seconds(self) -> float:
+        """Backend time skipped on hits (at the mean cost of a miss), net of all fingerprinting"""
+        if not self.misses:
+            return -self.fingerprint_seconds
+        return self.hits * self.backend_seconds / self.misses - self.fingerprint_seconds
+
+    def stats(self) -> Dict[str, float]:
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate,
+                "fingerprint_ms": self.fingerprint_seconds * 1000, "saved_ms": self.saved_seconds * 1000}
+
+    def report(self):
+        print(f"Transcript cache: {self.hits}/{self.hits + self.misses} hits ({self.hit_rate:.0%}), "
+              f"{self.saved_seconds * 1000:.0f} ms of recognition saved net of "
+              f"{self.fingerprint_seconds * 1000:.0f} ms fingerprinting")
+
+
+# Synthetic utterances ---------------------------------------------------------
+
+# Formant (F1, F2) targets each word glides through; enough to give every word its own spectral path
+WORDS = {
+    "down": [(700, 1200), (400, 800)],
+    "up": [(600, 1300), (550, 1250)],
+    "scroll": [(350, 2200), (500, 900), (450, 850)],
+    "scroll down": [(350, 2200), (500, 900), (700, 1200), (400, 800)],
+    "like": [(750, 1300), (300, 2300)],
+    "next": [(550, 1900), (500, 1750)],
+    "stop": [(650, 1000), (600, 950)],
+}
+
+
+def synthesize(word: str, rng: np.random.Generator, sample_rate: int = 16000) -> np.ndarray:
+    """One int16 utterance of `word`: a harmonic voice shaped by gliding formants, with speaker jitter"""
+    targets = np.array(WORDS[word], float) * rng.uniform(0.93, 1.07)
+    seconds = 0.18 * len(targets) * rng.uniform(0.8, 1.25)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    f0 = rng.uniform(90, 220) * (1 + 0.04 * np.sin(2 * np.pi * 2.5 * t))
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+    position = np.linspace(0, len(targets) - 1, t.size)
+    formants = np.stack([np.interp(position, np.arange(len(targets)), targets[:, i]) for i in range(2)])
+    voice = np.zeros(t.size)
+    for k in range(1, 30):
+        frequency = k * f0
+        gain = sum(np.exp(-0.5 * ((frequency - formant) / 90.0) ** 2) for formant in formants)
+        voice += gain * np.sin(k * phase) / np.sqrt(k)
+    voice *= np.sin(np.pi * t / seconds) ** 0.5 * rng.uniform(2000, 6000) / max(np.abs(voice).max(), 1e-9)
+    silence = int(0.2 * sample_rate)
+    audio = np.concatenate((np.zeros(silence), voice, np.zeros(silence))) + rng.normal(0, 40, t.size + 2 * silence)
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+class _OracleBackend(RecognizerBackend):
+    """Knows the word of every synthetic clip; sleeps like a network recognizer"""
+
+    name = "oracle"
+
+    def __init__(self, labels: Dict[bytes, str], latency: float):
+        self.labels = labels
+        self.latency = latency
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        time.sleep(self.latency)
+        return self.labels[audio.get_raw_data()]
+
+
+def benchmark(utterances: int = 150, latency: float = 0.3, seed: int = 0):
+    """Commands drawn with a skewed (mostly down/scroll/up) distribution through the cache"""
+    rng = np.random.default_rng(seed)
+    words = list(WORDS)
+    weights = np.array([0.35, 0.2, 0.2, 0.08, 0.08, 0.06, 0.03])
+    clips = [(word, synthesize(word, rng)) for word in rng.choice(words, utterances, p=weights)]
+    labels = {samples.tobytes(): word for word, samples in clips}
+    cache = TranscriptCache(_OracleBackend(labels, latency))
+
+    wrong = 0
+    for word, samples in clips:
+        if cache.recognize(sr.AudioData(samples.tobytes(), 16000, 2)) != word:
+            wrong += 1
+    print(f"{utterances} synthetic commands, recognizer round trip {latency * 1000:.0f} ms")
+    print(f"Hit rate {cache.hit_rate:.0%}, wrong transcripts {wrong}, fingerprint "
+          f"{cache.fingerprint_seconds / utterances * 1000:.2f} ms per phrase")
+    cache.report()
+
+
+if __name__ == "__main__":
+    benchmark()
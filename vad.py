@@ -0,0 +1,194 @@
+#vad.py
+"""
+Energy-based voice activity detection
+A cheap gate between phrase capture and recognition. Short-time energy and
+zero-crossing rate are computed for every 20 ms frame with cumulative sums
+(no Python loop over frames); a frame is voiced when it is loud enough and
+its zero-crossing rate is in the range of voiced speech. Hangover keeps a
+speech run open across short gaps between syllables, and a phrase is passed
+on only if one run holds enough voiced frames. Coughs, keyboard clicks and
+broadband background noise are dropped before they cost a recognition call.
+
+False-trigger rate and CPU cost on WAV fixtures (<dir>/speech/*.wav and
+<dir>/noise/*.wav; synthetic fixtures are used when no directory is given):
+    python vad.py [fixtures_dir]
+"""
+
+import glob
+import os
+import sys
+import time
+import wave
+from typing import Dict, List, Tuple
+
+import numpy as np
+import speech_recognition as sr
+
+
+def frame_features(samples: np.ndarray, frame_length: int, hop: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-frame RMS energy (in sample units) and zero crossings per sample for
+    frames of `frame_length` samples every `hop` samples.
+    """
+    if samples.size < frame_length:
+        samples = np.pad(samples, (0, frame_length - samples.size))
+    starts = np.arange(0, samples.size - frame_length + 1, hop)
+    energy = np.concatenate(([0.0], np.cumsum(np.square(samples, dtype=np.float64))))
+    crossings = np.concatenate(([0], np.cumsum(np.signbit(samples[1:]) != np.signbit(samples[:-1]))))
+    rms = np.sqrt((energy[starts + frame_length] - energy[starts]) / frame_length)
+    zcr = (crossings[starts + frame_length - 1] - crossings[starts]) / (frame_length - 1)
+    return rms, zcr
+
+
+class EnergyVAD:
+    """
+    `is_speech(audio, energy_threshold)` decides whether a captured phrase is
+    worth recognizing. The energy threshold is the recognizer's (same RMS
+    scale as `sr.Recognizer.energy_threshold`), so calibration carries over.
+    """
+
+    def __init__(self, frame_ms: float = 20.0, hop_ms: float = 10.0, max_zcr_hz: float = 3000.0,
+                 min_speech: float = 0.1, hangover: float = 0.2):
+        self.frame_ms = frame_ms
+        self.hop_ms = hop_ms
+        self.max_zcr_hz = max_zcr_hz  # Voiced speech crosses zero far less often than hiss or clicks
+        self.min_speech = min_speech  # Seconds of voiced frames one run needs to count as speech
+        self.hangover = hangover      # Seconds a run stays open after its last voiced frame
+        self.checked = 0
+        self.rejected = 0
+
+    def voiced_frames(self, samples: np.ndarray, sample_rate: int, energy_threshold: float) -> np.ndarray:
+        """Boolean voiced decision per frame"""
+        frame_length = max(2, int(sample_rate * self.frame_ms / 1000))
+        hop = max(1, int(sample_rate * self.hop_ms / 1000))
+        rms, zcr = frame_features(samples, frame_length, hop)
+        return (rms > energy_threshold) & (zcr * sample_rate <= self.max_zcr_hz)
+
+    def speech_runs(self, voiced: np.ndarray) -> np.ndarray:
+        """Voiced-frame count of every run after hangover smoothing"""
+        hangover_frames = int(round(self.hangover * 1000 / self.hop_ms))
+        counts = np.concatenate(([0], np.cumsum(voiced)))
+        # A frame is active if any of the previous `hangover_frames` frames (or itself) was voiced
+        lagged = counts[np.maximum(0, np.arange(1, voiced.size + 1) - hangover_frames - 1)]
+        active = counts[1:] > lagged
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], active, [False])).astype(np.int8)))
+        starts, stops = edges[::2], edges[1::2]
+        return counts[stops] - counts[starts]
+
+    def is_speech_samples(self, samples: np.ndarray, sample_rate: int, energy_threshold: float) -> bool:
+        runs = self.speech_runs(self.voiced_frames(samples, sample_rate, energy_threshold))
+        min_frames = self.min_speech * 1000 / self.hop_ms
+        return bool(runs.size and runs.max() >= min_frames)
+
+    def is_speech(self, audio: sr.AudioData, energy_threshold: float) -> bool:
+        """True when the phrase holds a run of voiced speech; counts rejections"""
+        samples = np.frombuffer(audio.get_raw_data(convert_width=2), dtype=np.int16)
+        speech = self.is_speech_samples(samples, audio.sample_rate, energy_threshold)
+        self.checked += 1
+        self.rejected += not speech
+        return speech
+
+
+# Fixtures and evaluation ------------------------------------------------------
+
+def read_wav(path: str) -> Tuple[np.ndarray, int]:
+    """int16 mono samples and the sample rate of a WAV file"""
+    with wave.open(path, "rb") as wav:
+        audio = sr.AudioData(wav.readframes(wav.getnframes()), wav.getframerate(), wav.getsampwidth())
+        channels = wav.getnchannels()
+    samples = np.frombuffer(audio.get_raw_data(convert_width=2), dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples, audio.sample_rate
+
+
+def synthetic_fixtures(sample_rate: int = 16000, seed: int = 0,
+                       count: int = 20) -> Dict[str, List[Tuple[str, np.ndarray]]]:
+    """Speech-like phrases (voiced harmonics) and typical non-speech sounds, as int16 clips"""
+    rng = np.random.default_rng(seed)
+
+    def clip(seconds: float) -> np.ndarray:
+        return rng.normal(0, 40, int(seconds * sample_rate))  # Quiet room noise
+
+    def voiced(seconds: float, f0: float, level: float) -> np.ndarray:
+        t = np.arange(int(seconds * sample_rate)) / sample_rate
+        pitch = f0 * (1 + 0.05 * np.sin(2 * np.pi * 3 * t))
+        phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+        wave_ = sum(np.sin(k * phase) / k for k in range(1, 8))
+        envelope = np.sin(np.pi * np.minimum(1.0, t / seconds)) ** 0.5
+        return level * wave_ * envelope
+
+    fixtures = {"speech": [], "noise": []}
+    for i in range(count):
+        words = rng.integers(1, 3)
+        audio = clip(0.3)
+        for _ in range(words):
+            audio = np.concatenate((audio, voiced(rng.uniform(0.18, 0.5), rng.uniform(95, 230),
+                                                  rng.uniform(900, 4000)), clip(rng.uniform(0.05, 0.15))))
+        fixtures["speech"].append((f"speech-{i:02d}", np.concatenate((audio, clip(0.3)))))
+    for i in range(10):
+        # Keyboard: short broadband clicks
+        audio = clip(1.5)
+        for start in rng.integers(0, audio.size - 400, rng.integers(4, 12)):
+            audio[start:start + 400] += rng.normal(0, 6000, 400) * np.exp(-np.arange(400) / 60)
+        fixtures["noise"].append((f"keyboard-{i:02d}", audio))
+        # Cough: a loud broadband burst
+        audio = clip(1.0)
+        length = int(rng.uniform(0.15, 0.35) * sample_rate)
+        start = int(0.3 * sample_rate)
+        audio[start:start + length] += rng.normal(0, 3000, length) * np.hanning(length)
+        fixtures["noise"].append((f"cough-{i:02d}", audio))
+        # Background TV / fan: broadband noise around the calibrated threshold
+        audio = rng.normal(0, 350, int(2.0 * sample_rate))
+        fixtures["noise"].append((f"background-{i:02d}", audio))
+        # Door knock / thump: loud but very short
+        audio = clip(1.0)
+        start = int(0.4 * sample_rate)
+        audio[start:start + 800] += voiced(0.05, 80, 6000)
+        fixtures["noise"].append((f"thump-{i:02d}", audio))
+    return {kind: [(name, np.clip(audio, -32768, 32767).astype(np.int16)) for name, audio in clips]
+            for kind, clips in fixtures.items()}
+
+
+def load_fixtures(fixtures_dir: str) -> Tuple[Dict[str, List[Tuple[str, np.ndarray]]], int]:
+    fixtures, rate = {}, None
+    for kind in ("speech", "noise"):
+        fixtures[kind] = []
+        for path in sorted(glob.glob(os.path.join(fixtures_dir, kind, "*.wav"))):
+            samples, rate = read_wav(path)
+            fixtures[kind].append((os.path.basename(path), samples))
+    return fixtures, rate
+
+
+def evaluate(fixtures: Dict[str, List[Tuple[str, np.ndarray]]], sample_rate: int,
+             energy_threshold: float = 300.0, repeats: int = 20):
+    """Trigger rates per class and CPU time spent per second of audio"""
+    vad = EnergyVAD()
+    results = {}
+    cpu = 0.0
+    audio_seconds = 0.0
+    for kind, clips in fixtures.items():
+        triggered = []
+        for name, samples in clips:
+            start = time.process_time()
+            for _ in range(repeats):
+                speech = vad.is_speech_samples(samples, sample_rate, energy_threshold)
+            cpu += time.process_time() - start
+            audio_seconds += repeats * samples.size / sample_rate
+            triggered.append(speech)
+            if speech != (kind == "speech"):
+                print(f"  {'missed' if kind == 'speech' else 'false trigger'}: {name}")
+        results[kind] = (sum(triggered), len(triggered))
+    passed, total = results.get("speech", (0, 0))
+    false, noise = results.get("noise", (0, 0))
+    print(f"Speech passed to recognition: {passed}/{total} ({passed / max(1, total):.0%})")
+    print(f"False-trigger rate on noise:  {false}/{noise} ({false / max(1, noise):.0%}); "
+          f"recognition calls saved: {noise - false}")
+    print(f"CPU cost: {cpu / audio_seconds * 1000:.3f} ms per second of audio")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        evaluate(*load_fixtures(sys.argv[1]))
+    else:
+        evaluate(synthetic_fixtures(), 16000)
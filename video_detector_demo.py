@@ -10,63 +10,110 @@ import mss
 import time
 from typing import List, Tuple, Optional
 
+from frame_cache import FrameCache
+from instrumentation import record
+from screen_capture import ScreenCapture
+from video_tracker import VideoPlayerTracker
+
 class VideoPlayerDetector:
     def __init__(self):
-        self.sct = mss.mss()
+        self._capture = None  # Screen capture session, opened on first use
+        self._buffers = {}    # Scratch arrays reused between detections
+        self._kernels = {}
+        
+    @property
+    def capture(self) -> ScreenCapture:
+        if self._capture is None:
+            self._capture = ScreenCapture(mss.mss())
+        return self._capture
         
     def capture_screen(self, region: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
-        """Capture screen or specific region"""
-        if region:
-            monitor = {"top": region[1], "left": region[0], 
-                      "width": region[2], "height": region[3]}
-        else:
-            monitor = self.sct.monitors[1]  # Primary monitor
-            
-        screenshot = self.sct.grab(monitor)
-        img = np.array(screenshot)
-        return cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+        """Capture screen or specific region (the returned array is reused by the next capture)"""
+        return self.capture.grab(region)
+    
+    def _buffer(self, name: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype)
+            self._buffers[name] = buffer
+        return buffer
     
+    def _kernel(self, size: int) -> np.ndarray:
+        if size not in self._kernels:
+            self._kernels[size] = np.ones((size, size), np.uint8)
+        return self._kernels[size]
     
-    def detect_video_players(self, img: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    def detect_video_players(self, img: np.ndarray, scale: float = 1.0,
+                             offset: Tuple[int, int] = (0, 0),
+                             screen_size: Optional[Tuple[int, int]] = None) -> List[Tuple[int, int, int, int]]:
         """
         Color-based Segmentation to find video player regions
         Find non-black rectangular regions and filter out screen borders
+
+        `img` (BGR or BGRA) may be a crop of the screen downscaled by `scale`,
+        whose top-left corner sits at `offset` on the full-resolution screen of
+        `screen_size` (width, height). Rectangles are always returned in
+        full-resolution screen coordinates, and size and border limits are
+        applied there.
+
+        Scratch buffers are reused between calls, so use one detector per thread.
         """
-        # Convert to HSV for better color segmentation
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-        
-        # Define range for "non-black" colors
-        # Black in HSV: V (value) is low
-        lower_non_black = np.array([0, 0, 30])  # V > 30 (not too dark)
-        upper_non_black = np.array([180, 255, 255])
-        
-        # Create mask for non-black regions
-        mask = cv2.inRange(hsv, lower_non_black, upper_non_black)
-        
-        # Clean up the mask
-        kernel = np.ones((5, 5), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-        
-        # Find contours
+        started = time.monotonic()
+        shape = img.shape[:2]
+        
+        # Non-black mask, equivalent to HSV V = max(B, G, R) >= 30 without the HSV conversion:
+        # threshold every channel byte, then any channel set makes the gray value non-zero
+        channels = img.reshape(shape[0], -1)
+        bright = self._buffer("bright", channels.shape)
+        cv2.threshold(channels, 29, 255, cv2.THRESH_BINARY, dst=bright)
+        gray = self._buffer("gray", shape)
+        cv2.cvtColor(bright.reshape(img.shape), cv2.COLOR_BGRA2GRAY if img.shape[2] == 4 else cv2.COLOR_BGR2GRAY,
+                     dst=gray)
+        mask = self._buffer("mask", shape)
+        cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY, dst=mask)
+        
+        # Clean up the mask (kernel shrinks with the image so it covers the same screen area)
+        kernel = self._kernel(max(1, round(5 * scale)))
+        closed = self._buffer("closed", shape)
+        cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, dst=closed)
+        cv2.morphologyEx(closed, cv2.MORPH_OPEN, kernel, dst=mask)
+        
+        # Outer outlines only; their bounding boxes are filtered in one vectorized pass
         contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        rectangles = []
-        img_height, img_width = img.shape[:2]
-        
-        for contour in contours:
-            x, y, w, h = cv2.boundingRect(contour)
-            
-            # Filter by size and aspect ratio
-            if w > 200 and h > 150:
-                aspect_ratio = w / h
-                # Video players typically have aspect ratios between 0.5 and 2.0
-                if 0.5 <= aspect_ratio <= 2.0:
-                    # Check if this rectangle is NOT a screen border
-                    if not self._is_screen_border(x, y, w, h, img_width, img_height):
-                        rectangles.append((x, y, w, h))
-        
-        return rectangles
+        if not contours:
+            record("detect", started)
+            return []
+        boxes = np.array([cv2.boundingRect(contour) for contour in contours], dtype=np.int64)
+        
+        if screen_size is None:
+            screen_size = (round(shape[1] / scale), round(shape[0] / scale))
+        img_width, img_height = screen_size
+        
+        # Map back to full-resolution screen coordinates
+        if scale != 1.0:
+            boxes = np.round(boxes / scale).astype(np.int64)
+        x = boxes[:, 0] + offset[0]
+        y = boxes[:, 1] + offset[1]
+        w, h = boxes[:, 2], boxes[:, 3]
+        
+        # Filter by size and aspect ratio (video players are between 0.5 and 2.0), then drop screen borders
+        aspect_ratio = w / np.maximum(h, 1)
+        keep = (w > 200) & (h > 150) & (aspect_ratio >= 0.5) & (aspect_ratio <= 2.0)
+        keep &= ~self._screen_border_mask(x, y, w, h, img_width, img_height)
+        
+        record("detect", started)
+        return [(int(x[i]), int(y[i]), int(w[i]), int(h[i])) for i in np.flatnonzero(keep)]
+    
+    def _screen_border_mask(self, x: np.ndarray, y: np.ndarray, w: np.ndarray, h: np.ndarray,
+                            img_width: int, img_height: int) -> np.ndarray:
+        """Vectorized _is_screen_border over arrays of rectangles"""
+        border_threshold = 50
+        edge_count = ((x <= border_threshold).astype(np.int8)
+                      + ((x + w) >= (img_width - border_threshold))
+                      + (y <= border_threshold)
+                      + ((y + h) >= (img_height - border_threshold)))
+        area_ratio = (w * h) / (img_width * img_height)
+        return (edge_count >= 2) | (area_ratio > 0.8)
     
     def _is_screen_border(self, x: int, y: int, w: int, h: int, img_width: int, img_height: int) -> bool:
         """
@@ -102,9 +149,14 @@ class VideoPlayerDetector:
         return result
     
 
-def main():
-    """Demo function"""
+def main(workers: int = 0):
+    """Demo function (workers > 0 runs capture and detection on a FrameEngine pool)"""
     detector = VideoPlayerDetector()
+    tracker = VideoPlayerTracker(FrameCache(detector))  # Unchanged screens reuse the last detections
+    engine = None
+    if workers > 0:
+        from frame_engine import FrameEngine
+        engine = FrameEngine(workers=workers).start()
     
     print("Video Player Detection Demo")
     print("=" * 40)
@@ -112,11 +164,18 @@ def main():
     print("Using color-based detection with screen border filtering")
     
     while True:
-        # Capture screen
-        img = detector.capture_screen()
-        
-        # Detect video players using color-based method
-        rectangles = detector.detect_video_players(img)
+        if engine is not None:
+            # Newest detected frame from the worker pool
+            result = engine.latest(timeout=1.0)
+            if result is None:
+                continue
+            img, rectangles = result.frame, result.rectangles
+        else:
+            # Capture screen
+            img = detector.capture_screen()
+            
+            # Detect video players (full detection only when the tracked layout changes)
+            rectangles = tracker.update(img)
         # print(f"midpoint: {rectangles[0][0] + rectangles[0][2] / 2, rectangles[0][1] + rectangles[0][3] / 2}")
         
         # Draw results
@@ -142,7 +201,12 @@ def main():
             cv2.imwrite(filename, result_img)
             print(f"Saved result: {filename}")
     
+    if engine is not None:
+        engine.stop()
     cv2.destroyAllWindows()
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=0, help="detect on a pool of N worker threads")
+    main(parser.parse_args().workers)
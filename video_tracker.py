@@ -0,0 +1,181 @@
+#video_tracker.py
+"""
+Incremental video player tracking
+Runs the full detector once and then only verifies the known rectangles on
+each new frame: the page around a post must not have changed (frame
+differencing on a thin ring outside each rectangle) and every edge of the
+rectangle must still contain non-black pixels. Full detection runs again
+only after a scroll, a failed check, or every `redetect_interval` frames to
+pick up players that appear without the layout moving.
+
+Accuracy and speed on a recorded frame sequence (a directory of .png/.npy
+frames; a synthetic sequence is used when no directory is given):
+    python video_tracker.py [frames_dir]
+"""
+
+import glob
+import os
+import sys
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+Rect = Tuple[int, int, int, int]
+
+
+def _ring_slices(rect: Rect, margin: int, width: int, height: int) -> List[Tuple[slice, slice]]:
+    """Four strips just outside `rect`, clipped to the image"""
+    x, y, w, h = rect
+    left, right = max(0, x - margin), min(width, x + w + margin)
+    top, bottom = max(0, y - margin), min(height, y + h + margin)
+    strips = [
+        (slice(top, max(top, y)), slice(left, right)),                  # above
+        (slice(min(bottom, y + h), bottom), slice(left, right)),        # below
+        (slice(y, y + h), slice(left, max(left, x))),                   # left
+        (slice(y, y + h), slice(min(right, x + w), right)),             # right
+    ]
+    return [(rows, cols) for rows, cols in strips if rows.stop > rows.start and cols.stop > cols.start]
+
+
+class VideoPlayerTracker:
+    """
+    Keeps video player rectangles up to date across frames at a fraction of
+    the cost of running `detector.detect_video_players` on every frame.
+    Call `invalidate()` whenever the page is scrolled.
+    """
+
+    def __init__(self, detector, margin: int = 8, diff_threshold: float = 6.0,
+                 black_level: int = 30, redetect_interval: int = 60):
+        self.detector = detector
+        self.margin = margin                        # Width of the ring checked around each rectangle
+        self.diff_threshold = diff_threshold        # Mean absolute change (0-255) that counts as movement
+        self.black_level = black_level              # Same "non-black" cut-off as the detector
+        self.redetect_interval = redetect_interval  # Frames between unconditional full detections
+        self.rectangles: Optional[List[Rect]] = None
+        self._rings: List[List[np.ndarray]] = []
+        self._frames_since_detect = 0
+        self.full_detections = 0
+        self.frames = 0
+
+    def invalidate(self):
+        """Force a full detection on the next frame (call after scrolling)"""
+        self.rectangles = None
+
+    def _rings_of(self, img: np.ndarray, rect: Rect) -> List[np.ndarray]:
+        height, width = img.shape[:2]
+        return [img[rows, cols] for rows, cols in _ring_slices(rect, self.margin, width, height)]
+
+    def _edges_present(self, img: np.ndarray, rect: Rect) -> bool:
+        # Each edge of a detected player still has non-black pixels just inside it
+        x, y, w, h = rect
+        inset = min(2, w // 2, h // 2)
+        edges = (img[y + inset, x:x + w], img[y + h - 1 - inset, x:x + w],
+                 img[y:y + h, x + inset], img[y:y + h, x + w - 1 - inset])
+        return all(edge.size and edge.max() >= self.black_level for edge in edges)
+
+    def _still_valid(self, img: np.ndarray) -> bool:
+        for rect, reference in zip(self.rectangles, self._rings):
+            if not self._edges_present(img, rect):
+                return False
+            for before, after in zip(reference, self._rings_of(img, rect)):
+                if before.shape != after.shape:
+                    return False
+                if cv2.absdiff(before, after).mean() > self.diff_threshold:
+                    return False
+        return True
+
+    def _detect(self, img: np.ndarray) -> List[Rect]:
+        self.rectangles = self.detector.detect_video_players(img)
+        self._rings = [[ring.copy() for ring in self._rings_of(img, rect)] for rect in self.rectangles]
+        self._frames_since_detect = 0
+        self.full_detections += 1
+        return self.rectangles
+
+    def update(self, img: np.ndarray) -> List[Rect]:
+        """Rectangles for this frame, re-detecting only when the cheap checks fail"""
+        self.frames += 1
+        self._frames_since_detect += 1
+        if (self.rectangles is None or self._frames_since_detect >= self.redetect_interval
+                or not self._still_valid(img)):
+            return self._detect(img)
+        return self.rectangles
+
+
+def _same_rectangles(a: Sequence[Rect], b: Sequence[Rect], tolerance: int = 4) -> bool:
+    if len(a) != len(b):
+        return False
+    return all(any(all(abs(p - q) <= tolerance for p, q in zip(ra, rb)) for rb in b) for ra in a)
+
+
+def load_frames(frames_dir: str) -> List[np.ndarray]:
+    """BGR frames from a directory of .png or .npy files, in name order"""
+    frames = []
+    for path in sorted(glob.glob(os.path.join(frames_dir, "*"))):
+        if path.endswith(".npy"):
+            frame = np.load(path)
+        elif path.lower().endswith((".png", ".jpg", ".jpeg")):
+            frame = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        else:
+            continue
+        if frame.ndim == 3 and frame.shape[2] == 4:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+        frames.append(frame)
+    return frames
+
+
+def synthetic_sequence(count: int = 120, width: int = 1920, height: int = 1080,
+                       scroll_every: int = 40, seed: int = 0) -> Tuple[List[np.ndarray], List[bool]]:
+    """
+    A feed of posts whose content changes every frame (a playing video) and
+    whose layout jumps every `scroll_every` frames. Returns (frames, scrolled).
+    """
+    rng = np.random.default_rng(seed)
+    frames, scrolled = [], []
+    post_w, post_h = width // 3, height * 2 // 3
+    for i in range(count):
+        frame = np.full((height, width, 3), 10, np.uint8)
+        shift = (i // scroll_every) * 150 % (height // 3)
+        y = height // 8 + shift
+        x = width // 3
+        frame[y:min(height - 60, y + post_h), x:x + post_w] = rng.integers(40, 255, 3, dtype=np.uint8)
+        # "Video" content inside the post keeps changing
+        inner = frame[y + 40:min(height - 100, y + post_h - 40), x + 40:x + post_w - 40]
+        inner[:] = rng.integers(0, 255, (1, 1, 3), dtype=np.uint8)
+        frames.append(frame)
+        scrolled.append(i > 0 and i % scroll_every == 0)
+    return frames, scrolled
+
+
+def evaluate(frames: List[np.ndarray], scrolled: Optional[List[bool]] = None):
+    """Compare the tracker against full detection on every frame"""
+    from video_detector_demo import VideoPlayerDetector
+
+    detector = VideoPlayerDetector()
+    start = time.perf_counter()
+    truth = [detector.detect_video_players(frame) for frame in frames]
+    full_time = time.perf_counter() - start
+
+    tracker = VideoPlayerTracker(detector)
+    start = time.perf_counter()
+    tracked = []
+    for i, frame in enumerate(frames):
+        if scrolled and scrolled[i]:
+            tracker.invalidate()
+        tracked.append(tracker.update(frame))
+    tracker_time = time.perf_counter() - start
+
+    agreement = sum(_same_rectangles(a, b) for a, b in zip(truth, tracked)) / len(frames)
+    print(f"Frames: {len(frames)} ({frames[0].shape[1]}x{frames[0].shape[0]})")
+    print(f"Full detection: {full_time / len(frames) * 1000:.2f} ms/frame")
+    print(f"Tracker:        {tracker_time / len(frames) * 1000:.2f} ms/frame "
+          f"({tracker.full_detections} full detections, {full_time / tracker_time:.1f}x faster)")
+    print(f"Agreement with full detection: {agreement:.1%}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        evaluate(load_frames(sys.argv[1]))
+    else:
+        evaluate(*synthetic_sequence())